@@ -1,13 +1,28 @@
 from pathlib import Path
+import asyncio
+import functools
+import inspect
+import time
 import asyncpg
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Header, Query, Request
+from fastapi import params as fastapi_params
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import TypeAdapter, ValidationError
+from pydantic.fields import FieldInfo
 from typing import List, Dict, Any, Optional
 from asyncpg import Pool
 from datetime import datetime, timedelta
 from app.services.auth_service import AuthDatabaseService
+from app.services.cache_service import CacheService
+from app.services.circuit_breaker import DB_UNAVAILABLE_ERRORS, CircuitOpenError
+from app.services.export_service import EXPORT_FILENAMES, ExportArtifactService, ExportService
+from app.services.insight_service import InsightViewService
+from app.services.snapshot_service import SnapshotService
+from app.api.api_v1.routing import ConditionalRoute, file_response
 from app.models.insight_model import (
     EngagementSummary, TimePattern, OpportunityArea, 
-    TrendPoint, AdvancedInsight, DashboardSummary, UserData, ScatterPoint
+    TrendPoint, AdvancedInsight, DashboardSummary, UserData, ScatterPoint,
+    BatchPart, BatchRequest
 )
 from pathlib import Path
 import smtplib
@@ -17,6 +32,7 @@ from email.mime.base import MIMEBase
 from email import encoders
 import os
 import io
+import re
 import zipfile
 import jwt
 import pandas as pd
@@ -27,36 +43,46 @@ from app.sql.main import SqlQuery
 from app.core.config import logger_settings, Settings
 logger = logger_settings.get_logger(__name__)
 
-dashboard_router = APIRouter()
+# ETag / 304 and response compression for every insight endpoint
+dashboard_router = APIRouter(route_class=ConditionalRoute)
+# File downloads, served under the same prefix; their validators come from
+# the file itself, not from the dataset version
+download_router = APIRouter()
 
 async def get_db_pool() -> Pool:
-    return await AuthDatabaseService.get_pool()
+    try:
+        return await asyncio.wait_for(AuthDatabaseService.get_pool(), logger_settings.DB_QUERY_TIMEOUT)
+    except DB_UNAVAILABLE_ERRORS as e:
+        logger.error(f"Database pool unavailable: {e!r}")
+        raise HTTPException(status_code=503, detail="Database temporarily unavailable")
 
 # ===================== EXISTING ENDPOINTS =====================
 
 @dashboard_router.get("/dashboard-summary", response_model=DashboardSummary)
+@CacheService.cached("dashboard-summary")
 async def get_dashboard_summary(pool: Pool = Depends(get_db_pool)):
     """Enhanced dashboard summary with advanced metrics"""
-    query = await SqlQuery.read_sql_full(
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/dashboard_summary", 
         schema="records"
     )
     
     async with pool.acquire() as conn:
-        result = await conn.fetchrow(query)
+        result = await SqlQuery.fetchrow(conn, query)
     
     return dict(result) if result else {}
 
 @dashboard_router.get("/advanced-insights", response_model=List[AdvancedInsight])
+@CacheService.cached("advanced-insights")
 async def get_advanced_insights(pool: Pool = Depends(get_db_pool)):
     """Get advanced insights with surprise patterns"""
-    query = await SqlQuery.read_sql_full(
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/surprise_patterns",
         schema="records"
     )
     
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
     
     insights = []
     for row in results:
@@ -73,6 +99,7 @@ async def get_advanced_insights(pool: Pool = Depends(get_db_pool)):
     return insights
 
 @dashboard_router.get("/engagement-heatmap")
+@CacheService.cached("engagement-heatmap")
 async def get_engagement_heatmap(
     period: str = Query("last_year", description="Time period for analysis"),
     pool: Pool = Depends(get_db_pool)
@@ -80,14 +107,14 @@ async def get_engagement_heatmap(
     """Enhanced heatmap data with engagement intensity"""
     start_date = parse_period(period)
     
-    query = await SqlQuery.read_sql_full(
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/engagement_heatmap",
-        schema="records",
-        start_date=start_date.strftime("%Y-%m-%d %H:%M:%S")
+        binds={"start_date": start_date},
+        schema="records"
     )
     
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
     
     # Transform to heatmap format
     heatmap_data = {}
@@ -110,25 +137,27 @@ async def get_engagement_heatmap(
     return heatmap_data
 
 @dashboard_router.get("/content-performance")
+@CacheService.cached("content-performance")
 async def get_content_performance(
     min_content_length: int = Query(500, description="Minimum content length"),
     pool: Pool = Depends(get_db_pool)
 ):
     """Analyze content performance based on various factors"""
-    query = await SqlQuery.read_sql_full(
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/content_performance",
-        schema="records",
-        min_content_length=min_content_length
+        binds={"min_content_length": min_content_length},
+        schema="records"
     )
     
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
     
     return [dict(row) for row in results]
 
 # ===================== NEW ENDPOINTS =====================
 
 @dashboard_router.get("/top-engagements", response_model=List[EngagementSummary])
+@CacheService.cached("top-engagements")
 async def get_top_engagements(
     period: str = Query("last_year", description="Time period for analysis"),
     limit: int = Query(10, description="Number of results to return"),
@@ -140,25 +169,23 @@ async def get_top_engagements(
     start_date = parse_period(period)
     logger.info(f"Fetching top engagements since {start_date} with limit {limit}")
     
-    query = await SqlQuery.read_sql_full(
+    # The template's LIMIT becomes a bind parameter so every limit shares one plan
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/top_engagements",
-        schema="records",
-        start_date=start_date.strftime("%Y-%m-%d %H:%M:%S")
+        binds={"start_date": start_date, "limit": limit},
+        rewrites={"LIMIT 20": "LIMIT {limit}"},
+        schema="records"
     )
-    
-    logger.info(f"Original query: {query}")
-    
-    # Remove the LIMIT from the query and apply it here for flexibility
-    query = query.replace("LIMIT 20", f"LIMIT {limit}")
-    logger.info(f"remove limit from query : {query}")
+    logger.debug(f"Bound query: {query}")
     
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
     logger.info(f"Fetched {len(results)} records")
     logger.debug(f"Records: {results}")
     return [dict(row) for row in results]
 
 @dashboard_router.get("/engagement-trend", response_model=List[dict])
+@CacheService.cached("engagement-trend")
 async def get_engagement_trend(
     entity_type: str = Query(..., description="Type of entity: author, category, or post"),
     author_name: Optional[str] = Query(None, description="Author name (backend resolves ID)"),
@@ -178,7 +205,7 @@ async def get_engagement_trend(
             )
             if not author_row:
                 raise HTTPException(status_code=404, detail=f"Author '{author_name}' not found")
-            entity_condition = f"p.author_id = {author_row['author_id']}"
+            entity_condition, entity_value = "p.author_id = {entity_value}", author_row['author_id']
 
         elif entity_type == "post" and post_title:
             # Look up post_id by title
@@ -187,27 +214,28 @@ async def get_engagement_trend(
             )
             if not post_row:
                 raise HTTPException(status_code=404, detail=f"Post '{post_title}' not found")
-            entity_condition = f"p.post_id = {post_row['post_id']}"
+            entity_condition, entity_value = "p.post_id = {entity_value}", post_row['post_id']
 
         elif entity_type == "category" and category_name:
-            entity_condition = f"p.category = '{category_name.replace('\'','\'\'')}'"
+            entity_condition, entity_value = "p.category = {entity_value}", category_name
 
         else:
             raise HTTPException(status_code=400, detail="Invalid entity parameters")
 
-    # Read SQL template
-    query = await SqlQuery.read_sql_full(
+    # Read SQL template; the entity value and interval are bound, not inlined
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/engagement_trend",
-        schema="records",
-        entity_condition=entity_condition
+        binds={"entity_value": entity_value, "days": days},
+        rewrites={
+            "{entity_condition}": entity_condition,
+            "INTERVAL '365 days'": "make_interval(days => {days})"
+        },
+        schema="records"
     )
-    
-    # Adjust query interval
-    query = query.replace("INTERVAL '365 days'", f"INTERVAL '{days} days'")
 
     # Fetch results
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
 
     # Convert dates
     trend_data = []
@@ -225,6 +253,7 @@ async def get_engagement_trend(
     return trend_data
 
 @dashboard_router.get("/authors")
+@CacheService.cached("authors")
 async def get_authors(pool: Pool = Depends(get_db_pool)):
     async with pool.acquire() as conn:
         rows = await conn.fetch("SELECT author_id, name FROM records.authors ORDER BY name;")
@@ -232,6 +261,7 @@ async def get_authors(pool: Pool = Depends(get_db_pool)):
 
 
 @dashboard_router.get("/posts")
+@CacheService.cached("posts")
 async def get_posts(pool: Pool = Depends(get_db_pool)):
     async with pool.acquire() as conn:
         rows = await conn.fetch("SELECT post_id, title FROM records.posts ORDER BY post_id;")
@@ -239,41 +269,44 @@ async def get_posts(pool: Pool = Depends(get_db_pool)):
 
 
 @dashboard_router.get("/categories")
+@CacheService.cached("categories")
 async def get_categories(pool: Pool = Depends(get_db_pool)):
     async with pool.acquire() as conn:
         rows = await conn.fetch("SELECT DISTINCT category FROM records.posts WHERE category IS NOT NULL;")
     return [r["category"] for r in rows]
 
 @dashboard_router.get("/opportunity-areas", response_model=List[OpportunityArea])
+@CacheService.cached("opportunity-areas")
 async def get_opportunity_areas(
     min_posts: int = Query(2, description="Minimum posts to consider"),
     pool: Pool = Depends(get_db_pool)
 ):
     """Identify high-volume, low-engagement opportunities"""
-    query = await SqlQuery.read_sql_full(
+    # Bind the threshold in the query
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/opportunity_areas",
+        binds={"min_posts": min_posts},
+        rewrites={"post_count >= 2": "post_count >= {min_posts}"},
         schema="records"
     )
     
-    # Adjust the threshold in the query
-    query = query.replace("post_count >= 2", f"post_count >= {min_posts}")
-    
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
     
     return [dict(row) for row in results]
 
 @dashboard_router.get("/advanced-patterns")
+@CacheService.cached("advanced-patterns")
 async def get_advanced_patterns(pool: Pool = Depends(get_db_pool)):
     """Get advanced behavioral and content patterns"""
     try:
-        query = await SqlQuery.read_sql_full(
+        query = await SqlQuery.read_sql_bound(
             "com/jumper/insight/advanced_patterns",
             schema="records"
         )
         
         async with pool.acquire() as conn:
-            results = await conn.fetch(query)
+            results = await SqlQuery.fetch(conn, query)
         
         patterns = {}
         for row in results:
@@ -288,7 +321,10 @@ async def get_advanced_patterns(pool: Pool = Depends(get_db_pool)):
             patterns[insight_type] = insights_data
         
         return patterns
-        
+
+    except (CircuitOpenError, *DB_UNAVAILABLE_ERRORS):
+        # Outages go to the breaker and the 503 path, never into the cache as defaults
+        raise
     except Exception as e:
         logger.error(f"Error in advanced patterns endpoint: {e}")
         # Return default structure if there's an error
@@ -305,6 +341,24 @@ async def get_advanced_patterns(pool: Pool = Depends(get_db_pool)):
             }
         }
 
+@dashboard_router.get("/insight2")
+async def list_insight2():
+    """List the queries of the insight2 analysis library"""
+    return [name.rsplit("/", 1)[-1] for name in InsightViewService.names()]
+
+@dashboard_router.get("/insight2/{query_id}", response_model=List[dict])
+@CacheService.cached("insight2")
+async def get_insight2(query_id: str, pool: Pool = Depends(get_db_pool)):
+    """Rows of one insight2 query, served from its materialized view when available"""
+    if not re.fullmatch(r"\d+_\d+", query_id):
+        raise HTTPException(status_code=404, detail=f"Unknown insight query {query_id}")
+    sql_name = InsightViewService.sql_name(query_id)
+    async with pool.acquire() as conn:
+        try:
+            return await InsightViewService.fetch(conn, sql_name)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"Unknown insight query {query_id}")
+
 @dashboard_router.get("/user")
 async def get_current_user():
     """Get current user data"""
@@ -319,7 +373,14 @@ def parse_period(period: str) -> datetime:
         "last_3_months": timedelta(days=90),
         "last_year": timedelta(days=365)
     }
-    return datetime.utcnow() - periods.get(period, timedelta(days=365))
+    start_date = datetime.utcnow() - periods.get(period, timedelta(days=365))
+    # Floor to a bucket so the same period yields the same query (and cache entry)
+    bucket = logger_settings.PERIOD_BUCKET_SECONDS
+    if bucket:
+        epoch = datetime(1970, 1, 1)
+        seconds = (start_date - epoch).total_seconds()
+        start_date = epoch + timedelta(seconds=seconds // bucket * bucket)
+    return start_date
 
 def generate_recommendation(insight_type: str, metric: float) -> str:
     recommendations = {
@@ -334,6 +395,7 @@ def generate_recommendation(insight_type: str, metric: float) -> str:
 # Scatter Plot: Volume vs Engagement per Post
 # ---------------------------
 @dashboard_router.get("/scatter-performance", response_model=List[ScatterPoint])
+@CacheService.cached("scatter-performance")
 async def scatter_performance(
     period: str = Query("last_year", description="Time period for analysis"),
     entity_type: str = Query("author", description="Group by 'author' or 'category'"),
@@ -354,17 +416,17 @@ async def scatter_performance(
         entity_id = "a.author_category"
         entity_name = "a.author_category"
     
-    query = await SqlQuery.read_sql_full(
+    query = await SqlQuery.read_sql_bound(
             "com/jumper/insight/scatter_performance",
+            binds={"start_date": start_date},
             schema="records",
-            start_date=start_date.strftime("%Y-%m-%d %H:%M:%S"),
             entity_id=entity_id,
             entity_name=entity_name,
             group_field=group_field
         )
 
     async with pool.acquire() as conn:
-        rows = await conn.fetch(query)
+        rows = await SqlQuery.fetch(conn, query)
 
     return [
         ScatterPoint(
@@ -378,6 +440,7 @@ async def scatter_performance(
     ]
 
 @dashboard_router.get("/engagement-trend-author-category")
+@CacheService.cached("engagement-trend-author-category")
 async def get_engagement_trend_author_category(
     days: int = Query(365, description="Number of days to analyze"),
     pool: Pool = Depends(get_db_pool)
@@ -385,14 +448,15 @@ async def get_engagement_trend_author_category(
     """
     Engagement trends over time grouped by author and category
     """
-    query = await SqlQuery.read_sql_full(
+    query = await SqlQuery.read_sql_bound(
         "com/jumper/insight/engagement_trend_author_category",
+        binds={"days": days},
+        rewrites={"INTERVAL '365 days'": "make_interval(days => {days})"},
         schema="records"
     )
-    query = query.replace("INTERVAL '365 days'", f"INTERVAL '{days} days'")
     
     async with pool.acquire() as conn:
-        results = await conn.fetch(query)
+        results = await SqlQuery.fetch(conn, query)
     
     trend_data = []
     for row in results:
@@ -405,43 +469,31 @@ async def get_engagement_trend_author_category(
     
     return trend_data
 
-@dashboard_router.get("/download-data")
-async def download_data(pool: Pool = Depends(get_db_pool)):
-    """Download all database tables as CSV and Excel inside a zip file"""
+@download_router.get("/download-data")
+async def download_data(
+    request: Request,
+    format: str = Query("zip", pattern="^(zip|parquet|arrow)$", description="zip (CSV and Excel), parquet or arrow"),
+    pool: Pool = Depends(get_db_pool)
+):
+    """Download all database tables as CSV and Excel, or as typed Parquet / Arrow files, inside a zip file"""
+
+    # Built once per dataset version; repeat downloads are a plain file send
+    artifact = ExportArtifactService.find(format)
+    if artifact is not None:
+        return file_response(
+            request, artifact.path, "application/x-zip-compressed", EXPORT_FILENAMES[format],
+            etag=artifact.sha256[:32], headers={"X-Checksum-SHA256": artifact.sha256}
+        )
 
-    # Create in-memory zip file
-    zip_buffer = io.BytesIO()
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zf:
-        
-        async with pool.acquire() as conn:
-            TABLES = ["authors", "engagements", "post_metadata", "posts", "users"]
-            for table in TABLES:
-                # Fetch data
-                rows = await conn.fetch(f"SELECT * FROM records.{table}")
-                df = pd.DataFrame([dict(r) for r in rows])
-
-                # Handle empty tables
-                if df.empty:
-                    continue
-
-                # Save CSV
-                csv_bytes = df.to_csv(index=False).encode("utf-8")
-                zf.writestr(f"csv/{table}.csv", csv_bytes)
-
-                # Save Excel
-                excel_buffer = io.BytesIO()
-                with pd.ExcelWriter(excel_buffer, engine="openpyxl") as writer:
-                    df.to_excel(writer, index=False, sheet_name=table)
-                zf.writestr(f"excel/{table}.xlsx", excel_buffer.getvalue())
-
-    zip_buffer.seek(0)
+    # Not built yet: stream this one live and build it for the next request
+    ExportArtifactService.schedule(pool)
     return StreamingResponse(
-        zip_buffer,
+        ExportService.stream(pool, format),
         media_type="application/x-zip-compressed",
-        headers={"Content-Disposition": "attachment; filename=data.zip"}
+        headers={"Content-Disposition": f"attachment; filename={EXPORT_FILENAMES[format]}"}
     )
     
-@dashboard_router.get("/download-report")
+@download_router.get("/download-report")
 async def download_report():
     """
     Endpoint to download the stored PowerPoint report.
@@ -465,4 +517,126 @@ async def download_report():
         headers={
             "Content-Disposition": f"attachment; filename=report.pptx"
         }
-    )
\ No newline at end of file
+    )
+# ---------------------------
+# Batch: many dashboard queries in one round trip
+# ---------------------------
+# The batch route itself can't be batched
+_BATCH_EXCLUDED = {"/batch"}
+
+@functools.lru_cache(maxsize=None)
+def _batch_routes() -> Dict[str, APIRoute]:
+    return {
+        route.path.lstrip("/"): route
+        for route in dashboard_router.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods and route.path not in _BATCH_EXCLUDED
+    }
+
+@functools.lru_cache(maxsize=None)
+def _type_adapter(annotation) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+def _batch_kwargs(endpoint, params: Dict[str, Any], pool: Pool) -> Dict[str, Any]:
+    """
+    Keyword arguments for a handler, as FastAPI would build them: given
+    values are validated against the annotation and missing ones take the
+    `Query(...)` default. Raises HTTPException(422) on bad parameters.
+    """
+    kwargs, unknown = {}, set(params)
+    for name, param in inspect.signature(endpoint).parameters.items():
+        default = param.default
+        if isinstance(default, fastapi_params.Depends):
+            if default.dependency is not get_db_pool:
+                raise HTTPException(status_code=422, detail=f"Parameter {name} can't be batched")
+            kwargs[name] = pool
+            continue
+        unknown.discard(name)
+        if name in params:
+            try:
+                kwargs[name] = _type_adapter(param.annotation).validate_python(params[name])
+            except ValidationError as e:
+                raise HTTPException(status_code=422, detail=f"Invalid {name}: {e.errors()[0]['msg']}")
+        elif isinstance(default, FieldInfo):
+            if default.is_required():
+                raise HTTPException(status_code=422, detail=f"Missing required parameter {name}")
+            kwargs[name] = default.get_default(call_default_factory=True)
+        elif default is not inspect.Parameter.empty:
+            kwargs[name] = default
+        else:
+            raise HTTPException(status_code=422, detail=f"Missing required parameter {name}")
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown parameters {sorted(unknown)}")
+    return kwargs
+
+async def _run_part(part: BatchPart, pool: Pool) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        route = _batch_routes().get(part.path.strip("/"))
+        if route is None:
+            raise HTTPException(status_code=404, detail=f"Unknown dashboard route {part.path}")
+        data = await route.endpoint(**_batch_kwargs(route.endpoint, part.params, pool))
+        # Same response_model filtering as the GET route
+        data = await serialize_response(field=route.response_field, response_content=data)
+        result = {"status": 200, "data": data}
+    except HTTPException as e:
+        result = {"status": e.status_code, "error": e.detail}
+    except DB_UNAVAILABLE_ERRORS as e:
+        logger.error(f"Batch part {part.path} failed: {e!r}")
+        result = {"status": 503, "error": "Database temporarily unavailable"}
+    except Exception as e:
+        logger.error(f"Batch part {part.path} failed: {e!r}")
+        result = {"status": 500, "error": str(e)}
+    result["elapsed_ms"] = round(1000 * (time.perf_counter() - started), 2)
+    return result
+
+@dashboard_router.post("/batch")
+async def batch(body: BatchRequest, pool: Pool = Depends(get_db_pool)):
+    """
+    Run several dashboard queries concurrently and return them in one payload.
+    Each part reports its own status, data or error, and timing, so one failing
+    widget doesn't fail the page.
+    """
+    if len(body.parts) > logger_settings.BATCH_MAX_PARTS:
+        raise HTTPException(status_code=422, detail=f"At most {logger_settings.BATCH_MAX_PARTS} parts per batch")
+    ids = [part.id or part.path for part in body.parts]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Batch part ids must be unique")
+    started = time.perf_counter()
+    results = await asyncio.gather(*(_run_part(part, pool) for part in body.parts))
+    return {
+        "parts": dict(zip(ids, results)),
+        "elapsed_ms": round(1000 * (time.perf_counter() - started), 2),
+    }
+
+# ---------------------------
+# Snapshots: the parameter grid precomputed after each ingest
+# ---------------------------
+_PERIODS = ("last_7_days", "last_30_days", "last_3_months", "last_year")
+
+# Route path -> parameter sets the dashboard actually requests; others run live
+SNAPSHOT_GRID: Dict[str, List[Dict[str, Any]]] = {
+    "dashboard-summary": [{}],
+    "advanced-insights": [{}],
+    "engagement-heatmap": [{"period": period} for period in _PERIODS],
+    "content-performance": [{}],
+    "top-engagements": [{"period": period, "limit": limit} for period in _PERIODS for limit in (5, 10, 20)],
+    "authors": [{}],
+    "posts": [{}],
+    "categories": [{}],
+    "opportunity-areas": [{}],
+    "advanced-patterns": [{}],
+    "scatter-performance": [
+        {"period": period, "entity_type": entity_type} for period in _PERIODS for entity_type in ("author", "category")
+    ],
+}
+
+def _snapshot_jobs(pool: Pool):
+    for path, grid in SNAPSHOT_GRID.items():
+        endpoint = _batch_routes()[path].endpoint
+        for params in grid:
+            kwargs = _batch_kwargs(endpoint, params, pool)
+            # Keyed exactly like CacheService.cached keys the request
+            key_params = {k: v for k, v in kwargs.items() if k != "pool"}
+            yield endpoint.cache_namespace, key_params, functools.partial(endpoint.__wrapped__, **kwargs)
+
+SnapshotService.register(_snapshot_jobs)
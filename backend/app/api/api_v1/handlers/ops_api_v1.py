@@ -0,0 +1,22 @@
+from typing import Any, Dict
+from fastapi import APIRouter, Response
+from app.services.auth_service import AuthDatabaseService
+from app.services.cache_service import CacheService
+from app.services.metrics_service import CONTENT_TYPE, MetricsService
+from app.services.snapshot_service import SnapshotService
+from app.core.config import logger_settings, Settings
+logger = logger_settings.get_logger(__name__)
+
+# Operational endpoints; never cached or conditional
+ops_router = APIRouter()
+
+@ops_router.get("/pool-stats")
+async def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool size, in-use count, queue depth and acquire wait"""
+    return AuthDatabaseService.pool_stats()
+
+@ops_router.get("/metrics")
+async def get_metrics() -> Response:
+    """Request, query, pool and cache metrics in the Prometheus text format"""
+    body = MetricsService.render(AuthDatabaseService.pool_stats(), CacheService.stats, SnapshotService.stats)
+    return Response(body, media_type=CONTENT_TYPE)
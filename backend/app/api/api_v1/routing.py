@@ -0,0 +1,174 @@
+import asyncio
+import gzip
+import hashlib
+import os
+import re
+import time
+from typing import AsyncIterator, Callable, Optional, Tuple
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.responses import FileResponse, StreamingResponse
+from app.core.config import logger_settings, Settings
+from app.services.cache_service import LocalCache
+from app.services.dataset_service import DatasetVersionService
+logger = logger_settings.get_logger(__name__)
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+def _accepted_encoding(request: Request) -> Optional[str]:
+    accepted = {
+        part.split(";")[0].strip().lower()
+        for part in request.headers.get("accept-encoding", "").split(",")
+        if not part.strip().endswith("q=0")
+    }
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=logger_settings.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=logger_settings.COMPRESS_GZIP_LEVEL)
+
+def _etag_match(if_none_match: str, tag: str) -> Optional[str]:
+    """Return the `If-None-Match` entry that matches `tag`, if any."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return f'"{tag}"'
+        # Encoded representations carry a suffix; they are the same resource
+        if candidate.removeprefix("W/").strip('"').split("-")[0] == tag:
+            return candidate
+    return None
+
+_BYTE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single `bytes=` range, or None to send the
+    whole file (no header, multiple ranges, or a malformed one).
+    Raises ValueError when the range lies outside the file.
+    """
+    match = _BYTE_RANGE.fullmatch(header.strip())
+    if match is None or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+async def _file_chunks(path: str, start: int, end: int, block: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            data = await asyncio.to_thread(file.read, min(block, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+def file_response(request: Request, path: str, media_type: str, filename: str,
+                  etag: str, headers: Optional[dict] = None) -> Response:
+    """
+    FileResponse with single-range support (Starlette 0.27 has none), so
+    interrupted downloads resume instead of starting over.
+    """
+    size = os.path.getsize(path)
+    headers = {**(headers or {}), "Accept-Ranges": "bytes", "ETag": f'"{etag}"'}
+    requested = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if requested and (if_range is None or if_range.strip() == f'"{etag}"'):
+        try:
+            byte_range = _byte_range(requested, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers.update({
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+                "Content-Disposition": f'attachment; filename="{filename}"',
+            })
+            return StreamingResponse(_file_chunks(path, start, end), status_code=206,
+                                     media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+class ConditionalRoute(APIRoute):
+    """
+    Route class for the dashboard router.
+    Responses get a strong ETag derived from the dataset version, the
+    period bucket and the request URL. A matching `If-None-Match` is
+    answered with 304 before the handler runs, and encoded bodies are
+    kept per ETag so repeat loads skip both the query and serialization.
+    """
+    _bodies = LocalCache(logger_settings.COMPRESS_CACHE_SIZE, logger_settings.CACHE_TTL)
+
+    @staticmethod
+    def make_etag(request: Request) -> str:
+        # parse_period is relative to now, so the bucket is part of the identity
+        bucket = int(time.time() // logger_settings.PERIOD_BUCKET_SECONDS) if logger_settings.PERIOD_BUCKET_SECONDS else 0
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        raw = f"{DatasetVersionService.current()}|{bucket}|{request.url.path}|{query}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _headers(tag: str, encoding: Optional[str]) -> dict:
+        headers = {
+            "ETag": f'"{tag}-{encoding}"' if encoding else f'"{tag}"',
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return headers
+
+    def get_route_handler(self) -> Callable:
+        original = super().get_route_handler()
+
+        async def handler(request: Request) -> Response:
+            if request.method not in ("GET", "HEAD"):
+                return await original(request)
+            tag = self.make_etag(request)
+            encoding = _accepted_encoding(request)
+            matched = _etag_match(request.headers.get("if-none-match", ""), tag)
+            if matched:
+                headers = self._headers(tag, None)
+                headers["ETag"] = matched
+                return Response(status_code=304, headers=headers)
+
+            key = f"{tag}:{encoding}"
+            cached: Optional[Tuple[bytes, str, Optional[str]]] = \
+                self._bodies.get(key) if logger_settings.CACHE_ENABLED else None
+            if cached is not None:
+                body, media_type, used = cached
+                return Response(content=body, media_type=media_type, headers=self._headers(tag, used))
+
+            response = await original(request)
+            if response.status_code != 200 or isinstance(response, StreamingResponse) \
+                    or getattr(response, "body", None) is None or "content-encoding" in response.headers:
+                return response
+            body, used = response.body, None
+            if encoding and len(body) >= logger_settings.COMPRESS_MIN_SIZE:
+                body, used = _compress(body, encoding), encoding
+            self._bodies.set(key, (body, response.media_type, used))
+            headers = {k: v for k, v in response.headers.items() if k.lower() != "content-length"}
+            headers.update(self._headers(tag, used))
+            return Response(content=body, status_code=200, media_type=response.media_type, headers=headers)
+
+        return handler
+
+async def _clear_bodies(version: int) -> None:
+    ConditionalRoute._bodies.clear()
+
+DatasetVersionService.subscribe(_clear_bodies)
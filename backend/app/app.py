@@ -14,6 +14,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import inspect
 from app.services.auth_service import AuthDatabaseService
+from app.sql.main import SqlRegistry
+from app.services.cache_service import CacheService
+from app.services.dataset_service import DatasetVersionService
+from app.services.export_service import ExportArtifactService
+from app.services.snapshot_service import SnapshotService
+from app.services.metrics_service import MetricsMiddleware
 import uvicorn
 import time
 import redis.asyncio as redis
@@ -144,6 +150,7 @@ async def auth_db_startup():
     """
     Initialize and verify the authentication database with required tables.
     """
+    # Create and warm the pool up front so handlers never block on its creation
     is_connected = await AuthDatabaseService.ping_database()
     if not is_connected:
         logger.error("Failed to connect to the database!")
@@ -151,13 +158,16 @@ async def auth_db_startup():
     
     # await AuthDatabaseService.ensure_auth_table_exists()
     await AuthDatabaseService.ensure_data_exists()
+    await DatasetVersionService.start_listener()
+    # Precompute dashboard payloads now, after each ingest and every period bucket
+    SnapshotService.start(await AuthDatabaseService.get_pool())
 
     logger.info("Successfully connected to the authentication database.")
         
 async def auth_db_shutdown():
     try:
         await AuthDatabaseService.auth_shutdown()
-        logger.info(f"Successfully closed authentication database connection.")
+        logger.info(f"Successfully closed the database pool.")
     except Exception as e:
         logger.error(f"Error closing authentication database connection: {e}")
     
@@ -194,6 +204,9 @@ def run_app():
         allow_headers=["*"]
     )
     
+    # Request latency by route template, served at /api/v1/ops/metrics
+    app.add_middleware(MetricsMiddleware)
+
     # Register the middleware for restricted methods
     # app.middleware("http")(restrict_methods_middleware)
     
@@ -220,6 +233,8 @@ def run_app():
     @app.on_event("startup")
     async def on_startup():
         logger.info("Starting up...")
+        SqlRegistry.load_all()
+        SqlRegistry.start_watcher()
         # redis_clt = await redis_client_support()
         await asyncio.gather(
             # redis_startup(redis_clt),
@@ -229,6 +244,11 @@ def run_app():
     @app.on_event("shutdown")
     async def on_shutdown():
         logger.info("Shutting down...")
+        await SqlRegistry.stop_watcher()
+        await CacheService.close()
+        await DatasetVersionService.stop_listener()
+        await ExportArtifactService.stop()
+        await SnapshotService.stop()
         # redis_clt = await redis_client_support()
         await asyncio.gather(
             # redis_shutdown(redis_clt),
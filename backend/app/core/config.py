@@ -42,6 +42,23 @@ class Settings(BaseModel):
     AUTH_DB_USER: str = config("AUTH_DB_USER", cast=str)
     AUTH_DB_PASSWORD: str = config("AUTH_DB_PASSWORD", cast=str)
     AUTH_DB: str = config("AUTH_DB", cast=str)
+    DB_STATEMENT_CACHE_SIZE: int = 256 # prepared statements kept per pooled connection
+    DB_STATEMENT_CACHE_LIFETIME: int = 3600 # seconds
+    DB_POOL_MIN_SIZE: int = config("DB_POOL_MIN_SIZE", default=2, cast=int) # connections opened and warmed at startup
+    DB_POOL_MAX_SIZE: int = config("DB_POOL_MAX_SIZE", default=10, cast=int)
+    DB_POOL_MAX_IDLE: float = 300.0 # seconds an idle connection is kept before it is recycled
+    DB_POOL_MAX_QUERIES: int = 50000 # queries before a connection is recycled
+    DB_POOL_ACQUIRE_TIMEOUT: float = config("DB_POOL_ACQUIRE_TIMEOUT", default=10.0, cast=float) # seconds
+    DB_POOL_CLOSE_TIMEOUT: float = 10.0 # seconds to wait for busy connections on shutdown
+    INGEST_CHUNK_SIZE: int = config("INGEST_CHUNK_SIZE", default=50000, cast=int) # CSV rows parsed and copied per batch
+    INGEST_LOOKBACK_DAYS: int = config("INGEST_LOOKBACK_DAYS", default=-1, cast=int) # opt-in: skip known campaigns older than this many days before the last load's newest date; -1 restages the whole file
+    EXPORT_CHUNK_SIZE: int = 10000 # rows fetched per cursor round trip by /download-data
+    EXPORT_SCHEMA: str = "records"
+    EXPORT_EXCLUDED_TABLES: list = ["dataset_version", "ingest_watermarks", "dashboard_snapshots"]
+    EXPORT_COLUMNAR_COMPRESSION: str = "zstd" # parquet and arrow exports
+    EXPORT_PREBUILD: bool = config("EXPORT_PREBUILD", default=True, cast=bool) # build export artifacts after each ingest
+    EXPORT_KEEP_VERSIONS: int = 2 # dataset versions whose artifacts stay on disk
+    EXPORT_FACT_TABLES: list = ["email_campaigns", "campaign_segments", "segments"] # memory-mapped fact snapshot
     #
     BASE_DIR: str = os.path.dirname(os.path.abspath(__file__))
     PROMPT_DIR: str = os.path.join(os.path.abspath(os.path.join(BASE_DIR, "../")), "prompts/tx")
@@ -49,6 +66,10 @@ class Settings(BaseModel):
     ENV_PATH: str = os.path.join(os.path.abspath(os.path.join(BASE_DIR, "../../")), ".env")
     SQL_DIR: str = os.path.join(os.path.abspath(os.path.join(BASE_DIR, "../")), "sql/commands")
     DATA_DIR: str = os.path.join(os.path.abspath(os.path.join(BASE_DIR, "../")), "data")
+    EXPORTS_DIR: str = os.path.join(os.path.abspath(os.path.join(BASE_DIR, "../../")), "reports/exports")
+    INSIGHT_OUTPUT_DIR: str = os.path.join(os.path.abspath(os.path.join(BASE_DIR, "../../")), "reports/insights") # holds assets/image and markdown
+    SQL_RELOAD_INTERVAL: float = config("SQL_RELOAD_INTERVAL", default=2.0, cast=float) # seconds, 0 disables hot reload
+    SQL_RENDER_CACHE_SIZE: int = 256 # rendered variants kept per template
     
     model_config = ConfigDict(
         case_sensitive=True,
@@ -59,9 +80,38 @@ class Settings(BaseModel):
         """Return a logger instance for the specified module name."""
         return logger_config(module=module_name)
     
-    REDIS_HOST: str = "redis" # change to `redis` when in docker
-    REDIS_PORT: int = 6379
+    REDIS_HOST: str = config("REDIS_HOST", default="redis", cast=str) # change to `redis` when in docker
+    REDIS_PORT: int = config("REDIS_PORT", default=6379, cast=int)
     REQUESTS_PER_WINDOW: int = 30  # Max requests allowed in the time window
     TIME_WINDOW: int = 60  # Time window in seconds (e.g., 60 seconds or minute)
+    #
+    CACHE_ENABLED: bool = config("CACHE_ENABLED", default=True, cast=bool)
+    CACHE_REDIS_ENABLED: bool = config("CACHE_REDIS_ENABLED", default=True, cast=bool)
+    CACHE_PREFIX: str = "insight"
+    CACHE_TTL: int = config("CACHE_TTL", default=300, cast=int) # seconds
+    BATCH_MAX_PARTS: int = 20 # sub-queries accepted by one /insight/batch call
+    CACHE_LOCAL_MAXSIZE: int = 512 # entries kept in-process
+    CACHE_REDIS_TIMEOUT: float = 0.5 # seconds per Redis call
+    CACHE_REDIS_RETRY: int = 30 # seconds to skip Redis after a failure
+    CACHE_STALE_TTL: int = config("CACHE_STALE_TTL", default=3600, cast=int) # seconds an expired entry may still be served
+    PERIOD_BUCKET_SECONDS: int = 3600 # parse_period start dates are floored to this
+    COMPRESS_MIN_SIZE: int = 1024 # bytes; smaller bodies are sent as-is
+    COMPRESS_GZIP_LEVEL: int = 6
+    COMPRESS_BROTLI_QUALITY: int = 5
+    COMPRESS_CACHE_SIZE: int = 256 # encoded bodies kept per worker
+    #
+    DB_QUERY_TIMEOUT: float = config("DB_QUERY_TIMEOUT", default=10.0, cast=float) # seconds per dashboard load
+    DB_BREAKER_FAILURES: int = 5 # consecutive timeouts before the breaker opens
+    DB_BREAKER_RESET: float = 30.0 # seconds before a trial call is allowed
+    #
+    DATASET_VERSION_CHANNEL: str = "dataset_version" # LISTEN/NOTIFY channel
+    DATASET_VERSION_CHECK_INTERVAL: float = 5.0 # seconds between listener health checks
+    #
+    INSIGHT_VIEWS_ENABLED: bool = config("INSIGHT_VIEWS_ENABLED", default=True, cast=bool) # back insight2 with materialized views
+    INSIGHT_VIEWS_SCHEMA: str = "insight_mv"
+    #
+    SNAPSHOTS_ENABLED: bool = config("SNAPSHOTS_ENABLED", default=True, cast=bool) # precompute dashboard payloads
+    SNAPSHOT_INTERVAL: int = PERIOD_BUCKET_SECONDS or 3600 # seconds between scheduled refreshes, on bucket boundaries
+    SNAPSHOT_CONCURRENCY: int = 4 # payloads computed at once by the refresh job, at most a quarter of DB_POOL_MAX_SIZE
         
 logger_settings = Settings()
@@ -75,4 +75,11 @@ class DashboardSummary(BaseModel):
 
 class UserData(BaseModel):
     email: str
-    username: Optional[str] = None
\ No newline at end of file
+    username: Optional[str] = None
+class BatchPart(BaseModel):
+    path: str                          # dashboard route, e.g. "top-engagements" or "insight2/{query_id}"
+    params: Dict[str, Any] = {}        # query and path parameters; omitted ones take the route defaults
+    id: Optional[str] = None           # key in the response, defaults to the path
+
+class BatchRequest(BaseModel):
+    parts: List[BatchPart]
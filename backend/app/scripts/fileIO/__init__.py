@@ -0,0 +1,36 @@
+import os
+from typing import Dict, List, Optional
+import pyarrow as pa
+
+# Where ExportArtifactService keeps `v{version}/facts/`; kept free of the app
+# settings so notebooks can import this without a configured environment
+FACTS_ROOT: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../reports/exports"))
+
+def fact_versions(root: str = FACTS_ROOT) -> List[int]:
+    """Dataset versions with a fact snapshot on disk, oldest first."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(
+        int(name[1:]) for name in os.listdir(root)
+        if name[:1] == "v" and name[1:].isdigit() and os.path.isdir(os.path.join(root, name, "facts"))
+    )
+
+def load_facts(version: Optional[int] = None, root: str = FACTS_ROOT) -> Dict[str, pa.Table]:
+    """
+    Open the fact snapshot of `version` (the newest by default) as Arrow tables.
+    The files are memory-mapped and uncompressed, so the tables point into the
+    page cache instead of being copied, and opening them again costs nothing.
+    Use `table.to_pandas()` for a DataFrame.
+    """
+    if version is None:
+        versions = fact_versions(root)
+        if not versions:
+            raise FileNotFoundError(f"No fact snapshot under {root}; run `de-analytics extract-facts`.")
+        version = versions[-1]
+    directory = os.path.join(root, f"v{version}", "facts")
+    tables = {}
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".arrow"):
+            with pa.memory_map(os.path.join(directory, name), "r") as source:
+                tables[name[:-len(".arrow")]] = pa.ipc.open_file(source).read_all()
+    return tables
@@ -7,12 +7,18 @@ load_dotenv()
 from typing import AsyncGenerator
 from fastapi import HTTPException
 import os
+import asyncio
 import asyncpg
 from app.core.config import logger_settings, Settings
 logger = logger_settings.get_logger(__name__)
-from typing import Optional, List, Dict, Tuple
+from typing import Any, Optional, List, Dict, Tuple
 from datetime import datetime
 from app.sql.main import SqlQuery
+from app.services.dataset_service import DatasetVersionService
+from app.services.insight_service import InsightViewService
+from app.services.ingest_service import IngestService
+from app.services.migration_service import MigrationService
+from app.services.pool_service import InstrumentedPool
 from asyncpg import Connection, Pool
 import csv
 import json
@@ -28,69 +34,96 @@ class AuthDatabaseService:
             connection: asyncpg connection object.
         """
         try:
-            # Connect to Postgres without specifying a database first
-            initial_connection = await asyncpg.connect(
-                host=logger_settings.AUTH_DB_HOST,
-                user=logger_settings.AUTH_DB_USER,
-                password=logger_settings.AUTH_DB_PASSWORD,
-                port=int(logger_settings.AUTH_DB_PORT),
-                database='postgres'  # default database
-            )
-
-            db_name = logger_settings.AUTH_DB
-            # Check if database exists
-            db_exists = await initial_connection.fetchval(
-                "SELECT 1 FROM pg_database WHERE datname=$1", db_name
-            )
-            if not db_exists:
-                await initial_connection.execute(f'CREATE DATABASE "{db_name}"')
-                print(f"Database '{db_name}' created successfully.")
-
-            await initial_connection.close()
-
-            # Reconnect to the specified database
-            connection = await asyncpg.connect(
-                host=logger_settings.AUTH_DB_HOST,
-                user=logger_settings.AUTH_DB_USER,
-                password=logger_settings.AUTH_DB_PASSWORD,
-                database=db_name,
-                port=int(logger_settings.AUTH_DB_PORT)
-            )
-            return connection
+            try:
+                return await AuthDatabaseService._connect(logger_settings.AUTH_DB)
+            except asyncpg.InvalidCatalogNameError:
+                await AuthDatabaseService._create_database()
+                return await AuthDatabaseService._connect(logger_settings.AUTH_DB)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error connecting to the database: {e}")
 
+    @staticmethod
+    async def _connect(database: str) -> asyncpg.Connection:
+        return await asyncpg.connect(
+            host=logger_settings.AUTH_DB_HOST,
+            user=logger_settings.AUTH_DB_USER,
+            password=logger_settings.AUTH_DB_PASSWORD,
+            database=database,
+            port=int(logger_settings.AUTH_DB_PORT)
+        )
+
+    @staticmethod
+    async def _create_database() -> None:
+        """First boot only: create the database from the default one."""
+        db_name = logger_settings.AUTH_DB
+        initial_connection = await AuthDatabaseService._connect('postgres')
+        try:
+            await initial_connection.execute(f'CREATE DATABASE "{db_name}"')
+            print(f"Database '{db_name}' created successfully.")
+        except asyncpg.DuplicateDatabaseError:
+            pass
+        finally:
+            await initial_connection.close()
+
     @staticmethod
     async def get_db() -> AsyncGenerator[asyncpg.Connection, None]:
         """
-        Provides an async database connection to FastAPI endpoints.
+        Provides a pooled database connection to FastAPI endpoints.
         Yields:
             asyncpg.Connection: Postgres connection instance.
         """
-        connection = await AuthDatabaseService.connection()
-        try:
-            yield connection
-        except Exception as e:
-            raise RuntimeError(f"Session error: {e}")
-        finally:
-            await connection.close()
-
-    _pool: Pool = None
+        pool = await AuthDatabaseService.get_pool()
+        async with pool.acquire() as connection:
+            try:
+                yield connection
+            except Exception as e:
+                raise RuntimeError(f"Session error: {e}")
+
+    _pool: Optional[InstrumentedPool] = None
+    _pool_lock = asyncio.Lock()
     @classmethod
-    async def get_pool(cls) -> Pool:
+    async def get_pool(cls) -> InstrumentedPool:
+        """
+        The process-wide pool, created and warmed on first use (normally
+        at startup) and closed by `auth_shutdown`.
+        """
         if cls._pool is None:
-            cls._pool = await asyncpg.create_pool(
-                host=logger_settings.AUTH_DB_HOST,
-                user=logger_settings.AUTH_DB_USER,
-                password=logger_settings.AUTH_DB_PASSWORD,
-                database=logger_settings.AUTH_DB,
-                port=logger_settings.AUTH_DB_PORT,
-                min_size=1,
-                max_size=10
-            )
+            async with cls._pool_lock:
+                if cls._pool is None:
+                    try:
+                        pool = await cls._create_pool()
+                    except asyncpg.InvalidCatalogNameError:
+                        await cls._create_database()
+                        pool = await cls._create_pool()
+                    await pool.warm_up()
+                    cls._pool = pool
         return cls._pool
 
+    @staticmethod
+    async def _create_pool() -> InstrumentedPool:
+        pool = await asyncpg.create_pool(
+            host=logger_settings.AUTH_DB_HOST,
+            user=logger_settings.AUTH_DB_USER,
+            password=logger_settings.AUTH_DB_PASSWORD,
+            database=logger_settings.AUTH_DB,
+            port=logger_settings.AUTH_DB_PORT,
+            min_size=logger_settings.DB_POOL_MIN_SIZE,
+            max_size=logger_settings.DB_POOL_MAX_SIZE,
+            max_queries=logger_settings.DB_POOL_MAX_QUERIES,
+            max_inactive_connection_lifetime=logger_settings.DB_POOL_MAX_IDLE,
+            statement_cache_size=logger_settings.DB_STATEMENT_CACHE_SIZE,
+            max_cached_statement_lifetime=logger_settings.DB_STATEMENT_CACHE_LIFETIME
+        )
+        return InstrumentedPool(pool, logger_settings.DB_POOL_MIN_SIZE, logger_settings.DB_POOL_MAX_SIZE)
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Any]:
+        """Acquire wait, in-use count and queue depth of the pool."""
+        if cls._pool is None:
+            return {"size": 0, "in_use": 0, "waiting": 0}
+        return cls._pool.stats()
+
     @staticmethod
     async def ping_database():
         """
@@ -99,185 +132,86 @@ class AuthDatabaseService:
             bool: True if the connection is successful, False otherwise.
         """
         try:
-            connection = await AuthDatabaseService.connection()
-            result = await connection.fetchval("SELECT 1")
-            return result == 1
+            pool = await AuthDatabaseService.get_pool()
+            return await pool.fetchval("SELECT 1") == 1
         except Exception:
             return False
-        finally:
-            await connection.close()
 
-    @staticmethod
-    async def auth_shutdown():
+    @classmethod
+    async def auth_shutdown(cls):
         """
-        Close the Postgres connection during shutdown.
+        Close the pool during shutdown, letting in-flight queries finish.
         """
-        connection = await AuthDatabaseService.connection()
-        await connection.close()
+        pool, cls._pool = cls._pool, None
+        if pool is not None:
+            await pool.close()
     
     @staticmethod
-    async def insert_campaigns(csv_file: str, conn: asyncpg.Connection):
-        # Open CSV
-        with open(csv_file, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = []
-            for row in reader:
-                # Clean numeric columns
-                for col in ['Daily revenue','Sent','Non delivered','Hard bounces','Soft bounces',
-                            'Delivered','Total opens','Opens','Apple MPP Opens','Total clicked','Clicked']:
-                    row[col] = float(row[col]) if row[col] not in (None,'') else 0.0
-                
-                # Convert percentages to decimal
-                for col in ['Non delivered rate','Trackable open rate','Click rate','Click-to-Open rate',
-                            'Unsubscription rate','Delivered rate','Hard Bounces rate','Soft Bounces rate','Complaints rate']:
-                    value = row.get(col)
-                    if value is None or value == '':
-                        row[col] = 0.0
-                    else:
-                        row[col] = float(value.strip('%')) / 100
-                
-                # Convert sending date
-                row['Sending date'] = datetime.strptime(row['Sending date'], '%Y-%m-%d') if row['Sending date'] else None
-
-                # JSON columns
-                for col in ['Audience Segment A IDs','Audience Segment B IDs']:
-                    val = row.get(col)
-                    if val in (None,''):
-                        row[col] = json.dumps([])
-                    else:
-                        try:
-                            # ensure it's a list stored as string
-                            row[col] = json.dumps(eval(val))
-                        except Exception:
-                            row[col] = json.dumps([])
-
-                # Prepare tuple for insertion
-                rows.append((
-                    int(row['campaign_id']),
-                    row['Campaign Name'],
-                    row['audience_segment_a'],
-                    row['audience_segment_b'],
-                    row['Name from'],
-                    row['Sending date'],
-                    row['Daily revenue'],
-                    row['Subject'],
-                    int(row['Sent']),
-                    int(row['Non delivered']),
-                    int(row['Hard bounces']),
-                    int(row['Soft bounces']),
-                    row['Non delivered rate'],
-                    int(row['Delivered']),
-                    int(row['Total opens']),
-                    int(row['Opens']),
-                    row['Trackable open rate'],
-                    int(row['Apple MPP Opens']),
-                    int(row['Total clicked']),
-                    int(row['Clicked']),
-                    row['Click rate'],
-                    row['Click-to-Open rate'],
-                    int(row['Unsubscribed']),
-                    row['Unsubscription rate'],
-                    row['Delivered rate'],
-                    row['Hard Bounces rate'],
-                    row['Soft Bounces rate'],
-                    int(row['Complaints']),
-                    row['Complaints rate'],
-                    row['Audience Segment A IDs'],
-                    row['Audience Segment B IDs']
-                ))
-
-        # Insert query
-        await conn.executemany(
-            """
-            INSERT INTO records.email_campaigns (
-                campaign_id,campaign_name,audience_segment_a,audience_segment_b,name_from,sending_date,daily_revenue,
-                subject,sent,non_delivered,hard_bounces,soft_bounces,non_delivered_rate,delivered,total_opens,opens,
-                trackable_open_rate,apple_mpp_opens,total_clicked,clicked,click_rate,click_to_open_rate,unsubscribed,
-                unsubscription_rate,delivered_rate,hard_bounces_rate,soft_bounces_rate,complaints,complaints_rate,
-                audience_segment_a_ids,audience_segment_b_ids
-            ) VALUES (
-                $1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13,$14,$15,$16,$17,$18,$19,$20,$21,$22,$23,$24,$25,$26,$27,$28,$29,$30,$31
-            )
-            """,
-            rows
-        )
-        print(f"{len(rows)} campaign records inserted successfully.")
+    async def insert_campaigns(csv_file: str, conn: asyncpg.Connection) -> int:
+        """
+        Bulk load the campaigns export, see `IngestService`.
+        """
+        count = await IngestService.ingest_campaigns(conn, csv_file)
+        print(f"{count} campaign records inserted or updated.")
+        return count
     
     @staticmethod
-    async def insert_segments(csv_file: str, conn: asyncpg.Connection):
-        with open(csv_file, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = []
-            for row in reader:
-                rows.append((
-                    int(row['Segment ID']),
-                    row['Segment Name'],
-                    row['Segment Folder'],
-                    row['Logic Type'],
-                    row['Filter 1 Type'],
-                    row['Filter 1 Rule'],
-                    row['Filter 1 Values'],
-                    row['Connector 1'],
-                    row['Filter 2 Type'],
-                    row['Filter 2 Rule'],
-                    row['Filter 2 Values'],
-                    row['Connector 2'],
-                    row['OR Filter 1 Type'],
-                    row['OR Filter 1 Rule'],
-                    row['OR Filter 1 Values'],
-                    row['OR Filter 2 Type'],
-                    row['OR Filter 2 Rule'],
-                    row['OR Filter 2 Values'],
-                    row['Uses Engagement'].strip().lower() == 'yes' if row['Uses Engagement'] else False,
-                    row['Uses Date Rule'].strip().lower() == 'yes' if row['Uses Date Rule'] else False,
-                    row['Notes']
-                ))
-        
-        await conn.executemany(
-            """
-            INSERT INTO records.segments (
-                segment_id,segment_name,segment_folder,logic_type,filter_1_type,filter_1_rule,filter_1_values,
-                connector_1,filter_2_type,filter_2_rule,filter_2_values,connector_2,
-                or_filter_1_type,or_filter_1_rule,or_filter_1_values,
-                or_filter_2_type,or_filter_2_rule,or_filter_2_values,
-                uses_engagement,uses_date_rule,notes
-            ) VALUES (
-                $1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13,$14,$15,$16,$17,$18,$19,$20,$21
-            )
-            """,
-            rows
-        )
-        print(f"{len(rows)} segment records inserted successfully.")
+    async def insert_segments(csv_file: str, conn: asyncpg.Connection) -> int:
+        """
+        Bulk load the segments export, see `IngestService`.
+        """
+        count = await IngestService.ingest_segments(conn, csv_file)
+        print(f"{count} segment records inserted or updated.")
+        return count
     
     @staticmethod
     async def ensure_data_exists():
         """
-        Checks if the `records` schema exist and creates them if needed.
+        Brings the `records` schema up to date with the pending migrations,
+        then loads whatever changed in the exports. Only the worker holding
+        the ingest lock does this; the others go straight to serving.
         """        
+        pool = await AuthDatabaseService.get_pool()
+        async with pool.acquire() as connection:
+            await AuthDatabaseService._ensure_data_exists(connection)
+
+    @staticmethod
+    async def _ensure_data_exists(connection: asyncpg.Connection):
+        locked = False
         try:
-            connection = await AuthDatabaseService.connection()
-            print("connected sucessfully")
-            # Schema & Table creation
-            create_table_files = [
-                await SqlQuery.read_sql("com/de/data/create_schema"),
-                await SqlQuery.read_sql("com/de/data/email_campaigns"),
-                await SqlQuery.read_sql("com/de/data/segments"),
-            ]
-            
-            for query in create_table_files:
-                if query:
-                    await connection.execute(query)
-            print("tables are created successfully")
+            # Schema & Table creation, only the scripts not applied yet
+            applied = await MigrationService.migrate(connection)
+            print(f"{applied} schema migrations applied")
+            locked = await IngestService.try_lock(connection)
+            if not locked:
+                print("another worker is ingesting, skipping")
+                return
             PATH_CAMPAIGNS = os.path.join(logger_settings.DATA_DIR, f'2nd_cleaned_campaign_data.csv')
             PATH_SEGMENTS = os.path.join(logger_settings.DATA_DIR, f'1st_cleaned_segments.csv')
 
-            await AuthDatabaseService.insert_campaigns(PATH_CAMPAIGNS, connection)
-            await AuthDatabaseService.insert_segments(PATH_SEGMENTS, connection)
+            version = None
+            async with connection.transaction():
+                campaigns = await AuthDatabaseService.insert_campaigns(PATH_CAMPAIGNS, connection)
+                segments = await AuthDatabaseService.insert_segments(PATH_SEGMENTS, connection)
+                if campaigns:
+                    await connection.execute(await SqlQuery.read_sql("com/de/data/sync_campaign_segments"))
+                # New views are built with the data; existing ones need a refresh.
+                # Both happen before the bump and commit with it, so a version
+                # never comes with views still holding the previous data
+                kept = await InsightViewService.ensure_views(connection)
+                if campaigns or segments:
+                    await InsightViewService.refresh_views(connection, kept)
+                    # Every process drops results computed on the previous data
+                    version = await DatasetVersionService.bump(connection)
+            # Subscribers run only once the new data is committed and visible
+            if version is not None:
+                await DatasetVersionService.apply(version)
 
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error ensuring table exists: {e}")
         finally:
-            await connection.close()
+            if locked:
+                await IngestService.unlock(connection)
             
 
 
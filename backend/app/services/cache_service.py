@@ -0,0 +1,264 @@
+import asyncio
+import functools
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import redis.asyncio as redis
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from app.core.config import logger_settings, Settings
+from app.services.circuit_breaker import CircuitOpenError, DB_UNAVAILABLE_ERRORS, db_breaker
+from app.services.dataset_service import DatasetVersionService
+from app.services.snapshot_service import SnapshotService
+logger = logger_settings.get_logger(__name__)
+
+# Handler arguments that identify a resource rather than the request
+_UNCACHED_ARGS = ("pool", "conn", "db")
+
+class LocalCache:
+    """
+    Bounded in-process LRU with a per-entry TTL.
+    Entries outlive their TTL by `stale_ttl` so they can still be served
+    while a refresh runs or the database is down.
+    """
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, bool]]:
+        """
+        Returns:
+            (value, is_fresh) or None once the entry is past its stale window.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        fresh_until, stale_until, value = entry
+        now = time.monotonic()
+        if stale_until < now:
+            self._data.pop(key, None)
+            return None
+        self._data.move_to_end(key)
+        return value, fresh_until >= now
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self.get_entry(key)
+        return entry[0] if entry and entry[1] else None
+
+    def set(self, key: str, value: Any, ttl: float = None, stale_ttl: float = None) -> None:
+        fresh_until = time.monotonic() + (ttl or self.ttl)
+        stale_until = fresh_until + (self.stale_ttl if stale_ttl is None else stale_ttl)
+        self._data[key] = (fresh_until, stale_until, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class CacheService:
+    """
+    Result cache for the insight endpoints.
+    Tier 1 is an in-process LRU, tier 2 is the shared Redis from
+    docker-compose. Concurrent requests for the same key share one
+    in-flight load, so a cold page hit by many analysts runs each
+    query once. Expired entries are served stale while a background
+    refresh runs, and loads go through the database circuit breaker.
+    """
+    _local = LocalCache(logger_settings.CACHE_LOCAL_MAXSIZE, logger_settings.CACHE_TTL,
+                        logger_settings.CACHE_STALE_TTL)
+    _redis: Optional[redis.Redis] = None
+    _redis_retry_at: float = 0.0
+    _inflight: Dict[str, asyncio.Task] = {}
+    stats: Dict[str, int] = {"local_hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0,
+                             "stale_served": 0, "refresh_failures": 0}
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        """
+        Keys carry the dataset version, so entries written before an ingest
+        are never read after it, in any worker.
+        """
+        payload = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return f"{logger_settings.CACHE_PREFIX}:{DatasetVersionService.key(namespace, digest)}"
+
+    @classmethod
+    async def get_redis(cls) -> Optional[redis.Redis]:
+        """
+        Return the Redis client, or None while Redis is unavailable.
+        A failed connection disables the tier for `CACHE_REDIS_RETRY` seconds.
+        """
+        if not logger_settings.CACHE_REDIS_ENABLED or time.monotonic() < cls._redis_retry_at:
+            return None
+        if cls._redis is None:
+            try:
+                client = redis.from_url(
+                    f"redis://{logger_settings.REDIS_HOST}:{logger_settings.REDIS_PORT}",
+                    decode_responses=True,
+                    socket_connect_timeout=logger_settings.CACHE_REDIS_TIMEOUT,
+                    socket_timeout=logger_settings.CACHE_REDIS_TIMEOUT,
+                )
+                await client.ping()
+                cls._redis = client
+            except Exception as e:
+                logger.warning(f"Redis cache tier unavailable: {e}")
+                cls._redis_retry_at = time.monotonic() + logger_settings.CACHE_REDIS_RETRY
+                return None
+        return cls._redis
+
+    @classmethod
+    async def _redis_failed(cls, e: Exception) -> None:
+        logger.warning(f"Redis cache tier error: {e}")
+        cls._redis_retry_at = time.monotonic() + logger_settings.CACHE_REDIS_RETRY
+        client, cls._redis = cls._redis, None
+        if client is not None:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+    @classmethod
+    async def _redis_get(cls, key: str) -> Optional[Tuple[Any, bool]]:
+        client = await cls.get_redis()
+        if client is None:
+            return None
+        try:
+            raw = await client.get(key)
+        except Exception as e:
+            await cls._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["fresh_until"] >= time.time()
+
+    @classmethod
+    async def _redis_set(cls, key: str, value: Any, ttl: float) -> None:
+        client = await cls.get_redis()
+        if client is None:
+            return
+        entry = {"fresh_until": time.time() + ttl, "value": value}
+        try:
+            await client.set(key, json.dumps(entry, separators=(",", ":")),
+                             ex=int(ttl + logger_settings.CACHE_STALE_TTL))
+        except Exception as e:
+            await cls._redis_failed(e)
+
+    @classmethod
+    async def _fetch(cls, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        """Run the loader through the breaker and store the result in both tiers."""
+        value = jsonable_encoder(await db_breaker.call(loader))
+        cls._local.set(key, value, ttl)
+        await cls._redis_set(key, value, ttl)
+        return value
+
+    @classmethod
+    async def _refresh(cls, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> None:
+        try:
+            await cls._fetch(key, loader, ttl)
+        except Exception as e:
+            cls.stats["refresh_failures"] += 1
+            logger.warning(f"Background refresh of {key} failed: {e!r}")
+
+    @classmethod
+    def _start(cls, key: str, coro, replace: bool = False) -> asyncio.Task:
+        task = cls._inflight.get(key)
+        if task is None or replace:
+            task = asyncio.ensure_future(coro)
+            cls._inflight[key] = task
+            task.add_done_callback(
+                lambda done: cls._inflight.pop(key, None) if cls._inflight.get(key) is done else None
+            )
+        else:
+            coro.close()
+            cls.stats["coalesced"] += 1
+        return task
+
+    @classmethod
+    async def _load(cls, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        entry = await cls._redis_get(key)
+        if entry is not None:
+            value, fresh = entry
+            cls.stats["redis_hits"] += 1
+            if fresh:
+                cls._local.set(key, value, ttl)
+                return value
+            # Stale in Redis: answer now, refresh behind this load
+            cls.stats["stale_served"] += 1
+            cls._local.set(key, value, ttl=-1)
+            if not db_breaker.is_open:
+                cls._start(key, cls._refresh(key, loader, ttl), replace=True)
+            return value
+        cls.stats["misses"] += 1
+        return await cls._fetch(key, loader, ttl)
+
+    @classmethod
+    async def get_or_load(cls, key: str, loader: Callable[[], Awaitable[Any]], ttl: float = None) -> Any:
+        """
+        Return the cached value for `key`, loading it at most once across
+        concurrent callers. A stale entry is returned immediately and
+        refreshed in the background.
+        """
+        ttl = ttl or logger_settings.CACHE_TTL
+        entry = cls._local.get_entry(key)
+        if entry is not None:
+            value, fresh = entry
+            if fresh:
+                cls.stats["local_hits"] += 1
+            else:
+                cls.stats["stale_served"] += 1
+                if not db_breaker.is_open:
+                    cls._start(key, cls._refresh(key, loader, ttl))
+            return value
+        task = cls._start(key, cls._load(key, loader, ttl))
+        # Shielded so a client disconnect doesn't cancel the shared load
+        return await asyncio.shield(task)
+
+    @classmethod
+    def cached(cls, namespace: str, ttl: float = None):
+        """
+        Decorator for endpoint handlers. The key is built from the
+        handler's keyword arguments, leaving out pools and connections.
+        Misses read the dashboard snapshot before running the handler.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                params = {k: v for k, v in kwargs.items() if k not in _UNCACHED_ARGS}
+                # Precomputed payloads first, the handler itself otherwise
+                load = lambda: SnapshotService.read_through(namespace, params, kwargs.get("pool"),
+                                                            lambda: func(*args, **kwargs))
+                try:
+                    # Without the cache the breaker still guards the database
+                    if not logger_settings.CACHE_ENABLED:
+                        return await db_breaker.call(load)
+                    return await cls.get_or_load(cls.make_key(namespace, params), load, ttl)
+                except CircuitOpenError as e:
+                    raise HTTPException(status_code=503, detail="Database temporarily unavailable",
+                                        headers={"Retry-After": str(int(e.retry_after))})
+                except DB_UNAVAILABLE_ERRORS:
+                    raise HTTPException(status_code=503, detail="Database temporarily unavailable")
+            wrapper.cache_namespace = namespace
+            return wrapper
+        return decorator
+
+    @classmethod
+    async def on_dataset_version(cls, version: int) -> None:
+        # Older versions can never be hit again; free the memory now
+        cls._local.clear()
+
+    @classmethod
+    async def close(cls) -> None:
+        client, cls._redis = cls._redis, None
+        if client is not None:
+            await client.aclose()
+
+DatasetVersionService.subscribe(CacheService.on_dataset_version)
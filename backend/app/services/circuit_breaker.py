@@ -0,0 +1,100 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional, Any
+import asyncpg
+from app.core.config import logger_settings, Settings
+logger = logger_settings.get_logger(__name__)
+
+# Errors that say the database is unreachable or overloaded, as opposed to a bad query
+DB_UNAVAILABLE_ERRORS = (
+    asyncio.TimeoutError,
+    OSError,
+    asyncpg.InterfaceError,
+    asyncpg.PostgresConnectionError,
+    asyncpg.CannotConnectNowError,
+    asyncpg.TooManyConnectionsError,
+)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the database while the breaker is open."""
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures.
+    While open every call fails fast; after `reset_timeout` one trial
+    call is let through (half-open) and its outcome closes or re-opens
+    the circuit.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, call_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.call_timeout = call_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+
+    def _allow(self) -> None:
+        if self.state == self.CLOSED:
+            return
+        elapsed = time.monotonic() - self.opened_at
+        if self.state == self.OPEN and elapsed >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return
+        raise CircuitOpenError(self.name, max(self.reset_timeout - elapsed, 1))
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_running = False
+
+    def record_failure(self, e: Exception) -> None:
+        self.failures += 1
+        self._trial_running = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.error(f"Circuit '{self.name}' opened after {self.failures} failures: {e!r}")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    async def call(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `fn` under the breaker with a timeout. Only availability errors
+        count as failures; query errors pass through untouched.
+        """
+        self._allow()
+        try:
+            result = await asyncio.wait_for(fn(), self.call_timeout)
+        except DB_UNAVAILABLE_ERRORS as e:
+            self.record_failure(e)
+            raise
+        except asyncpg.PostgresError:
+            # The database answered, the query was wrong
+            self.record_success()
+            raise
+        except BaseException:
+            self._trial_running = False
+            raise
+        self.record_success()
+        return result
+
+db_breaker = CircuitBreaker(
+    "postgres",
+    failure_threshold=logger_settings.DB_BREAKER_FAILURES,
+    reset_timeout=logger_settings.DB_BREAKER_RESET,
+    call_timeout=logger_settings.DB_QUERY_TIMEOUT,
+)
@@ -0,0 +1,132 @@
+import asyncio
+from typing import Awaitable, Callable, List, Optional
+import asyncpg
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlQuery
+logger = logger_settings.get_logger(__name__)
+
+class DatasetVersionService:
+    """
+    Tracks `records.dataset_version`, the counter bumped by every ingest.
+    Each process keeps the current value in memory and learns about new
+    versions through Postgres LISTEN/NOTIFY, so caches in every worker
+    can key on it and drop stale entries without polling.
+    """
+    _version: int = 0
+    _subscribers: List[Callable[[int], Awaitable[None]]] = []
+    _listen_conn: Optional[asyncpg.Connection] = None
+    _supervisor: Optional[asyncio.Task] = None
+
+    @classmethod
+    def current(cls) -> int:
+        return cls._version
+
+    @classmethod
+    def key(cls, *parts) -> str:
+        """
+        Build a key scoped to the current dataset version, for result
+        caches, export artifacts and rendered charts alike.
+        """
+        return ":".join([f"v{cls._version}", *map(str, parts)])
+
+    @classmethod
+    def subscribe(cls, callback: Callable[[int], Awaitable[None]]) -> None:
+        """Register a coroutine called with the new version after each change."""
+        if callback not in cls._subscribers:
+            cls._subscribers.append(callback)
+
+    @classmethod
+    async def apply(cls, version: int) -> None:
+        """Move this process to `version` and run the subscribers, if it is newer."""
+        if version <= cls._version:
+            return
+        previous, cls._version = cls._version, version
+        logger.info(f"Dataset version changed {previous} -> {version}.")
+        for callback in list(cls._subscribers):
+            try:
+                await callback(version)
+            except Exception as e:
+                logger.error(f"Dataset version subscriber {callback!r} failed: {e}")
+
+    @classmethod
+    async def refresh(cls, conn: asyncpg.Connection) -> int:
+        version = await conn.fetchval("SELECT version FROM records.dataset_version")
+        await cls.apply(int(version or 0))
+        return cls._version
+
+    @classmethod
+    async def bump(cls, conn: asyncpg.Connection) -> int:
+        """
+        Increment the version and NOTIFY the listeners, both of which take
+        effect when the surrounding transaction commits. The caller passes
+        the returned version to `apply` once it has committed, so this
+        process never runs ahead of the database.
+        """
+        query = await SqlQuery.read_sql_full(
+            "com/de/data/bump_dataset_version",
+            channel=logger_settings.DATASET_VERSION_CHANNEL
+        )
+        row = await conn.fetchrow(query)
+        return int(row["version"])
+
+    @classmethod
+    def _on_notify(cls, conn, pid, channel, payload) -> None:
+        try:
+            version = int(payload)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed {channel} payload: {payload!r}")
+            return
+        asyncio.ensure_future(cls.apply(version))
+
+    @classmethod
+    async def _connect(cls) -> asyncpg.Connection:
+        conn = await asyncpg.connect(
+            host=logger_settings.AUTH_DB_HOST,
+            user=logger_settings.AUTH_DB_USER,
+            password=logger_settings.AUTH_DB_PASSWORD,
+            database=logger_settings.AUTH_DB,
+            port=int(logger_settings.AUTH_DB_PORT)
+        )
+        await conn.add_listener(logger_settings.DATASET_VERSION_CHANNEL, cls._on_notify)
+        # Catch up on anything bumped while we were not listening
+        await cls.refresh(conn)
+        return conn
+
+    @classmethod
+    async def _supervise(cls) -> None:
+        delay = 1
+        while True:
+            try:
+                if cls._listen_conn is None or cls._listen_conn.is_closed():
+                    cls._listen_conn = await cls._connect()
+                    delay = 1
+                await asyncio.sleep(logger_settings.DATASET_VERSION_CHECK_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Dataset version listener error, retrying in {delay}s: {e}")
+                cls._listen_conn = None
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60)
+
+    @classmethod
+    async def start_listener(cls) -> None:
+        """
+        Open the dedicated LISTEN connection and keep it alive.
+        """
+        if cls._supervisor is None:
+            cls._listen_conn = await cls._connect()
+            cls._supervisor = asyncio.create_task(cls._supervise())
+
+    @classmethod
+    async def stop_listener(cls) -> None:
+        if cls._supervisor is not None:
+            cls._supervisor.cancel()
+            try:
+                await cls._supervisor
+            except asyncio.CancelledError:
+                pass
+            cls._supervisor = None
+        conn, cls._listen_conn = cls._listen_conn, None
+        if conn is not None and not conn.is_closed():
+            await conn.close()
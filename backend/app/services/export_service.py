@@ -0,0 +1,455 @@
+import asyncio
+import csv
+import datetime
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from typing import AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple
+import asyncpg
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlQuery
+from app.services.auth_service import AuthDatabaseService
+from app.services.dataset_service import DatasetVersionService
+logger = logger_settings.get_logger(__name__)
+
+# Rows per worksheet, header included; longer tables continue on a new sheet
+_EXCEL_MAX_ROWS = 1048576
+
+# Postgres type -> Arrow type; anything else is exported as text
+_ARROW_TYPES = {
+    "int2": pa.int16(), "int4": pa.int32(), "int8": pa.int64(),
+    "float4": pa.float32(), "float8": pa.float64(), "bool": pa.bool_(),
+    "date": pa.date32(), "timestamp": pa.timestamp("us"),
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+}
+
+# format -> directory and extension inside the zip
+COLUMNAR_FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+
+# format -> name of the downloaded archive
+EXPORT_FILENAMES = {"zip": "data.zip", "parquet": "data-parquet.zip", "arrow": "data-arrow.zip"}
+
+# Directory of a version holding the memory-mappable fact tables
+FACTS_DIRNAME = "facts"
+
+class _Drain(io.RawIOBase):
+    """
+    Write-only sink for `zipfile`. Everything written is kept until
+    `drain` hands it out, so the archive can be sent as it is produced.
+    Not seekable, which makes zipfile emit data descriptors.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+def _excel_value(value):
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        # Excel has no time zones
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+class _TableWriter:
+    """CSV entry and write-only workbook for one table, fed chunk by chunk."""
+    def __init__(self, archive: zipfile.ZipFile, table: str, columns: List[str]):
+        self.table = table
+        self.columns = columns
+        self.entry = archive.open(f"csv/{table}.csv", "w", force_zip64=True)
+        self.text = io.TextIOWrapper(self.entry, encoding="utf-8", newline="")
+        self.csv = csv.writer(self.text)
+        self.csv.writerow(columns)
+        # write_only sheets spool rows to a temp file instead of keeping cells
+        self.workbook = Workbook(write_only=True)
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self) -> None:
+        self.sheets += 1
+        self.sheet = self.workbook.create_sheet(self.table if self.sheets == 1 else f"{self.table}_{self.sheets}")
+        self.sheet.append(self.columns)
+        self.sheet_rows = 1
+
+    def write(self, rows: List[asyncpg.Record]) -> None:
+        self.csv.writerows(rows)
+        for row in rows:
+            if self.sheet_rows == _EXCEL_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append([_excel_value(value) for value in row])
+            self.sheet_rows += 1
+
+    def close_csv(self) -> None:
+        self.text.close()
+
+    def save_workbook(self, file) -> None:
+        self.workbook.save(file)
+        file.seek(0)
+
+def _arrow_column(name: str, udt: str, precision: Optional[int],
+                  scale: Optional[int]) -> Tuple[pa.Field, Optional[Callable]]:
+    """Arrow field for a column and the conversion its values need, if any."""
+    if udt in _ARROW_TYPES:
+        return pa.field(name, _ARROW_TYPES[udt]), None
+    if udt == "numeric":
+        if precision is not None and precision <= 38:
+            return pa.field(name, pa.decimal128(precision, scale or 0)), None
+        return pa.field(name, pa.float64()), float
+    if udt in ("json", "jsonb") and name.endswith("_ids"):
+        # Segment ID arrays, e.g. audience_segment_a_ids
+        return pa.field(name, pa.list_(pa.int64())), json.loads
+    if udt in ("text", "varchar", "bpchar", "json", "jsonb"):
+        return pa.field(name, pa.string()), None
+    return pa.field(name, pa.string()), str
+
+class _ColumnarWriter:
+    """
+    Parquet or Arrow IPC file for one table, fed chunk by chunk.
+    Uncompressed Arrow files can be memory-mapped without copying.
+    """
+    def __init__(self, file, fields: List[Tuple[pa.Field, Optional[Callable]]], fmt: str,
+                 compressed: bool = True):
+        self.schema = pa.schema([field for field, _ in fields])
+        self.converters = [convert for _, convert in fields]
+        compression = logger_settings.EXPORT_COLUMNAR_COMPRESSION if compressed else None
+        if fmt == "parquet":
+            self.writer = pq.ParquetWriter(file, self.schema, compression=compression)
+        else:
+            self.writer = pa.ipc.new_file(file, self.schema,
+                                          options=pa.ipc.IpcWriteOptions(compression=compression))
+        self.file = file
+
+    def write(self, rows: List[asyncpg.Record]) -> None:
+        arrays = []
+        for values, field, convert in zip(zip(*rows), self.schema, self.converters):
+            if convert is not None:
+                values = [None if value is None else convert(value) for value in values]
+            arrays.append(pa.array(values, type=field.type))
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+        self.file.seek(0)
+
+class ExportService:
+    """
+    Streaming export of the `records` tables as one zip of CSV and XLSX files.
+    Rows are read through a server-side cursor and written chunk by chunk,
+    and the archive is yielded as it grows, so memory stays flat
+    whatever the table sizes.
+    """
+    @staticmethod
+    async def tables(conn: asyncpg.Connection) -> List[str]:
+        rows = await conn.fetch(
+            await SqlQuery.read_sql("com/de/data/export_tables"),
+            logger_settings.EXPORT_SCHEMA, logger_settings.EXPORT_EXCLUDED_TABLES
+        )
+        return [row["table_name"] for row in rows]
+
+    @staticmethod
+    async def _cursor(conn: asyncpg.Connection, table: str):
+        statement = await conn.prepare(await SqlQuery.read_sql_full(
+            "com/de/data/export_table", schema=logger_settings.EXPORT_SCHEMA, table=table
+        ))
+        return statement, await statement.cursor()
+
+    @staticmethod
+    async def _copy_entry(archive: zipfile.ZipFile, sink: _Drain, name: str, file) -> AsyncIterator[bytes]:
+        """Add a finished temp file to the archive, yielding as it is written."""
+        with archive.open(name, "w", force_zip64=True) as entry:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                await asyncio.to_thread(entry.write, block)
+                data = sink.drain()
+                if data:
+                    yield data
+
+    @staticmethod
+    async def _zip(conn: asyncpg.Connection, tables: List[str]) -> AsyncIterator[bytes]:
+        """
+        Yield the zip archive in pieces. Tables without rows are left out.
+        """
+        sink = _Drain()
+        archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+        for table in tables:
+            statement, cursor = await ExportService._cursor(conn, table)
+            rows = await cursor.fetch(logger_settings.EXPORT_CHUNK_SIZE)
+            if not rows:
+                continue
+            columns = [attribute.name for attribute in statement.get_attributes()]
+            writer = _TableWriter(archive, table, columns)
+            total = 0
+            while rows:
+                # Encoding and deflate are CPU work; keep them off the event loop
+                await asyncio.to_thread(writer.write, rows)
+                total += len(rows)
+                data = sink.drain()
+                if data:
+                    yield data
+                rows = await cursor.fetch(logger_settings.EXPORT_CHUNK_SIZE)
+            writer.close_csv()
+            with tempfile.TemporaryFile() as workbook:
+                await asyncio.to_thread(writer.save_workbook, workbook)
+                async for data in ExportService._copy_entry(archive, sink, f"excel/{table}.xlsx", workbook):
+                    yield data
+            logger.info(f"Exported {total} rows of {table}.")
+        archive.close()
+        yield sink.drain()
+
+    @staticmethod
+    async def arrow_fields(conn: asyncpg.Connection, table: str) -> List[Tuple[pa.Field, Optional[Callable]]]:
+        rows = await conn.fetch(
+            await SqlQuery.read_sql("com/de/data/export_columns"), logger_settings.EXPORT_SCHEMA, table
+        )
+        return [
+            _arrow_column(row["column_name"], row["udt_name"], row["numeric_precision"], row["numeric_scale"])
+            for row in rows
+        ]
+
+    @staticmethod
+    async def _columnar(conn: asyncpg.Connection, fmt: str, tables: List[str]) -> AsyncIterator[bytes]:
+        """
+        Yield a zip of one typed Parquet or Arrow IPC file per table.
+        The files are compressed already, so entries are stored as-is.
+        """
+        extension = COLUMNAR_FORMATS[fmt]
+        sink = _Drain()
+        archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED)
+        for table in tables:
+            with tempfile.TemporaryFile() as file:
+                total = await ExportService.write_table(conn, table, file, fmt)
+                if not total:
+                    continue
+                async for data in ExportService._copy_entry(archive, sink, f"{fmt}/{table}.{extension}", file):
+                    yield data
+            logger.info(f"Exported {total} rows of {table} as {fmt}.")
+        archive.close()
+        yield sink.drain()
+
+    @staticmethod
+    async def write_table(conn: asyncpg.Connection, table: str, file, fmt: str, compressed: bool = True) -> int:
+        """Write one table as a Parquet or Arrow IPC file. Returns the row count."""
+        fields = await ExportService.arrow_fields(conn, table)
+        _, cursor = await ExportService._cursor(conn, table)
+        writer = _ColumnarWriter(file, fields, fmt, compressed)
+        total = 0
+        rows = await cursor.fetch(logger_settings.EXPORT_CHUNK_SIZE)
+        while rows:
+            await asyncio.to_thread(writer.write, rows)
+            total += len(rows)
+            rows = await cursor.fetch(logger_settings.EXPORT_CHUNK_SIZE)
+        await asyncio.to_thread(writer.close)
+        return total
+
+    @staticmethod
+    async def write(conn: asyncpg.Connection, fmt: str, tables: Optional[List[str]] = None) -> AsyncIterator[bytes]:
+        """
+        Yield the archive for `fmt`. Must run inside a transaction, which
+        cursors need; a repeatable read one keeps the tables consistent.
+        """
+        tables = tables or await ExportService.tables(conn)
+        chunks = ExportService._zip(conn, tables) if fmt == "zip" else ExportService._columnar(conn, fmt, tables)
+        async for data in chunks:
+            yield data
+
+    @staticmethod
+    async def stream(pool, fmt: str, tables: Optional[List[str]] = None) -> AsyncIterator[bytes]:
+        """Yield the archive for `fmt` from a pooled connection."""
+        async with pool.acquire() as conn:
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                async for data in ExportService.write(conn, fmt, tables):
+                    yield data
+
+class Artifact(NamedTuple):
+    fmt: str
+    version: int
+    path: str
+    sha256: str
+    size: int
+
+class ExportArtifactService:
+    """
+    Export archives built once per dataset version and kept under
+    `reports/exports/v{version}/` with a `.sha256` file next to each,
+    along with the `facts/` snapshot that `app.scripts.fileIO` loads.
+    Downloads of a built version are plain file sends; a missing one is
+    streamed live while a background build fills it in. The build is
+    guarded by an advisory lock so only one worker dumps the tables.
+    """
+    LOCK = "records.exports"
+    # (version, format) -> artifact found on disk
+    _found: Dict[Tuple[int, str], Artifact] = {}
+    _task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def version_dir(version: int) -> str:
+        return os.path.join(logger_settings.EXPORTS_DIR, f"v{version}")
+
+    @classmethod
+    def find(cls, fmt: str, version: Optional[int] = None) -> Optional[Artifact]:
+        """The built artifact for `fmt` at `version` (current by default), if any."""
+        version = DatasetVersionService.current() if version is None else version
+        artifact = cls._found.get((version, fmt))
+        if artifact is not None and os.path.exists(artifact.path):
+            return artifact
+        path = os.path.join(cls.version_dir(version), EXPORT_FILENAMES[fmt])
+        try:
+            with open(f"{path}.sha256", encoding="utf-8") as file:
+                checksum = file.read().split()[0]
+            size = os.path.getsize(path)
+        except (OSError, IndexError):
+            return None
+        artifact = Artifact(fmt, version, path, checksum, size)
+        cls._found[(version, fmt)] = artifact
+        return artifact
+
+    @classmethod
+    async def _build(cls, conn: asyncpg.Connection, fmt: str) -> Optional[Artifact]:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            # Read inside the snapshot, so the label matches the rows exported
+            version = int(await conn.fetchval("SELECT version FROM records.dataset_version") or 0)
+            if cls.find(fmt, version) is not None:
+                return None
+            directory = cls.version_dir(version)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, EXPORT_FILENAMES[fmt])
+            partial = f"{path}.{os.getpid()}.part"
+            digest, size = hashlib.sha256(), 0
+            try:
+                with open(partial, "wb") as file:
+                    # Disk writes and hashing stay off the event loop, like the encoding
+                    def append(data: bytes) -> None:
+                        file.write(data)
+                        digest.update(data)
+
+                    async for data in ExportService.write(conn, fmt):
+                        await asyncio.to_thread(append, data)
+                        size += len(data)
+                os.replace(partial, path)
+            finally:
+                if os.path.exists(partial):
+                    os.remove(partial)
+        with open(f"{path}.sha256", "w", encoding="utf-8") as file:
+            file.write(f"{digest.hexdigest()}  {EXPORT_FILENAMES[fmt]}\n")
+        logger.info(f"Built {fmt} export for dataset version {version}: {size:,} bytes.")
+        return cls.find(fmt, version)
+
+    @classmethod
+    async def build_facts(cls, conn: asyncpg.Connection) -> Optional[str]:
+        """
+        Write the fact tables as uncompressed Arrow IPC files under
+        `v{version}/facts/`, unless that version has them already.
+        The directory appears complete or not at all.
+        Returns:
+            str: the new directory, None if there was nothing to build.
+        """
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            version = int(await conn.fetchval("SELECT version FROM records.dataset_version") or 0)
+            directory = os.path.join(cls.version_dir(version), FACTS_DIRNAME)
+            if os.path.isdir(directory):
+                return None
+            partial = f"{directory}.{os.getpid()}.part"
+            os.makedirs(partial, exist_ok=True)
+            try:
+                for table in logger_settings.EXPORT_FACT_TABLES:
+                    with open(os.path.join(partial, f"{table}.arrow"), "wb") as file:
+                        total = await ExportService.write_table(conn, table, file, "arrow", compressed=False)
+                    logger.info(f"Wrote {total} rows of {table} to the fact snapshot.")
+                os.replace(partial, directory)
+            finally:
+                shutil.rmtree(partial, ignore_errors=True)
+        logger.info(f"Built the fact snapshot for dataset version {version}.")
+        return directory
+
+    @classmethod
+    def _prune(cls, keep: int) -> None:
+        """Delete all but the newest `keep` version directories."""
+        root = logger_settings.EXPORTS_DIR
+        if not os.path.isdir(root):
+            return
+        versions = sorted(
+            (int(name[1:]) for name in os.listdir(root) if name[:1] == "v" and name[1:].isdigit()),
+            reverse=True
+        )
+        for version in versions[keep:]:
+            shutil.rmtree(cls.version_dir(version), ignore_errors=True)
+            for key in [key for key in cls._found if key[0] == version]:
+                cls._found.pop(key, None)
+
+    @classmethod
+    async def build_missing(cls, pool) -> List[Artifact]:
+        """
+        Build every format missing for the current data, unless another
+        worker is already building.
+        """
+        built = []
+        async with pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", cls.LOCK):
+                logger.info("Export artifacts are being built by another worker.")
+                return built
+            try:
+                for fmt in EXPORT_FILENAMES:
+                    artifact = await cls._build(conn, fmt)
+                    if artifact is not None:
+                        built.append(artifact)
+                await cls.build_facts(conn)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", cls.LOCK)
+        cls._prune(logger_settings.EXPORT_KEEP_VERSIONS)
+        return built
+
+    @classmethod
+    async def _run(cls, pool) -> None:
+        try:
+            await cls.build_missing(pool)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Building export artifacts failed: {e!r}")
+
+    @classmethod
+    def schedule(cls, pool) -> asyncio.Task:
+        """Start a background build unless one is already running in this process."""
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run(pool))
+        return cls._task
+
+    @classmethod
+    async def on_dataset_version(cls, version: int) -> None:
+        # Without a pool the app is not serving (scripts, tests); nothing to prebuild
+        if logger_settings.EXPORT_PREBUILD and AuthDatabaseService._pool is not None:
+            cls.schedule(AuthDatabaseService._pool)
+
+    @classmethod
+    async def stop(cls) -> None:
+        task, cls._task = cls._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+DatasetVersionService.subscribe(ExportArtifactService.on_dataset_version)
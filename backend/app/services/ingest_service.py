@@ -0,0 +1,297 @@
+import asyncio
+import datetime
+import functools
+import hashlib
+import json
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncpg
+import pandas as pd
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlQuery
+logger = logger_settings.get_logger(__name__)
+
+# A segment ID opens an entry of the free-text audience, e.g. "96 - recent registration"
+_SEGMENT_ID = re.compile(r"(?:included segments\s*[:\-]\s*)?(\d+)(?=\s*(?:$|[-(+]))", re.IGNORECASE)
+
+# (csv column, table column, type) in table order
+CAMPAIGN_SCHEMA: List[Tuple[str, str, str]] = [
+    ("campaign_id", "campaign_id", "int"),
+    ("Campaign Name", "campaign_name", "text"),
+    ("audience_segment_a", "audience_segment_a", "text"),
+    ("audience_segment_b", "audience_segment_b", "text"),
+    ("Name from", "name_from", "text"),
+    ("Sending date", "sending_date", "date"),
+    ("Daily revenue", "daily_revenue", "float"),
+    ("Subject", "subject", "text"),
+    ("Sent", "sent", "int"),
+    ("Non delivered", "non_delivered", "int"),
+    ("Hard bounces", "hard_bounces", "int"),
+    ("Soft bounces", "soft_bounces", "int"),
+    ("Non delivered rate", "non_delivered_rate", "rate"),
+    ("Delivered", "delivered", "int"),
+    ("Total opens", "total_opens", "int"),
+    ("Opens", "opens", "int"),
+    ("Trackable open rate", "trackable_open_rate", "rate"),
+    ("Apple MPP Opens", "apple_mpp_opens", "int"),
+    ("Total clicked", "total_clicked", "int"),
+    ("Clicked", "clicked", "int"),
+    ("Click rate", "click_rate", "rate"),
+    ("Click-to-Open rate", "click_to_open_rate", "rate"),
+    ("Unsubscribed", "unsubscribed", "int"),
+    ("Unsubscription rate", "unsubscription_rate", "rate"),
+    ("Delivered rate", "delivered_rate", "rate"),
+    ("Hard Bounces rate", "hard_bounces_rate", "rate"),
+    ("Soft Bounces rate", "soft_bounces_rate", "rate"),
+    ("Complaints", "complaints", "int"),
+    ("Complaints rate", "complaints_rate", "rate"),
+    ("Audience Segment A IDs", "audience_segment_a_ids", "ids:audience_segment_a"),
+    ("Audience Segment B IDs", "audience_segment_b_ids", "ids:audience_segment_b"),
+]
+
+SEGMENT_SCHEMA: List[Tuple[str, str, str]] = [
+    ("Segment ID", "segment_id", "int"),
+    ("Segment Name", "segment_name", "text"),
+    ("Segment Folder", "segment_folder", "text"),
+    ("Logic Type", "logic_type", "text"),
+    ("Filter 1 Type", "filter_1_type", "text"),
+    ("Filter 1 Rule", "filter_1_rule", "text"),
+    ("Filter 1 Values", "filter_1_values", "text"),
+    ("Connector 1", "connector_1", "text"),
+    ("Filter 2 Type", "filter_2_type", "text"),
+    ("Filter 2 Rule", "filter_2_rule", "text"),
+    ("Filter 2 Values", "filter_2_values", "text"),
+    ("Connector 2", "connector_2", "text"),
+    ("OR Filter 1 Type", "or_filter_1_type", "text"),
+    ("OR Filter 1 Rule", "or_filter_1_rule", "text"),
+    ("OR Filter 1 Values", "or_filter_1_values", "text"),
+    ("OR Filter 2 Type", "or_filter_2_type", "text"),
+    ("OR Filter 2 Rule", "or_filter_2_rule", "text"),
+    ("OR Filter 2 Values", "or_filter_2_values", "text"),
+    ("Uses Engagement", "uses_engagement", "bool"),
+    ("Uses Date Rule", "uses_date_rule", "bool"),
+    ("Notes", "notes", "text"),
+]
+
+# Staging column type per schema type; floats stay binary until the merge
+# casts them, which is far cheaper than encoding NUMERIC client-side
+_STAGING_TYPES = {"int": "BIGINT", "float": "DOUBLE PRECISION", "rate": "DOUBLE PRECISION",
+                  "date": "DATE", "bool": "BOOLEAN", "text": "TEXT", "ids": "JSONB"}
+
+class IngestService:
+    """
+    Bulk loader for the email platform exports.
+    CSVs are read in chunks and converted column by column against a
+    typed schema, streamed into a temporary staging table with COPY and
+    merged into the target table with one upsert per file.
+    Each file's checksum is kept as a watermark, so unchanged exports are
+    skipped and changed ones only rewrite the rows that differ.
+    """
+    # Advisory lock held by the one process allowed to ingest
+    LOCK = "records.ingest"
+    @staticmethod
+    def parse_segment_ids(ids: Optional[str], audience: Optional[str]) -> List[int]:
+        """
+        Segment IDs of one audience slot. The cleaned `... IDs` column is
+        used when it holds any; otherwise they are read from the free-text
+        audience, where each comma-separated entry may start with an ID.
+        """
+        try:
+            parsed = json.loads(ids) if ids else []
+        except ValueError:
+            parsed = []
+        if not isinstance(parsed, list):
+            parsed = [parsed]
+        if not parsed and audience:
+            parsed = [
+                match.group(1) for match in
+                (_SEGMENT_ID.match(entry.strip()) for entry in audience.split(","))
+                if match
+            ]
+        segment_ids = []
+        for value in parsed:
+            if str(value).strip().isdigit() and int(value) not in segment_ids:
+                segment_ids.append(int(value))
+        return segment_ids
+
+    @staticmethod
+    def convert(chunk: pd.DataFrame, schema: List[Tuple[str, str, str]]) -> List[list]:
+        """
+        Convert a chunk of raw strings to Python values, one column at a time.
+        Returns:
+            List[list]: converted columns in schema order.
+        """
+        columns = []
+        for source, _, kind in schema:
+            raw = chunk[source] if source in chunk else pd.Series([None] * len(chunk), index=chunk.index)
+            if kind in ("int", "float", "rate"):
+                numbers = pd.to_numeric(raw, errors="coerce")
+                unparsed = numbers.isna() & raw.notna() & raw.ne("")
+                if unparsed.any():
+                    # Slow path only for cells like " 12" or "13.2%"
+                    text = raw[unparsed].astype(str).str.strip()
+                    fixed = pd.to_numeric(text.str.rstrip("%"), errors="coerce")
+                    if kind == "rate":
+                        fixed = fixed.where(~text.str.endswith("%"), fixed / 100)
+                    numbers = numbers.astype(float).where(~unparsed, fixed)
+                numbers = numbers.fillna(0.0)
+                values = numbers.astype("int64").tolist() if kind == "int" else numbers.astype(float).tolist()
+            elif kind == "date":
+                dates = pd.to_datetime(raw, format="%Y-%m-%d", errors="coerce")
+                values = dates.dt.date.astype(object).where(dates.notna(), None).tolist()
+            elif kind == "bool":
+                values = raw.fillna("").astype(str).str.strip().str.lower().eq("yes").tolist()
+            elif kind.startswith("ids:"):
+                audience = chunk[kind.split(":", 1)[1]]
+                values = [
+                    _segment_ids_json(ids, text)
+                    for ids, text in zip(raw.where(raw.notna(), None), audience.where(audience.notna(), None))
+                ]
+            else:
+                values = raw.astype(object).where(raw.notna(), None).tolist()
+            columns.append(values)
+        return columns
+
+    @staticmethod
+    async def load_csv(conn: asyncpg.Connection, csv_file: str, table: str,
+                       schema: List[Tuple[str, str, str]], key: str, date_column: str = None,
+                       settled: Optional[Tuple[int, datetime.date]] = None) -> int:
+        """
+        COPY a CSV into `table` through a staging table and upsert on `key`.
+        Rows identical to the stored ones are left untouched, and with
+        `settled` the rows at or below it are not staged at all.
+        Returns:
+            int: number of rows inserted or changed.
+        """
+        # index_col=False: some exports end rows with a trailing delimiter
+        chunks = pd.read_csv(csv_file, dtype=str, keep_default_na=False, index_col=False,
+                             encoding="utf-8", chunksize=logger_settings.INGEST_CHUNK_SIZE)
+        return await IngestService.load_chunks(conn, chunks, table, schema, key, date_column, settled)
+
+    @staticmethod
+    def unsettled(chunk: pd.DataFrame, schema: List[Tuple[str, str, str]], key: str, date_column: str,
+                  settled: Tuple[int, datetime.date]) -> pd.DataFrame:
+        """
+        Rows past the watermark: a key above its last key, or a date on or
+        after the cut-off. Rows that can't be parsed are kept.
+        """
+        source = {column: name for name, column, _ in schema}
+        last_key, since = settled
+        keys = pd.to_numeric(chunk[source[key]], errors="coerce")
+        dates = pd.to_datetime(chunk[source[date_column]], format="%Y-%m-%d", errors="coerce")
+        return chunk[~(keys <= last_key) | ~(dates < pd.Timestamp(since))]
+
+    @staticmethod
+    async def load_chunks(conn: asyncpg.Connection, chunks: Iterable[pd.DataFrame], table: str,
+                          schema: List[Tuple[str, str, str]], key: str, date_column: str = None,
+                          settled: Optional[Tuple[int, datetime.date]] = None) -> int:
+        """
+        `load_csv` for frames of raw strings with the export's columns.
+        The keys of the rows that changed are collected in the temporary
+        `changed_<table>` until the surrounding transaction ends.
+        Returns:
+            int: number of rows inserted or changed.
+        """
+        started = time.perf_counter()
+        name = table.split('.')[-1]
+        staging, changed_table = f"staging_{name}", f"changed_{name}"
+        target_columns = [column for _, column, _ in schema]
+        key_kind = next(kind for _, column, kind in schema if column == key)
+        total = staged = 0
+        async with conn.transaction():
+            await conn.execute(await SqlQuery.read_sql_full(
+                "com/de/data/staging_table", staging=staging, changed=changed_table, key=key,
+                key_type=_STAGING_TYPES[key_kind.split(':')[0]],
+                columns=", ".join(f"{column} {_STAGING_TYPES[kind.split(':')[0]]}" for _, column, kind in schema)
+            ))
+            for chunk in chunks:
+                total += len(chunk)
+                if settled is not None and date_column:
+                    chunk = IngestService.unsettled(chunk, schema, key, date_column, settled)
+                if chunk.empty:
+                    continue
+                records = list(zip(*IngestService.convert(chunk, schema)))
+                await conn.copy_records_to_table(staging, records=records, columns=target_columns)
+                staged += len(records)
+            merged = await conn.execute(await SqlQuery.read_sql_full(
+                "com/de/data/merge_staging",
+                staging=staging, table=table, key=key, changed=changed_table,
+                columns=", ".join(target_columns),
+                updates=", ".join(f"{column} = EXCLUDED.{column}" for column in target_columns if column != key),
+                current=", ".join(f"{table}.{column}" for column in target_columns),
+                incoming=", ".join(f"EXCLUDED.{column}" for column in target_columns)
+            ))
+        changed = int(merged.split()[-1])
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        skipped = f", skipped {total - staged} settled" if settled is not None and date_column else ""
+        logger.info(f"Read {total} rows for {table} in {elapsed:.2f}s ({total / elapsed:,.0f} rows/sec)"
+                    f"{skipped}, {changed} inserted or changed.")
+        return changed
+
+    @staticmethod
+    def checksum(path: str) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    async def ingest(conn: asyncpg.Connection, source: str, csv_file: str, table: str,
+                     schema: List[Tuple[str, str, str]], key: str, date_column: str = None) -> int:
+        """
+        Load `csv_file` unless its checksum matches the watermark recorded for
+        `source`, then move the watermark to the file's checksum and the
+        table's last key and date. A changed file is restaged whole and
+        the merge skips the rows that are the same. Only when
+        `INGEST_LOOKBACK_DAYS` is set are known rows dated earlier than
+        that before the last date skipped, corrections to them included.
+        Returns:
+            int: number of rows inserted or changed.
+        """
+        checksum = await asyncio.to_thread(IngestService.checksum, csv_file)
+        mark = await conn.fetchrow(await SqlQuery.read_sql("com/de/data/get_watermark"), source)
+        if mark is not None and mark["checksum"] == checksum:
+            logger.info(f"{source} is unchanged since {mark['loaded_at']:%Y-%m-%d %H:%M}, skipping.")
+            return 0
+        settled = None
+        if mark is not None and date_column and logger_settings.INGEST_LOOKBACK_DAYS >= 0 \
+                and mark["last_key"] is not None and mark["last_date"] is not None:
+            settled = (mark["last_key"], mark["last_date"] - datetime.timedelta(days=logger_settings.INGEST_LOOKBACK_DAYS))
+        changed = await IngestService.load_csv(conn, csv_file, table, schema, key, date_column, settled)
+        query = await SqlQuery.read_sql_full(
+            "com/de/data/set_watermark",
+            table=table, key=key, last_date=f"MAX({date_column})" if date_column else "NULL::date"
+        )
+        mark = await conn.fetchrow(query, source, checksum)
+        logger.info(f"{source} watermark: last key {mark['last_key']}, last date {mark['last_date']}, "
+                    f"{mark['row_count']} rows.")
+        return changed
+
+    @staticmethod
+    async def ingest_campaigns(conn: asyncpg.Connection, csv_file: str) -> int:
+        return await IngestService.ingest(conn, "campaigns", csv_file, "records.email_campaigns",
+                                          CAMPAIGN_SCHEMA, "campaign_id", "sending_date")
+
+    @staticmethod
+    async def ingest_segments(conn: asyncpg.Connection, csv_file: str) -> int:
+        return await IngestService.ingest(conn, "segments", csv_file, "records.segments",
+                                          SEGMENT_SCHEMA, "segment_id")
+
+    @staticmethod
+    async def try_lock(conn: asyncpg.Connection) -> bool:
+        """
+        Take the ingest lock without waiting. Held until `unlock` or until
+        the connection closes, so a crashed worker never keeps it.
+        """
+        return await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", IngestService.LOCK)
+
+    @staticmethod
+    async def unlock(conn: asyncpg.Connection) -> None:
+        await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", IngestService.LOCK)
+
+@functools.lru_cache(maxsize=65536)
+def _segment_ids_json(ids: Optional[str], audience: Optional[str]) -> str:
+    # Exports repeat the same few audiences across thousands of campaigns
+    return json.dumps(IngestService.parse_segment_ids(ids, audience))
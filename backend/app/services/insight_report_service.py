@@ -0,0 +1,370 @@
+import asyncio
+import datetime
+import functools
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlRegistry
+from app.services.insight_service import InsightViewService
+from app.services.dataset_service import DatasetVersionService
+logger = logger_settings.get_logger(__name__)
+
+_MAX_BARS = 20 # categories drawn per bar chart
+_MAX_SERIES = 12 # categories drawn as separate lines
+_MAX_PANELS = 6 # numeric columns drawn by the overview chart
+
+class InsightJob(NamedTuple):
+    """One library query, shipped to a render worker with its rows."""
+    sql_name: str
+    group: str
+    index: int
+    title: str
+    rows: List[dict]
+    output_dir: str
+
+class InsightArtifact(NamedTuple):
+    group: str
+    index: int
+    title: str
+    images: List[str]
+    report: str
+    # seconds the worker spent on it
+    elapsed: float
+
+class InsightRun(NamedTuple):
+    artifacts: List[InsightArtifact]
+    # sql_names whose artifacts were up to date and kept
+    reused: List[str]
+    failures: Dict[str, str]
+    # stage -> seconds summed over queries, plus `wall`
+    timings: Dict[str, float]
+    # sql_name -> seconds spent querying and rendering it
+    durations: Dict[str, float]
+
+@functools.lru_cache(maxsize=None)
+def analysis_version() -> str:
+    """Digest of this module, so a change to how results are charted re-renders everything."""
+    with open(__file__, "rb") as file:
+        return hashlib.sha1(file.read()).hexdigest()[:12]
+
+def _title(text: str, default: str) -> str:
+    """The `-- ...` comment heading a library file."""
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("--"):
+            return line.lstrip("-").strip() or default
+        if line:
+            break
+    return default
+
+def _init_worker() -> None:
+    import logging
+    import matplotlib
+    matplotlib.use("Agg")
+    logging.getLogger("matplotlib").setLevel(logging.WARNING)
+
+def _frame(rows: List[dict]):
+    import pandas as pd
+    frame = pd.DataFrame(rows)
+    for column in frame.columns:
+        values = frame[column].dropna()
+        if frame[column].dtype != object or values.empty:
+            continue
+        if isinstance(values.iloc[0], Decimal):
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        elif isinstance(values.iloc[0], (datetime.date, datetime.datetime)):
+            frame[column] = pd.to_datetime(frame[column], errors="coerce")
+    return frame
+
+def _columns(frame):
+    """(time column, label column, measure columns) of a result set."""
+    import pandas as pd
+    time_column = next((c for c in frame.columns if pd.api.types.is_datetime64_any_dtype(frame[c])), None)
+    label = next((c for c in frame.columns if frame[c].dtype == object), None)
+    measures = [
+        c for c in frame.columns
+        if pd.api.types.is_numeric_dtype(frame[c]) and not pd.api.types.is_bool_dtype(frame[c])
+        and c != "id" and not c.endswith("_id")
+    ]
+    return time_column, label, measures
+
+def _draw(ax, frame, time_column, label, measure) -> None:
+    if time_column is not None:
+        if label is not None and frame[label].nunique() <= _MAX_SERIES:
+            series = frame.pivot_table(index=time_column, columns=label, values=measure, aggfunc="sum")
+            series.plot(ax=ax, linewidth=1.5)
+            ax.legend(fontsize=7)
+        else:
+            frame.groupby(time_column)[measure].sum().plot(ax=ax, linewidth=1.5)
+    elif label is not None:
+        bars = frame.groupby(label)[measure].sum().nlargest(_MAX_BARS)
+        bars.plot.bar(ax=ax, alpha=0.8)
+        ax.tick_params(axis="x", rotation=45, labelsize=7)
+    else:
+        frame[measure].dropna().plot.hist(ax=ax, bins=30, alpha=0.8)
+    ax.set_title(measure.replace("_", " "), fontsize=10)
+    ax.set_xlabel("")
+
+def _charts(frame, title: str) -> list:
+    import matplotlib.pyplot as plt
+    time_column, label, measures = _columns(frame)
+    if frame.empty or not measures:
+        return []
+    figure, ax = plt.subplots(figsize=(12, 6))
+    _draw(ax, frame, time_column, label, measures[0])
+    ax.set_title(title, fontsize=13, fontweight="bold")
+    figures = [figure]
+    if len(measures) > 1:
+        panels = measures[:_MAX_PANELS]
+        cols = min(3, len(panels))
+        rows = (len(panels) + cols - 1) // cols
+        figure, axes = plt.subplots(rows, cols, figsize=(6 * cols, 4 * rows), squeeze=False)
+        for ax, measure in zip(axes.flat, panels):
+            _draw(ax, frame, time_column, label, measure)
+        for ax in list(axes.flat)[len(panels):]:
+            ax.set_visible(False)
+        figure.suptitle(title, fontsize=13, fontweight="bold")
+        figure.tight_layout()
+        figures.append(figure)
+    return figures
+
+def _report(frame, title: str) -> str:
+    time_column, label, measures = _columns(frame)
+    lines = [f"# -- {title}", "", "", "=" * 80, title.upper(), "=" * 80, ""]
+    lines.append(f"📋 ROWS: {len(frame):,}  COLUMNS: {', '.join(map(str, frame.columns))}")
+    if time_column is not None and not frame.empty:
+        lines.append(f"📅 PERIOD: {frame[time_column].min():%Y-%m-%d} to {frame[time_column].max():%Y-%m-%d}")
+    if measures and not frame.empty:
+        lines += ["", "📊 MEASURES:"]
+        for measure in measures:
+            values = frame[measure]
+            lines.append(
+                f"   • {measure}: total {values.sum():,.2f}, mean {values.mean():,.2f}, "
+                f"min {values.min():,.2f}, max {values.max():,.2f}"
+            )
+        if label is not None:
+            top = frame.groupby(label)[measures[0]].sum().nlargest(5)
+            lines += ["", f"🏆 TOP {label.upper()} BY {measures[0].upper()}:"]
+            lines += [f"   {i}. {name}: {value:,.2f}" for i, (name, value) in enumerate(top.items(), 1)]
+    return "\n".join(lines) + "\n"
+
+def _render(job: InsightJob) -> InsightArtifact:
+    """Write the charts and report of one query. Runs in a worker process."""
+    import matplotlib.pyplot as plt
+    started = time.perf_counter()
+    frame = _frame(job.rows)
+    directory = os.path.join(job.output_dir, "assets", "image", job.group)
+    os.makedirs(directory, exist_ok=True)
+    images = []
+    for number, figure in enumerate(_charts(frame, job.title), start=1):
+        name = f"{job.index}_{number}.png"
+        figure.savefig(os.path.join(directory, name), dpi=100, bbox_inches="tight")
+        plt.close(figure)
+        images.append(name)
+    report = _report(frame, job.title)
+    with open(os.path.join(directory, f"report_{job.index}.txt"), "w", encoding="utf-8") as file:
+        file.write(report)
+    return InsightArtifact(job.group, job.index, job.title, images, report, time.perf_counter() - started)
+
+class InsightReportService:
+    """
+    Headless run of the `insight2` library: every query runs over the
+    shared pool, its rows are charted in a process pool, and each group
+    gets `assets/image/N_/M_K.png`, `report_M.txt` and `markdown/N_.md`,
+    the layout the notebooks produce by hand.
+    Artifacts are keyed by their SQL text, the analysis code and the
+    dataset version in `assets/image/manifest.json`; a query whose key
+    is unchanged is neither run nor rendered again. Pages and charts in
+    a directory without a manifest were not written here and are only
+    replaced with `overwrite`.
+    """
+    MANIFEST = os.path.join("assets", "image", "manifest.json")
+
+    @staticmethod
+    def queries(groups: Optional[Iterable[str]] = None) -> List[str]:
+        """Library queries of `groups` (`4_` or `4`), all of them by default."""
+        wanted = {group if group.endswith("_") else f"{group}_" for group in groups or ()}
+        return [
+            name for name in InsightViewService.names()
+            if not wanted or name.split("/")[-2] in wanted
+        ]
+
+    @staticmethod
+    def artifact_key(sql_text: str, version: int) -> str:
+        payload = f"{sql_text.strip()}\n{analysis_version()}\n{version}"
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    def load_manifest(cls, output_dir: str) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(output_dir, cls.MANIFEST), "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _has_content(output_dir: str) -> bool:
+        """Whether `output_dir` already holds markdown pages or chart images."""
+        for directory in ("markdown", os.path.join("assets", "image")):
+            for _, _, files in os.walk(os.path.join(output_dir, directory)):
+                if any(not name.startswith(".") for name in files):
+                    return True
+        return False
+
+    @classmethod
+    def _save_manifest(cls, output_dir: str, manifest: Dict[str, Any]) -> None:
+        path = os.path.join(output_dir, cls.MANIFEST)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.part", "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        os.replace(f"{path}.part", path)
+
+    @staticmethod
+    def _reuse(output_dir: str, entry: Dict[str, Any]) -> Optional[InsightArtifact]:
+        """The artifact a manifest entry describes, if all its files are still there."""
+        directory = os.path.join(output_dir, "assets", "image", entry["group"])
+        if not all(os.path.exists(os.path.join(directory, image)) for image in entry["images"]):
+            return None
+        try:
+            with open(os.path.join(directory, f"report_{entry['index']}.txt"), "r", encoding="utf-8") as file:
+                report = file.read()
+        except FileNotFoundError:
+            return None
+        return InsightArtifact(entry["group"], entry["index"], entry["title"], entry["images"], report, 0.0)
+
+    @staticmethod
+    def _markdown(output_dir: str, group: str, artifacts: List[InsightArtifact]) -> None:
+        path = os.path.join(output_dir, "markdown", f"{group}.md")
+        heading = f"Insight {group}"
+        # Keep the hand-written title of an existing page
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                match = re.match(r"#\s+(.+)", file.readline())
+                heading = match.group(1).strip() if match else heading
+        lines = [f"# {heading}", ""]
+        for artifact in artifacts:
+            lines += ["", f"## {artifact.title}"]
+            lines += [f"![{artifact.title}](../assets/image/{group}/{image})" for image in artifact.images]
+        lines += ["", "", "## Insight", ""]
+        for artifact in artifacts:
+            lines += [artifact.report.split("\n", 1)[-1].strip(), ""]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines))
+
+    @classmethod
+    async def run(cls, pool, output_dir: str, groups: Optional[Iterable[str]] = None,
+                  workers: Optional[int] = None, concurrency: Optional[int] = None,
+                  force: bool = False, overwrite: bool = False) -> InsightRun:
+        """
+        Query, render and write every selected group whose inputs changed
+        since the manifest was written (all of them with `force`).
+        Rendering of a query starts as soon as its rows arrive, so the
+        database and the render workers stay busy together; a failing
+        query is reported and does not stop the others.
+        """
+        if not overwrite and not cls.load_manifest(output_dir) and cls._has_content(output_dir):
+            raise FileExistsError(f"{output_dir} holds pages or charts not written by run-insights.")
+        started = time.perf_counter()
+        timings: Dict[str, float] = defaultdict(float)
+        durations: Dict[str, float] = {}
+        failures: Dict[str, str] = {}
+        artifacts: Dict[str, InsightArtifact] = {}
+        reused: List[str] = []
+        async with pool.acquire() as conn:
+            version = await DatasetVersionService.refresh(conn)
+        previous = cls.load_manifest(output_dir)
+        entries: Dict[str, Any] = dict(previous.get("artifacts", {}))
+        pages: Dict[str, Any] = dict(previous.get("markdown", {}))
+        keys: Dict[str, str] = {}
+        pending: List[str] = []
+        for sql_name in cls.queries(groups):
+            keys[sql_name] = cls.artifact_key(SqlRegistry.get(sql_name).text, version)
+            entry = entries.get(sql_name)
+            artifact = cls._reuse(output_dir, entry) \
+                if not force and entry and entry["key"] == keys[sql_name] else None
+            if artifact is None:
+                pending.append(sql_name)
+            else:
+                artifacts[sql_name] = artifact
+                reused.append(sql_name)
+        limit = asyncio.Semaphore(concurrency or logger_settings.DB_POOL_MAX_SIZE)
+        loop = asyncio.get_running_loop()
+        # spawn: the workers must not inherit the event loop or pool sockets
+        executor = ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+        async def process(sql_name: str) -> None:
+            group, query_id = sql_name.split("/")[-2:]
+            template = SqlRegistry.get(sql_name)
+            try:
+                async with limit:
+                    queried = time.perf_counter()
+                    async with pool.acquire() as conn:
+                        rows = await InsightViewService.fetch(conn, sql_name)
+                    elapsed = time.perf_counter() - queried
+                job = InsightJob(
+                    sql_name, group, int(query_id.split("_")[-1]),
+                    _title(template.text, query_id), rows, output_dir
+                )
+                artifact = await loop.run_in_executor(executor, _render, job)
+            except Exception as e:
+                failures[sql_name] = repr(e)
+                logger.warning(f"Insight {sql_name} failed: {e!r}")
+                return
+            artifacts[sql_name] = artifact
+            timings["query"] += elapsed
+            timings["render"] += artifact.elapsed
+            durations[sql_name] = elapsed + artifact.elapsed
+
+        try:
+            await asyncio.gather(*(process(name) for name in pending))
+        finally:
+            executor.shutdown(wait=True)
+        written = time.perf_counter()
+        for sql_name in failures:
+            # Retried on the next run
+            entries.pop(sql_name, None)
+        for sql_name, artifact in artifacts.items():
+            stale = set(entries.get(sql_name, {}).get("images", [])) - set(artifact.images)
+            for image in stale:
+                path = os.path.join(output_dir, "assets", "image", artifact.group, image)
+                if os.path.exists(path):
+                    os.remove(path)
+            entries[sql_name] = {
+                "key": keys[sql_name], "group": artifact.group, "index": artifact.index,
+                "title": artifact.title, "images": artifact.images, "reused": sql_name in reused,
+            }
+        by_group: Dict[str, List[Tuple[str, InsightArtifact]]] = defaultdict(list)
+        for sql_name, artifact in sorted(artifacts.items(), key=lambda item: (item[1].group, item[1].index)):
+            by_group[artifact.group].append((sql_name, artifact))
+        for group, items in by_group.items():
+            key = hashlib.sha1("".join(keys[sql_name] for sql_name, _ in items).encode("utf-8")).hexdigest()[:16]
+            page = os.path.join(output_dir, "markdown", f"{group}.md")
+            unchanged = not force and pages.get(group, {}).get("key") == key and os.path.exists(page)
+            if not unchanged:
+                cls._markdown(output_dir, group, [artifact for _, artifact in items])
+            pages[group] = {"key": key, "reused": unchanged}
+        cls._save_manifest(output_dir, {
+            "analysis_version": analysis_version(),
+            "dataset_version": version,
+            "artifacts": entries,
+            "markdown": pages,
+        })
+        timings["markdown"] = time.perf_counter() - written
+        timings["wall"] = time.perf_counter() - started
+        return InsightRun(
+            sorted(artifacts.values(), key=lambda a: (a.group, a.index)),
+            reused, failures, dict(timings), durations
+        )
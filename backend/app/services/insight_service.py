@@ -0,0 +1,184 @@
+import hashlib
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+import asyncpg
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlQuery, SqlRegistry, SqlTemplate
+from app.services.dataset_service import DatasetVersionService
+from app.services.metrics_service import MetricsService
+logger = logger_settings.get_logger(__name__)
+
+_TRAILING_SEMICOLON = re.compile(r";\s*$")
+
+class InsightViewService:
+    """
+    Materialized views backing the `insight2` analysis library.
+    Each query is stored once per ingest and readers select the
+    precomputed rows; a query whose view cannot be built, or whose
+    file changed since the view was built, keeps running live.
+    """
+    LIBRARY = "com/de/insight2"
+    # sql_name -> (view, digest of the query text the view was built from)
+    _views: Dict[str, Tuple[str, str]] = {}
+    # Dataset version at which views built by other workers were last looked up
+    _discovered: Optional[int] = None
+
+    @classmethod
+    def names(cls) -> List[str]:
+        """Library queries in natural order (1_1, 1_2, ..., 1_10)."""
+        def order(name: str):
+            return [int(part) for part in re.findall(r"\d+", name.rsplit("/", 1)[-1])]
+        return sorted(SqlRegistry.names(f"{cls.LIBRARY}/"), key=order)
+
+    @classmethod
+    def sql_name(cls, query_id: str) -> str:
+        """`6_6` -> `com/de/insight2/6_/6_6`"""
+        return f"{cls.LIBRARY}/{query_id.split('_')[0]}_/{query_id}"
+
+    @staticmethod
+    def view_name(sql_name: str) -> str:
+        return f"insight2_{sql_name.rsplit('/', 1)[-1]}"
+
+    @staticmethod
+    def _body(template: SqlTemplate) -> str:
+        return _TRAILING_SEMICOLON.sub("", template.text.strip())
+
+    @classmethod
+    def _digest(cls, template: SqlTemplate) -> str:
+        return hashlib.sha1(cls._body(template).encode("utf-8")).hexdigest()[:16]
+
+    @classmethod
+    async def _existing(cls, conn: asyncpg.Connection) -> Dict[str, str]:
+        query = await SqlQuery.read_sql_full(
+            "com/de/data/insight_view_list", schema=logger_settings.INSIGHT_VIEWS_SCHEMA
+        )
+        return {row["view"]: row["digest"] for row in await conn.fetch(query)}
+
+    @classmethod
+    async def discover(cls, conn: asyncpg.Connection) -> int:
+        """
+        Adopt the up-to-date views another worker built, without building any.
+        Returns:
+            int: number of queries backed by a view.
+        """
+        existing = await cls._existing(conn)
+        for name in cls.names():
+            template = SqlRegistry.get(name)
+            if template is None:
+                continue
+            view, digest = cls.view_name(name), cls._digest(template)
+            if existing.get(view) == digest:
+                cls._views[name] = (view, digest)
+        cls._discovered = DatasetVersionService.current()
+        return len(cls._views)
+
+    @classmethod
+    async def ensure_views(cls, conn: asyncpg.Connection) -> List[str]:
+        """
+        Build a view for every library query that has none, or whose query
+        changed. Views already up to date are kept as they are.
+        Returns:
+            List[str]: names of the queries whose existing views were kept,
+            i.e. the ones a fresh ingest still has to refresh.
+        """
+        if not logger_settings.INSIGHT_VIEWS_ENABLED:
+            return []
+        schema = logger_settings.INSIGHT_VIEWS_SCHEMA
+        kept = []
+        # Workers start together; let one build while the others wait and reuse
+        await conn.execute("SELECT pg_advisory_lock(hashtext($1))", f"{schema}.ensure")
+        try:
+            existing = await cls._existing(conn)
+            for name in cls.names():
+                template = SqlRegistry.get(name)
+                if template is None:
+                    continue
+                view, digest = cls.view_name(name), cls._digest(template)
+                if existing.get(view) == digest:
+                    cls._views[name] = (view, digest)
+                    kept.append(name)
+                    continue
+                query = await SqlQuery.read_sql_full(
+                    "com/de/data/insight_view_create",
+                    schema=schema, view=view, digest=digest, query=cls._body(template)
+                )
+                try:
+                    async with conn.transaction():
+                        await conn.execute(query)
+                    cls._views[name] = (view, digest)
+                except asyncpg.PostgresError as e:
+                    cls._views.pop(name, None)
+                    logger.warning(f"No materialized view for {name}, it will run live: {e}")
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", f"{schema}.ensure")
+        logger.info(f"{len(cls._views)} insight queries backed by materialized views.")
+        return kept
+
+    @classmethod
+    async def refresh_views(cls, conn: asyncpg.Connection, names: Optional[List[str]] = None) -> int:
+        """
+        REFRESH ... CONCURRENTLY the given views (all by default), so readers
+        keep getting the previous rows until the new ones are in place.
+        Skipped when another worker is already refreshing.
+        Returns:
+            int: number of views refreshed.
+        """
+        schema = logger_settings.INSIGHT_VIEWS_SCHEMA
+        lock = f"{schema}.refresh"
+        if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", lock):
+            logger.info("Insight views are being refreshed by another worker.")
+            return 0
+        refreshed = 0
+        try:
+            for name in (cls._views if names is None else names):
+                entry = cls._views.get(name)
+                if entry is None:
+                    continue
+                try:
+                    # A savepoint when called inside the ingest transaction
+                    async with conn.transaction():
+                        await conn.execute(await SqlQuery.read_sql_full(
+                            "com/de/data/insight_view_refresh", schema=schema, view=entry[0]
+                        ))
+                    refreshed += 1
+                except asyncpg.PostgresError as e:
+                    cls._views.pop(name, None)
+                    logger.warning(f"Refreshing the view for {name} failed, it will run live: {e}")
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", lock)
+        return refreshed
+
+    @classmethod
+    async def fetch(cls, conn: asyncpg.Connection, sql_name: str) -> List[dict]:
+        """
+        Rows of a library query, from its view when one is current and
+        from the live query otherwise.
+        """
+        template = SqlRegistry.get(sql_name)
+        if template is None:
+            raise KeyError(sql_name)
+        started, rows = time.perf_counter(), None
+        try:
+            rows = await cls._fetch(conn, sql_name, template)
+            return rows
+        finally:
+            MetricsService.observe_query(sql_name, time.perf_counter() - started,
+                                         None if rows is None else len(rows))
+
+    @classmethod
+    async def _fetch(cls, conn: asyncpg.Connection, sql_name: str, template) -> List[dict]:
+        entry = cls._views.get(sql_name)
+        # The embedded DuckDB backend has no materialized views
+        views = logger_settings.INSIGHT_VIEWS_ENABLED and not getattr(conn, "embedded", False)
+        if views and entry is None and cls._discovered != DatasetVersionService.current():
+            await cls.discover(conn)
+            entry = cls._views.get(sql_name)
+        if views and entry and entry[1] == cls._digest(template):
+            query = await SqlQuery.read_sql_full(
+                "com/de/data/insight_view_select",
+                schema=logger_settings.INSIGHT_VIEWS_SCHEMA, view=entry[0]
+            )
+            rows = await conn.fetch(query)
+            return [{k: v for k, v in row.items() if k != "mv_row_id"} for row in rows]
+        return [dict(row) for row in await conn.fetch(template.text)]
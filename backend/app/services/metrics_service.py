@@ -0,0 +1,159 @@
+import bisect
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import logger_settings, Settings
+logger = logger_settings.get_logger(__name__)
+
+# Upper bounds in seconds, Prometheus' defaults plus a millisecond bucket
+_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """
+    Latency histogram per label set. Observing is one bisect and two
+    additions; buckets are only made cumulative when rendered.
+    """
+    __slots__ = ("name", "help", "label_names", "series")
+
+    def __init__(self, name: str, help: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+        # labels -> [count per bucket (last one is +Inf), sum]
+        self.series: Dict[Tuple, list] = {}
+
+    def observe(self, labels: Tuple, value: float) -> None:
+        entry = self.series.get(labels)
+        if entry is None:
+            entry = self.series[labels] = [[0] * (len(_BUCKETS) + 1), 0.0]
+        entry[0][bisect.bisect_left(_BUCKETS, value)] += 1
+        entry[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*_BUCKETS, "+Inf"), counts):
+                cumulative += count
+                bucket = _labels(self.label_names, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+def _series(name: str, help: str, label_names: Tuple[str, ...], values: Dict[Tuple, float],
+            kind: str = "counter") -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines += [f"{name}{_labels(label_names, labels)} {value}" for labels, value in sorted(values.items())]
+    return lines
+
+class MetricsService:
+    """
+    In-process metrics in the Prometheus text format: request latency by
+    route template, SQL template timings and row counts, pool acquire
+    waits, and the cache and snapshot counters. Each worker reports its
+    own values; Prometheus sums them across scrape targets.
+    """
+    requests = Histogram("http_request_duration_seconds",
+                         "Time from request to response headers, by route template.", ("route", "method"))
+    queries = Histogram("sql_query_duration_seconds", "Execution time of named SQL templates.", ("template",))
+    pool_waits = Histogram("db_pool_acquire_wait_seconds", "Time callers waited for a pooled connection.")
+    responses: Dict[Tuple[str, str, str], int] = {}
+    query_rows: Dict[Tuple[str], int] = {}
+    query_errors: Dict[Tuple[str], int] = {}
+
+    @classmethod
+    def observe_request(cls, route: str, method: str, status: int, seconds: float) -> None:
+        cls.requests.observe((route, method), seconds)
+        key = (route, method, str(status))
+        cls.responses[key] = cls.responses.get(key, 0) + 1
+
+    @classmethod
+    def observe_query(cls, template: str, seconds: float, rows: Optional[int]) -> None:
+        """Record one execution; `rows` is None when it failed."""
+        cls.queries.observe((template,), seconds)
+        key = (template,)
+        if rows is None:
+            cls.query_errors[key] = cls.query_errors.get(key, 0) + 1
+        else:
+            cls.query_rows[key] = cls.query_rows.get(key, 0) + rows
+
+    @classmethod
+    def render(cls, pool: Dict[str, Any], cache: Dict[str, int], snapshots: Dict[str, int]) -> str:
+        lines = cls.requests.render()
+        lines += _series("http_responses_total", "Responses by route template and status.",
+                         ("route", "method", "status"), cls.responses)
+        lines += cls.queries.render()
+        lines += _series("sql_query_rows_total", "Rows returned by named SQL templates.", ("template",), cls.query_rows)
+        lines += _series("sql_query_errors_total", "Failed executions of named SQL templates.",
+                         ("template",), cls.query_errors)
+        lines += cls.pool_waits.render()
+        for name in ("size", "idle", "in_use", "waiting", "max_size"):
+            if name in pool:
+                lines += _series(f"db_pool_{name}", f"Connection pool {name.replace('_', ' ')}.", (),
+                                 {(): pool[name]}, "gauge")
+        if "acquired" in pool:
+            lines += _series("db_pool_acquired_total", "Connections handed out by the pool.", (),
+                             {(): pool["acquired"]})
+            lines += _series("db_pool_timeouts_total", "Acquire attempts that timed out.", (), {(): pool["timeouts"]})
+        lines += _series("cache_requests_total", "Insight cache lookups by outcome.", ("result",),
+                         {(name,): value for name, value in cache.items()})
+        hits = cache.get("local_hits", 0) + cache.get("redis_hits", 0)
+        lookups = hits + cache.get("misses", 0)
+        lines += _series("cache_hit_ratio", "Share of insight cache lookups served from the cache.", (),
+                         {(): round(hits / lookups, 6) if lookups else 0.0}, "gauge")
+        lines += _series("snapshot_requests_total", "Dashboard snapshot reads and refreshes by outcome.",
+                         ("result",), {(name,): value for name, value in snapshots.items()})
+        return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request to its response headers.
+    Requests are labelled by the matched route's path template, so
+    `/insight2/4_1` and `/insight2/6_6` share one series.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._paths: Optional[Dict[Any, str]] = None
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._paths is None:
+            self._paths = {
+                route.endpoint: route.path for route in scope["app"].routes
+                if hasattr(route, "endpoint") and hasattr(route, "path")
+            }
+        return self._paths.get(endpoint, "other")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status, elapsed = 500, None
+
+        async def timed_send(message):
+            nonlocal status, elapsed
+            if message["type"] == "http.response.start":
+                status, elapsed = message["status"], time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            MetricsService.observe_request(
+                self._route(scope), scope["method"], status,
+                elapsed if elapsed is not None else time.perf_counter() - started
+            )
@@ -0,0 +1,70 @@
+import hashlib
+from typing import List
+import asyncpg
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlQuery
+logger = logger_settings.get_logger(__name__)
+
+# DDL scripts under com/de/data in the order they are applied. A script's
+# version is its position, so new scripts are only ever appended.
+MIGRATIONS: List[str] = [
+    "create_schema",
+    "email_campaigns",
+    "email_campaigns_derived",
+    "campaign_segments",
+    "segments",
+    "dataset_version",
+    "ingest_watermarks",
+    "dashboard_snapshots",
+]
+
+class MigrationService:
+    """
+    Versioned schema migrations for the `records` schema.
+    Applied versions are kept in `public.schema_migrations`, so a warm
+    start costs a single version check and only pending scripts run.
+    """
+    PACKAGE = "com/de/data"
+    # Transaction-level advisory lock serializing workers that start together
+    LOCK = "records.migrate"
+
+    @staticmethod
+    def checksum(text: str) -> str:
+        return hashlib.sha1(text.strip().encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def current_version(conn: asyncpg.Connection) -> int:
+        try:
+            return await conn.fetchval(await SqlQuery.read_sql(f"{MigrationService.PACKAGE}/schema_migrations_version"))
+        except asyncpg.UndefinedTableError:
+            return 0
+
+    @staticmethod
+    async def migrate(conn: asyncpg.Connection) -> int:
+        """
+        Apply the pending migrations in one transaction.
+        Returns:
+            int: number of migrations applied.
+        """
+        if await MigrationService.current_version(conn) >= len(MIGRATIONS):
+            return 0
+        package = MigrationService.PACKAGE
+        applied_now = 0
+        async with conn.transaction():
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", MigrationService.LOCK)
+            await conn.execute(await SqlQuery.read_sql(f"{package}/schema_migrations"))
+            # Re-read under the lock; another worker may have just migrated
+            rows = await conn.fetch(await SqlQuery.read_sql(f"{package}/schema_migrations_applied"))
+            applied = {row["version"]: row["checksum"] for row in rows}
+            for version, name in enumerate(MIGRATIONS, start=1):
+                text = await SqlQuery.read_sql(f"{package}/{name}")
+                if version in applied:
+                    if applied[version] != MigrationService.checksum(text):
+                        logger.warning(f"Migration {version} ({name}) changed after it was applied.")
+                    continue
+                await conn.execute(text)
+                await conn.execute(await SqlQuery.read_sql(f"{package}/record_migration"),
+                                   version, name, MigrationService.checksum(text))
+                logger.info(f"Applied migration {version} ({name}).")
+                applied_now += 1
+        return applied_now
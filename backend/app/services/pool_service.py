@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+import asyncpg
+from app.core.config import logger_settings, Settings
+from app.services.metrics_service import MetricsService
+logger = logger_settings.get_logger(__name__)
+
+class _PoolAcquire:
+    """`async with pool.acquire()` / `await pool.acquire()`, as in asyncpg."""
+    def __init__(self, pool: "InstrumentedPool", timeout: Optional[float]):
+        self.pool = pool
+        self.timeout = timeout
+        self.conn: Optional[asyncpg.Connection] = None
+
+    def __await__(self):
+        return self.pool._acquire(self.timeout).__await__()
+
+    async def __aenter__(self) -> asyncpg.Connection:
+        self.conn = await self.pool._acquire(self.timeout)
+        return self.conn
+
+    async def __aexit__(self, *exc) -> None:
+        conn, self.conn = self.conn, None
+        await self.pool.release(conn)
+
+class InstrumentedPool:
+    """
+    asyncpg pool wrapper that records how long callers wait for a
+    connection, how many are checked out and how many callers are
+    queued, so the pool can be sized from real load.
+    Anything not instrumented is delegated to the wrapped pool.
+    """
+    def __init__(self, pool: asyncpg.Pool, min_size: int, max_size: int):
+        self._pool = pool
+        self.min_size = min_size
+        self.max_size = max_size
+        self.in_use = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+    async def _acquire(self, timeout: Optional[float]) -> asyncpg.Connection:
+        self.waiting += 1
+        started = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+        waited = time.perf_counter() - started
+        MetricsService.pool_waits.observe((), waited)
+        self.acquired += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        self.in_use += 1
+        return conn
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _PoolAcquire:
+        return _PoolAcquire(self, timeout if timeout is not None else logger_settings.DB_POOL_ACQUIRE_TIMEOUT)
+
+    async def release(self, conn: asyncpg.Connection, *, timeout: Optional[float] = None) -> None:
+        try:
+            await self._pool.release(conn, timeout=timeout)
+        finally:
+            self.in_use -= 1
+
+    async def execute(self, query: str, *args, timeout: Optional[float] = None) -> str:
+        async with self.acquire() as conn:
+            return await conn.execute(query, *args, timeout=timeout)
+
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None) -> list:
+        async with self.acquire() as conn:
+            return await conn.fetch(query, *args, timeout=timeout)
+
+    async def fetchrow(self, query: str, *args, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchrow(query, *args, timeout=timeout)
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: Optional[float] = None):
+        async with self.acquire() as conn:
+            return await conn.fetchval(query, *args, column=column, timeout=timeout)
+
+    async def warm_up(self) -> None:
+        """Check out `min_size` connections at once so the first requests find them ready."""
+        conns = await asyncio.gather(*(self._pool.acquire() for _ in range(self.min_size)))
+        try:
+            await asyncio.gather(*(conn.execute("SELECT 1") for conn in conns))
+        finally:
+            await asyncio.gather(*(self._pool.release(conn) for conn in conns))
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for checked-out connections to come back, then close.
+        Connections still busy after `timeout` are terminated.
+        """
+        timeout = timeout if timeout is not None else logger_settings.DB_POOL_CLOSE_TIMEOUT
+        try:
+            await asyncio.wait_for(self._pool.close(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Pool did not close within {timeout}s, terminating {self.in_use} connections.")
+            self._pool.terminate()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "size": self._pool.get_size(),
+            "idle": self._pool.get_idle_size(),
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(1000 * self.wait_total / self.acquired, 3) if self.acquired else 0.0,
+            "wait_max_ms": round(1000 * self.wait_max, 3),
+        }
@@ -0,0 +1,192 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from fastapi.encoders import jsonable_encoder
+from app.core.config import logger_settings, Settings
+from app.sql.main import SqlQuery
+from app.services.dataset_service import DatasetVersionService
+logger = logger_settings.get_logger(__name__)
+
+# (namespace, params, loader) for every payload to precompute
+SnapshotJob = Tuple[str, Dict[str, Any], Callable[[], Awaitable[Any]]]
+
+def period_bucket() -> int:
+    """The `parse_period` bucket now; payloads computed in another bucket are stale."""
+    bucket = logger_settings.PERIOD_BUCKET_SECONDS
+    return int(time.time() // bucket) if bucket else 0
+
+class SnapshotService:
+    """
+    Dashboard payloads precomputed into `records.dashboard_snapshots`.
+    The refresh job runs after every ingest and at each period bucket
+    boundary, for the endpoint and parameter grid the handlers module
+    registers. `CacheService.cached` handlers read a snapshot by key
+    and only run live for parameters outside the grid.
+    """
+    LOCK = "records.snapshots"
+    _jobs: Optional[Callable[[Any], Iterable[SnapshotJob]]] = None
+    _keys: Optional[Set[str]] = None
+    _scheduler: Optional[AsyncIOScheduler] = None
+    _pool = None
+    _task: Optional[asyncio.Task] = None
+    stats: Dict[str, int] = {"hits": 0, "misses": 0, "computed": 0, "failures": 0}
+
+    @staticmethod
+    def make_key(namespace: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps(jsonable_encoder(params), sort_keys=True, separators=(",", ":"))
+        return f"{namespace}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+    @classmethod
+    def register(cls, jobs: Callable[[Any], Iterable[SnapshotJob]]) -> None:
+        """Set the function listing the payloads to precompute for a pool."""
+        cls._jobs = jobs
+        cls._keys = None
+
+    @classmethod
+    def grid_keys(cls) -> Set[str]:
+        if cls._keys is None:
+            cls._keys = {cls.make_key(namespace, params) for namespace, params, _ in cls._jobs(None)} \
+                if cls._jobs else set()
+        return cls._keys
+
+    @classmethod
+    async def read_through(cls, namespace: str, params: Dict[str, Any], pool,
+                           loader: Callable[[], Awaitable[Any]]) -> Any:
+        """The current snapshot of a payload when there is one, otherwise the live result."""
+        key = cls.make_key(namespace, params)
+        if logger_settings.SNAPSHOTS_ENABLED and pool is not None and key in cls.grid_keys():
+            payload = await pool.fetchval(
+                await SqlQuery.read_sql("com/de/data/get_snapshot"),
+                key, DatasetVersionService.current(), period_bucket()
+            )
+            if payload is not None:
+                cls.stats["hits"] += 1
+                return json.loads(payload)
+            cls.stats["misses"] += 1
+        return await loader()
+
+    @staticmethod
+    def concurrency() -> int:
+        """
+        Payloads computed at once: `SNAPSHOT_CONCURRENCY`, but never more
+        than a quarter of the pool, which has to keep serving requests.
+        """
+        return max(1, min(logger_settings.SNAPSHOT_CONCURRENCY, logger_settings.DB_POOL_MAX_SIZE // 4))
+
+    @classmethod
+    async def refresh(cls, pool) -> int:
+        """
+        Compute every payload of the grid missing for the current dataset
+        version and bucket, unless another worker is already at it.
+        Returns:
+            int: number of payloads computed.
+        """
+        if cls._jobs is None:
+            return 0
+        computed = 0
+        async with pool.acquire() as conn:
+            if not await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", cls.LOCK):
+                logger.info("Dashboard snapshots are being refreshed by another worker.")
+                return 0
+            try:
+                version, bucket = DatasetVersionService.current(), period_bucket()
+                done = {row["key"] for row in await conn.fetch(
+                    await SqlQuery.read_sql("com/de/data/current_snapshots"), version, bucket
+                )}
+                jobs = [job for job in cls._jobs(pool) if cls.make_key(job[0], job[1]) not in done]
+                limit = asyncio.Semaphore(cls.concurrency())
+                # The rows go through the connection holding the lock, one at a time
+                writing = asyncio.Lock()
+                query = await SqlQuery.read_sql("com/de/data/set_snapshot")
+
+                async def compute(namespace: str, params: Dict[str, Any], loader) -> bool:
+                    async with limit:
+                        started = time.perf_counter()
+                        try:
+                            payload = jsonable_encoder(await loader())
+                        except Exception as e:
+                            cls.stats["failures"] += 1
+                            logger.warning(f"Snapshot of {namespace} {params} failed, it will run live: {e!r}")
+                            return False
+                        elapsed = 1000 * (time.perf_counter() - started)
+                    async with writing:
+                        await conn.execute(
+                            query, cls.make_key(namespace, params), namespace,
+                            json.dumps(jsonable_encoder(params)), version, bucket, json.dumps(payload), elapsed
+                        )
+                    return True
+
+                results = await asyncio.gather(*(compute(*job) for job in jobs))
+                computed = sum(results)
+                cls.stats["computed"] += computed
+                await conn.execute(await SqlQuery.read_sql("com/de/data/prune_snapshots"), version, bucket)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock(hashtext($1))", cls.LOCK)
+        if computed:
+            logger.info(f"Computed {computed} dashboard snapshots for version {version}, bucket {bucket}.")
+        return computed
+
+    @classmethod
+    async def _run(cls, pool) -> None:
+        try:
+            # An ingest during the run gets its own pass
+            while True:
+                version = DatasetVersionService.current()
+                await cls.refresh(pool)
+                if DatasetVersionService.current() == version:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Refreshing dashboard snapshots failed: {e!r}")
+
+    @classmethod
+    def schedule(cls) -> Optional[asyncio.Task]:
+        """Start a refresh unless one is already running in this process."""
+        if cls._pool is None or not logger_settings.SNAPSHOTS_ENABLED:
+            return None
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run(cls._pool))
+        return cls._task
+
+    @classmethod
+    async def on_dataset_version(cls, version: int) -> None:
+        cls.schedule()
+
+    @classmethod
+    def start(cls, pool) -> None:
+        """
+        Refresh now and then at every bucket boundary, when `parse_period`
+        start dates move and the previous payloads go stale.
+        """
+        if not logger_settings.SNAPSHOTS_ENABLED or cls._scheduler is not None:
+            return
+        cls._pool = pool
+        interval = logger_settings.SNAPSHOT_INTERVAL
+        # A second past the next boundary, so the new bucket is in effect
+        first = (time.time() // interval + 1) * interval + 1
+        cls._scheduler = AsyncIOScheduler()
+        cls._scheduler.add_job(cls.schedule, 'interval', seconds=interval,
+                               next_run_time=datetime.datetime.fromtimestamp(first))
+        cls._scheduler.start()
+        cls.schedule()
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._scheduler is not None:
+            cls._scheduler.shutdown(wait=False)
+            cls._scheduler = None
+        task, cls._task = cls._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        cls._pool = None
+
+DatasetVersionService.subscribe(SnapshotService.on_dataset_version)
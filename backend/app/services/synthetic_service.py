@@ -0,0 +1,264 @@
+import functools
+import math
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncpg
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.core.config import logger_settings, Settings
+from app.services.auth_service import AuthDatabaseService
+from app.services.dataset_service import DatasetVersionService
+from app.services.ingest_service import _SEGMENT_ID, CAMPAIGN_SCHEMA, SEGMENT_SCHEMA, IngestService
+from app.services.migration_service import MigrationService
+from app.sql.main import SqlQuery
+logger = logger_settings.get_logger(__name__)
+
+_PARQUET_TYPES = {"int": pa.int64(), "float": pa.float64(), "rate": pa.float64(),
+                  "date": pa.date32(), "bool": pa.bool_(), "text": pa.string(), "ids": pa.string()}
+
+# Count columns of the campaigns export
+_COUNTS = {
+    "Sent", "Non delivered", "Hard bounces", "Soft bounces", "Delivered", "Total opens", "Opens",
+    "Apple MPP Opens", "Total clicked", "Clicked", "Unsubscribed", "Complaints",
+}
+
+# Spread of the per-campaign volume and of each rate around the sampled campaign's
+_VOLUME_SIGMA = 0.25
+_RATE_SIGMA = 0.1
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+def _jitter(rng: np.random.Generator, rate: np.ndarray, sigma: float = _RATE_SIGMA) -> np.ndarray:
+    return np.clip(rate * rng.lognormal(0.0, sigma, len(rate)), 0.0, 1.0)
+
+# A few hundred distinct audiences repeat across every period
+@functools.lru_cache(maxsize=65536)
+def _remap(audience: str, offset: int) -> str:
+    """Move the segment IDs an audience starts its entries with by `offset`."""
+    if not offset or not audience:
+        return audience
+    entries = []
+    for entry in audience.split(","):
+        stripped = entry.strip()
+        match = _SEGMENT_ID.match(stripped)
+        if match:
+            start, end = match.span(1)
+            entry = entry.replace(stripped, f"{stripped[:start]}{int(match.group(1)) + offset}{stripped[end:]}", 1)
+        entries.append(entry)
+    return ",".join(entries)
+
+@functools.lru_cache(maxsize=65536)
+def _remap_ids(ids: str, offset: int) -> str:
+    if not offset or ids in ("", "[]"):
+        return ids
+    return "[" + ", ".join(str(int(value) + offset) for value in ids.strip("[]").split(",") if value.strip()) + "]"
+
+class SyntheticDataService:
+    """
+    Campaign and segment data at a multiple of the bundled exports, for
+    load and benchmark runs. Campaigns are resampled from the real ones,
+    keeping their client and campaign names, audiences and the spread of
+    volumes and rates; counts and rates are recomputed so they stay
+    consistent with each other. Scale `n` spreads `n` times the campaigns
+    over `ceil(sqrt(n))` consecutive periods as long as the export's (in
+    whole weeks, so the weekday mix holds), so history and daily volume
+    both grow. Each period has its own generation of the segment list,
+    reused the way the export reuses it. Output has the export's
+    columns, so `IngestService` loads it as-is.
+    """
+    CAMPAIGNS = "2nd_cleaned_campaign_data.csv"
+    SEGMENTS = "1st_cleaned_segments.csv"
+
+    @staticmethod
+    def _read(name: str) -> pd.DataFrame:
+        return pd.read_csv(os.path.join(logger_settings.DATA_DIR, name), dtype=str,
+                           keep_default_na=False, index_col=False, encoding="utf-8")
+
+    @staticmethod
+    def _periods(scale: int) -> int:
+        return max(1, math.ceil(math.sqrt(scale)))
+
+    @staticmethod
+    def _stride(segments: pd.DataFrame) -> int:
+        """ID offset between segment generations, the next power of ten."""
+        return 10 ** len(str(segments["Segment ID"].astype(int).max()))
+
+    @classmethod
+    def segments(cls, scale: int) -> pd.DataFrame:
+        """The segment list with its later generations appended."""
+        source = cls._read(cls.SEGMENTS)
+        stride = cls._stride(source)
+        frames = []
+        for generation in range(cls._periods(scale)):
+            frame = source.copy()
+            if generation:
+                frame["Segment ID"] = (source["Segment ID"].astype(int) + generation * stride).astype(str)
+                frame["Segment Name"] = source["Segment Name"] + f" ({generation + 1})"
+            frames.append(frame)
+        return pd.concat(frames, ignore_index=True)
+
+    @classmethod
+    def _block(cls, source: pd.DataFrame, rng: np.random.Generator, size: int, shift: int,
+               offset: int) -> pd.DataFrame:
+        """`size` campaigns resampled from `source`, `shift` days earlier."""
+        sample = source.iloc[rng.integers(0, len(source), size)].reset_index(drop=True)
+        number = {column: pd.to_numeric(sample[column], errors="coerce").fillna(0).to_numpy(float)
+                  for column in sample.columns if column in _COUNTS or column == "Daily revenue"}
+        volume = rng.lognormal(0.0, _VOLUME_SIGMA, size)
+        sent = np.maximum(1, np.rint(number["Sent"] * volume))
+        hard = np.rint(sent * _jitter(rng, _ratio(number["Hard bounces"], number["Sent"])))
+        soft = np.rint(sent * _jitter(rng, _ratio(number["Soft bounces"], number["Sent"])))
+        non_delivered = np.minimum(hard + soft, sent)
+        delivered = sent - non_delivered
+        mpp = np.rint(delivered * _jitter(rng, _ratio(number["Apple MPP Opens"], number["Delivered"])))
+        trackable = delivered - mpp
+        opens = np.rint(trackable * _jitter(rng, _ratio(number["Opens"], number["Delivered"] - number["Apple MPP Opens"])))
+        total_opens = np.maximum(opens, np.rint(opens * _ratio(number["Total opens"], number["Opens"])))
+        clicked = np.rint(opens * _jitter(rng, _ratio(number["Clicked"], number["Opens"])))
+        total_clicked = np.maximum(clicked, np.rint(clicked * _ratio(number["Total clicked"], number["Clicked"])))
+        unsubscribed = np.rint(delivered * _jitter(rng, _ratio(number["Unsubscribed"], number["Delivered"])))
+        complaints = np.rint(delivered * _jitter(rng, _ratio(number["Complaints"], number["Delivered"])))
+        # Most campaigns earn nothing; the rest follow their volume
+        revenue = number["Daily revenue"] * volume * rng.lognormal(0.0, _RATE_SIGMA, size)
+
+        counts = {
+            "Sent": sent, "Non delivered": non_delivered, "Hard bounces": hard, "Soft bounces": soft,
+            "Delivered": delivered, "Total opens": total_opens, "Opens": opens, "Apple MPP Opens": mpp,
+            "Total clicked": total_clicked, "Clicked": clicked, "Unsubscribed": unsubscribed, "Complaints": complaints,
+        }
+        rates = {
+            "Non delivered rate": _ratio(non_delivered, sent), "Delivered rate": _ratio(delivered, sent),
+            "Hard Bounces rate": _ratio(hard, sent), "Soft Bounces rate": _ratio(soft, sent),
+            "Trackable open rate": _ratio(opens, trackable), "Click rate": _ratio(clicked, delivered),
+            "Click-to-Open rate": _ratio(clicked, opens), "Unsubscription rate": _ratio(unsubscribed, delivered),
+            "Complaints rate": _ratio(complaints, delivered),
+        }
+        for column, values in counts.items():
+            sample[column] = values.astype("int64").astype(str)
+        for column, values in rates.items():
+            sample[column] = np.round(values, 4).astype(str)
+        sample["Daily revenue"] = np.round(revenue, 2).astype(str)
+
+        dates = pd.to_datetime(sample["Sending date"], format="%Y-%m-%d", errors="coerce") - pd.Timedelta(days=int(shift))
+        sample["Sending date"] = dates.dt.strftime("%Y-%m-%d").fillna("")
+        for column in ("audience_segment_a", "audience_segment_b"):
+            sample[column] = [_remap(audience, offset) for audience in sample[column]]
+        for column in ("Audience Segment A IDs", "Audience Segment B IDs"):
+            sample[column] = [_remap_ids(ids, offset) for ids in sample[column]]
+        return sample.sort_values("Sending date", kind="stable").reset_index(drop=True)
+
+    @classmethod
+    def campaigns(cls, scale: int, seed: int = 0, start_id: int = 1,
+                  chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Campaigns in chunks of about `chunk_rows`, oldest first, with IDs
+        counting up from `start_id`. The same seed gives the same data.
+        """
+        chunk_rows = chunk_rows or logger_settings.INGEST_CHUNK_SIZE
+        source = cls._read(cls.CAMPAIGNS)
+        dates = pd.to_datetime(source["Sending date"], format="%Y-%m-%d", errors="coerce")
+        span = 7 * math.ceil(((dates.max() - dates.min()).days + 1) / 7)
+        periods = cls._periods(scale)
+        stride = cls._stride(cls._read(cls.SEGMENTS))
+        total = len(source) * scale
+        rng = np.random.default_rng(seed)
+        next_id = start_id
+        for period in range(periods):
+            remaining = total * (period + 1) // periods - total * period // periods
+            while remaining:
+                size = min(remaining, chunk_rows)
+                chunk = cls._block(source, rng, size, (periods - 1 - period) * span, period * stride)
+                chunk["campaign_id"] = [str(next_id + i) for i in range(size)]
+                next_id += size
+                remaining -= size
+                yield chunk
+
+    @staticmethod
+    def write_csv(chunks: Iterator[pd.DataFrame], path: str) -> int:
+        rows = 0
+        for chunk in chunks:
+            chunk.to_csv(path, mode="a" if rows else "w", header=not rows, index=False, encoding="utf-8")
+            rows += len(chunk)
+        return rows
+
+    @staticmethod
+    def write_parquet(chunks: Iterator[pd.DataFrame], path: str, schema: List[Tuple[str, str, str]]) -> int:
+        """Typed columns named like the table's, one row group per chunk."""
+        arrow_schema = pa.schema([(column, _PARQUET_TYPES[kind.split(":")[0]]) for _, column, kind in schema])
+        rows = 0
+        with pq.ParquetWriter(path, arrow_schema, compression=logger_settings.EXPORT_COLUMNAR_COMPRESSION) as writer:
+            for chunk in chunks:
+                columns = IngestService.convert(chunk, schema)
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, arrow_schema)],
+                    schema=arrow_schema
+                ))
+                rows += len(chunk)
+        return rows
+
+    @classmethod
+    def write_files(cls, output_dir: str, fmt: str, scale: int, seed: int = 0, start_id: int = 1) -> Dict[str, str]:
+        """
+        Write `campaigns` and `segments` as CSV (export columns) or parquet
+        (table columns) under `output_dir`.
+        Returns:
+            Dict[str, str]: path per table.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {}
+        for table, chunks, schema in (
+            ("campaigns", cls.campaigns(scale, seed, start_id), CAMPAIGN_SCHEMA),
+            ("segments", iter([cls.segments(scale)]), SEGMENT_SCHEMA),
+        ):
+            path = os.path.join(output_dir, f"{table}_x{scale}.{fmt}")
+            rows = cls.write_csv(chunks, path) if fmt == "csv" else cls.write_parquet(chunks, path, schema)
+            logger.info(f"Wrote {rows} synthetic {table} to {path}.")
+            paths[table] = path
+        return paths
+
+    @classmethod
+    async def load(cls, database: str, scale: int, seed: int = 0, start_id: int = 1) -> Tuple[int, int]:
+        """
+        COPY the generated data into the `records` tables of `database`,
+        created if missing, through the ingest staging path and bump its
+        dataset version. Rows with the same IDs are replaced, so the
+        app's own database (`AUTH_DB`) is refused.
+        Returns:
+            Tuple[int, int]: campaigns and segments inserted or changed.
+        """
+        if database == logger_settings.AUTH_DB:
+            raise ValueError(f"Refusing to load synthetic data into the app database {database!r}; "
+                             f"name a separate one.")
+        try:
+            conn = await AuthDatabaseService._connect(database)
+        except asyncpg.InvalidCatalogNameError:
+            admin = await AuthDatabaseService._connect("postgres")
+            try:
+                await admin.execute(f'CREATE DATABASE "{database}"')
+            finally:
+                await admin.close()
+            conn = await AuthDatabaseService._connect(database)
+        try:
+            await MigrationService.migrate(conn)
+            if not await IngestService.try_lock(conn):
+                raise RuntimeError("Another process is ingesting; try again when it finishes.")
+            try:
+                async with conn.transaction():
+                    campaigns = await IngestService.load_chunks(
+                        conn, cls.campaigns(scale, seed, start_id), "records.email_campaigns",
+                        CAMPAIGN_SCHEMA, "campaign_id"
+                    )
+                    segments = await IngestService.load_chunks(
+                        conn, [cls.segments(scale)], "records.segments", SEGMENT_SCHEMA, "segment_id"
+                    )
+                    await conn.execute(await SqlQuery.read_sql("com/de/data/sync_campaign_segments"))
+                    # The NOTIFY reaches processes serving `database`; this one serves AUTH_DB
+                    await DatasetVersionService.bump(conn)
+            finally:
+                await IngestService.unlock(conn)
+        finally:
+            await conn.close()
+        return campaigns, segments
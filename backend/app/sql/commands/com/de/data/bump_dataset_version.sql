@@ -0,0 +1,8 @@
+-- Bump the dataset version and notify listeners (delivered on commit)
+WITH bumped AS (
+    UPDATE records.dataset_version
+    SET version = version + 1, updated_at = now()
+    RETURNING version
+)
+SELECT version, pg_notify('{channel}', version::text)
+FROM bumped;
\ No newline at end of file
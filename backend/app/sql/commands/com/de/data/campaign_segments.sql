@@ -0,0 +1,10 @@
+-- One row per campaign and audience segment, parsed once at ingest
+CREATE TABLE IF NOT EXISTS records.campaign_segments (
+    campaign_id   INTEGER NOT NULL REFERENCES records.email_campaigns (campaign_id) ON DELETE CASCADE,
+    segment_id    INTEGER NOT NULL,
+    slot          CHAR(1) NOT NULL CHECK (slot IN ('a', 'b')),
+    sending_date  DATE,
+    PRIMARY KEY (campaign_id, slot, segment_id)
+);
+CREATE INDEX IF NOT EXISTS campaign_segments_segment_date_idx
+    ON records.campaign_segments (segment_id, sending_date);
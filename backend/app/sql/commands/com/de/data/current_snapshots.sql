@@ -0,0 +1,3 @@
+SELECT key
+FROM records.dashboard_snapshots
+WHERE dataset_version = $1 AND bucket = $2;
@@ -0,0 +1,11 @@
+-- Precomputed dashboard payloads, one row per endpoint and parameter set
+CREATE TABLE IF NOT EXISTS records.dashboard_snapshots (
+    key               TEXT PRIMARY KEY,
+    namespace         TEXT NOT NULL,
+    params            JSONB NOT NULL,
+    dataset_version   BIGINT NOT NULL,
+    bucket            BIGINT NOT NULL,
+    payload           JSONB NOT NULL,
+    elapsed_ms        DOUBLE PRECISION,
+    computed_at       TIMESTAMPTZ NOT NULL DEFAULT now()
+);
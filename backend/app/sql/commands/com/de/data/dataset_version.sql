@@ -0,0 +1,7 @@
+-- Monotonic dataset version, bumped by every ingest
+CREATE TABLE IF NOT EXISTS records.dataset_version (
+    id            BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version       BIGINT NOT NULL DEFAULT 0,
+    updated_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+INSERT INTO records.dataset_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
\ No newline at end of file
@@ -0,0 +1,16 @@
+-- Derived columns and indexes for the predicates every insight query uses
+ALTER TABLE records.email_campaigns
+    ADD COLUMN IF NOT EXISTS client            TEXT GENERATED ALWAYS AS (SPLIT_PART(campaign_name, ' - ', 1)) STORED,
+    ADD COLUMN IF NOT EXISTS sending_year      INTEGER GENERATED ALWAYS AS (EXTRACT(YEAR FROM sending_date)::int) STORED,
+    ADD COLUMN IF NOT EXISTS sending_month     INTEGER GENERATED ALWAYS AS (EXTRACT(MONTH FROM sending_date)::int) STORED,
+    ADD COLUMN IF NOT EXISTS sending_iso_year  INTEGER GENERATED ALWAYS AS (EXTRACT(ISOYEAR FROM sending_date)::int) STORED,
+    ADD COLUMN IF NOT EXISTS sending_week      INTEGER GENERATED ALWAYS AS (EXTRACT(WEEK FROM sending_date)::int) STORED;
+
+CREATE INDEX IF NOT EXISTS email_campaigns_sending_date_idx
+    ON records.email_campaigns (sending_date);
+CREATE INDEX IF NOT EXISTS email_campaigns_client_sending_date_idx
+    ON records.email_campaigns (client, sending_date);
+CREATE INDEX IF NOT EXISTS email_campaigns_segment_a_ids_idx
+    ON records.email_campaigns USING GIN (audience_segment_a_ids jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS email_campaigns_segment_b_ids_idx
+    ON records.email_campaigns USING GIN (audience_segment_b_ids jsonb_path_ops);
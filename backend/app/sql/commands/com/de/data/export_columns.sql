@@ -0,0 +1,5 @@
+-- Column types of an exported table, for typed columnar files
+SELECT column_name, udt_name, numeric_precision, numeric_scale
+FROM information_schema.columns
+WHERE table_schema = $1 AND table_name = $2
+ORDER BY ordinal_position;
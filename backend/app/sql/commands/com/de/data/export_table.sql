@@ -0,0 +1 @@
+SELECT * FROM "{schema}"."{table}";
@@ -0,0 +1,7 @@
+-- Tables of a schema offered for download, bookkeeping tables excluded
+SELECT table_name
+FROM information_schema.tables
+WHERE table_schema = $1
+  AND table_type = 'BASE TABLE'
+  AND NOT (table_name = ANY($2::text[]))
+ORDER BY table_name;
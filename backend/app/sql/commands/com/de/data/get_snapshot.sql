@@ -0,0 +1,3 @@
+SELECT payload
+FROM records.dashboard_snapshots
+WHERE key = $1 AND dataset_version = $2 AND bucket = $3;
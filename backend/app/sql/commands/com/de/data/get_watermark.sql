@@ -0,0 +1,3 @@
+SELECT source, checksum, last_key, last_date, row_count, loaded_at
+FROM records.ingest_watermarks
+WHERE source = $1;
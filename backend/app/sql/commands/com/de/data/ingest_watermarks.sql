@@ -0,0 +1,9 @@
+-- Last successful load per source file
+CREATE TABLE IF NOT EXISTS records.ingest_watermarks (
+    source        TEXT PRIMARY KEY,
+    checksum      TEXT NOT NULL,
+    last_key      BIGINT,
+    last_date     DATE,
+    row_count     BIGINT NOT NULL DEFAULT 0,
+    loaded_at     TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,12 @@
+-- Materialized view backing one insight query; mv_row_id keeps the query's
+-- row order and is the unique key REFRESH ... CONCURRENTLY needs
+CREATE SCHEMA IF NOT EXISTS {schema};
+DROP MATERIALIZED VIEW IF EXISTS {schema}.{view};
+CREATE MATERIALIZED VIEW {schema}.{view} AS
+SELECT q.*, row_number() OVER () AS mv_row_id
+FROM (
+{query}
+) q
+WITH DATA;
+CREATE UNIQUE INDEX {view}_mv_row_id ON {schema}.{view} (mv_row_id);
+COMMENT ON MATERIALIZED VIEW {schema}.{view} IS '{digest}';
@@ -0,0 +1,6 @@
+-- Existing insight views with the digest of the query they were built from
+SELECT m.matviewname AS view, obj_description(c.oid, 'pg_class') AS digest
+FROM pg_matviews m
+JOIN pg_namespace n ON n.nspname = m.schemaname
+JOIN pg_class c ON c.relname = m.matviewname AND c.relnamespace = n.oid
+WHERE m.schemaname = '{schema}';
@@ -0,0 +1,2 @@
+-- Rebuild an insight view without blocking readers
+REFRESH MATERIALIZED VIEW CONCURRENTLY {schema}.{view};
\ No newline at end of file
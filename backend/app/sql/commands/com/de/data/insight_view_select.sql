@@ -0,0 +1,2 @@
+-- Precomputed rows of an insight query, in the query's own order
+SELECT * FROM {schema}.{view} ORDER BY mv_row_id;
\ No newline at end of file
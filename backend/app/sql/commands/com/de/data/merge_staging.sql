@@ -0,0 +1,12 @@
+-- Upsert the staged rows, skipping the ones that did not change, and
+-- remember the keys that did
+WITH merged AS (
+    INSERT INTO {table} ({columns})
+    SELECT {columns} FROM {staging}
+    ON CONFLICT ({key}) DO UPDATE SET {updates}
+    WHERE ({current}) IS DISTINCT FROM ({incoming})
+    RETURNING {key}
+)
+INSERT INTO {changed} ({key})
+SELECT {key} FROM merged
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,3 @@
+-- Rows of older versions or buckets can never be read again
+DELETE FROM records.dashboard_snapshots
+WHERE dataset_version <> $1 OR bucket <> $2;
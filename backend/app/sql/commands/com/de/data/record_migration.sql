@@ -0,0 +1,2 @@
+INSERT INTO public.schema_migrations (version, name, checksum)
+VALUES ($1, $2, $3);
@@ -0,0 +1,7 @@
+-- Applied schema migrations, one row per script
+CREATE TABLE IF NOT EXISTS public.schema_migrations (
+    version       INTEGER PRIMARY KEY,
+    name          TEXT NOT NULL,
+    checksum      TEXT NOT NULL,
+    applied_at    TIMESTAMPTZ NOT NULL DEFAULT now()
+);
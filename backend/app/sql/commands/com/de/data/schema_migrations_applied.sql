@@ -0,0 +1,3 @@
+SELECT version, name, checksum
+FROM public.schema_migrations
+ORDER BY version;
@@ -0,0 +1 @@
+SELECT COALESCE(MAX(version), 0) FROM public.schema_migrations;
@@ -0,0 +1,9 @@
+INSERT INTO records.dashboard_snapshots (key, namespace, params, dataset_version, bucket, payload, elapsed_ms, computed_at)
+VALUES ($1, $2, $3, $4, $5, $6, $7, now())
+ON CONFLICT (key) DO UPDATE SET
+    params = EXCLUDED.params,
+    dataset_version = EXCLUDED.dataset_version,
+    bucket = EXCLUDED.bucket,
+    payload = EXCLUDED.payload,
+    elapsed_ms = EXCLUDED.elapsed_ms,
+    computed_at = EXCLUDED.computed_at;
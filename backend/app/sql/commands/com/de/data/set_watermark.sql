@@ -0,0 +1,11 @@
+-- Record the file checksum with the table's last key and date
+INSERT INTO records.ingest_watermarks (source, checksum, last_key, last_date, row_count, loaded_at)
+SELECT $1, $2, MAX({key}), {last_date}, COUNT(*), now()
+FROM {table}
+ON CONFLICT (source) DO UPDATE SET
+    checksum = EXCLUDED.checksum,
+    last_key = EXCLUDED.last_key,
+    last_date = EXCLUDED.last_date,
+    row_count = EXCLUDED.row_count,
+    loaded_at = EXCLUDED.loaded_at
+RETURNING last_key, last_date, row_count;
@@ -0,0 +1,5 @@
+-- Per-transaction staging table with the loader's typed schema, and the
+-- keys the loads in this transaction changed
+CREATE TEMP TABLE IF NOT EXISTS {staging} ({columns}) ON COMMIT DROP;
+TRUNCATE {staging};
+CREATE TEMP TABLE IF NOT EXISTS {changed} ({key} {key_type} PRIMARY KEY) ON COMMIT DROP;
@@ -0,0 +1,14 @@
+-- Rebuild the campaign/segment bridge rows of the campaigns this
+-- transaction's ingest changed, from their audience ID columns
+DELETE FROM records.campaign_segments
+WHERE campaign_id IN (SELECT campaign_id FROM changed_email_campaigns);
+INSERT INTO records.campaign_segments (campaign_id, segment_id, slot, sending_date)
+SELECT ec.campaign_id, ids.value::integer, audience.slot, ec.sending_date
+FROM records.email_campaigns ec
+CROSS JOIN LATERAL (
+    VALUES ('a', ec.audience_segment_a_ids), ('b', ec.audience_segment_b_ids)
+) audience (slot, segment_ids)
+CROSS JOIN LATERAL jsonb_array_elements_text(COALESCE(audience.segment_ids, '[]'::jsonb)) ids (value)
+WHERE ec.campaign_id IN (SELECT campaign_id FROM changed_email_campaigns)
+  AND ids.value ~ '^\d+$'
+ON CONFLICT DO NOTHING;
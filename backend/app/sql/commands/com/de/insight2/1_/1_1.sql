@@ -1,6 +1,6 @@
 -- Daily campaigns sent per client
 SELECT 
-    SPLIT_PART(campaign_name, ' - ', 1) as client,
+    client,
     sending_date,
     COUNT(*) as campaigns_per_day,
     SUM(sent) as total_sent_per_day,
@@ -13,5 +13,5 @@ SELECT
         ELSE 'No Campaigns'
     END as daily_frequency_pattern
 FROM records.email_campaigns
-GROUP BY SPLIT_PART(campaign_name, ' - ', 1), sending_date
+GROUP BY client, sending_date
 ORDER BY sending_date DESC, campaigns_per_day DESC;
\ No newline at end of file
@@ -1,8 +1,8 @@
 -- Weekly campaigns sent per client
 SELECT 
-    SPLIT_PART(campaign_name, ' - ', 1) as client,
-    EXTRACT(YEAR FROM sending_date) as year,
-    EXTRACT(WEEK FROM sending_date) as week,
+    client,
+    sending_iso_year as year,
+    sending_week as week,
     COUNT(*) as campaigns_per_week,
     SUM(sent) as total_sent_per_week,
     AVG(sent) as avg_campaign_size,
@@ -18,5 +18,5 @@ SELECT
         ELSE 'No Campaigns'
     END as weekly_frequency_category
 FROM records.email_campaigns
-GROUP BY SPLIT_PART(campaign_name, ' - ', 1), year, week
+GROUP BY client, year, week
 ORDER BY year DESC, week DESC, campaigns_per_week DESC;
\ No newline at end of file
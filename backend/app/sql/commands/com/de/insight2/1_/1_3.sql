@@ -1,8 +1,8 @@
 -- Monthly campaigns sent per client
 SELECT 
-    SPLIT_PART(campaign_name, ' - ', 1) as client,
-    EXTRACT(YEAR FROM sending_date) as year,
-    EXTRACT(MONTH FROM sending_date) as month,
+    client,
+    sending_year as year,
+    sending_month as month,
     COUNT(*) as campaigns_per_month,
     SUM(sent) as total_sent_per_month,
     AVG(sent) as avg_campaign_size,
@@ -19,5 +19,5 @@ SELECT
     -- Calculate campaigns per day average
     ROUND(COUNT(*)::decimal / NULLIF(COUNT(DISTINCT sending_date), 0), 2) as avg_campaigns_per_active_day
 FROM records.email_campaigns
-GROUP BY SPLIT_PART(campaign_name, ' - ', 1), year, month
+GROUP BY client, year, month
 ORDER BY year DESC, month DESC, campaigns_per_month DESC;
\ No newline at end of file
@@ -1,12 +1,12 @@
 -- Analyze consistency of sending patterns
 WITH daily_client_stats AS (
     SELECT 
-        SPLIT_PART(campaign_name, ' - ', 1) as client,
+        client,
         sending_date,
         COUNT(*) as daily_campaigns,
         SUM(sent) as daily_sent
     FROM records.email_campaigns
-    GROUP BY SPLIT_PART(campaign_name, ' - ', 1), sending_date
+    GROUP BY client, sending_date
 )
 SELECT 
     client,
@@ -4,7 +4,7 @@ SELECT
     COUNT(DISTINCT sending_date) as active_days,
     SUM(sent) as total_sent_volume,
     AVG(sent) as avg_campaign_size,
-    SPLIT_PART(campaign_name, ' - ', 1) AS client,
+    client,
     -- Aggressiveness score
     ROUND(COUNT(*)::decimal / NULLIF(COUNT(DISTINCT DATE_TRUNC('month', sending_date)), 0), 2) as avg_campaigns_per_month,
     -- Aggressiveness classification
@@ -26,6 +26,6 @@ SELECT
         ELSE 0 
     END as revenue_per_email
 FROM records.email_campaigns
-GROUP BY SPLIT_PART(campaign_name, ' - ', 1)
+GROUP BY client
 HAVING COUNT(*) >= 3  -- Only clients with at least 3 campaigns
 ORDER BY avg_campaigns_per_month DESC;
\ No newline at end of file
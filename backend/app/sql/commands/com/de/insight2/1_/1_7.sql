@@ -1,7 +1,7 @@
 -- Analyze if frequency aligns with engagement and revenue
 WITH client_metrics AS (
     SELECT 
-        SPLIT_PART(campaign_name, ' - ', 1) as client,
+        client,
         COUNT(*) as total_campaigns,
         COUNT(DISTINCT sending_date) as active_days,
         SUM(sent) as total_sent,
@@ -10,7 +10,7 @@ WITH client_metrics AS (
         SUM(daily_revenue) as total_revenue,
         AVG(daily_revenue) as avg_revenue_per_campaign
     FROM records.email_campaigns
-    GROUP BY SPLIT_PART(campaign_name, ' - ', 1)
+    GROUP BY client
 )
 SELECT 
     client,
@@ -1,11 +1,11 @@
 -- Compare frequency differences between clients
 WITH client_daily_patterns AS (
     SELECT 
-        SPLIT_PART(campaign_name, ' - ', 1) as client,
+        client,
         sending_date,
         COUNT(*) as daily_campaigns
     FROM records.email_campaigns
-    GROUP BY SPLIT_PART(campaign_name, ' - ', 1), sending_date
+    GROUP BY client, sending_date
 )
 SELECT 
     client,
@@ -1,25 +1,14 @@
 -- Monthly usage of each segment
 SELECT 
-    seg.value::integer as segment_id,
+    cs.segment_id,
     s.segment_name,
-    EXTRACT(YEAR FROM ec.sending_date) as year,
-    EXTRACT(MONTH FROM ec.sending_date) as month,
+    ec.sending_year as year,
+    ec.sending_month as month,
     COUNT(DISTINCT ec.campaign_id) as campaigns_this_month,
     COUNT(DISTINCT ec.sending_date) as days_used_this_month,
-    STRING_AGG(DISTINCT SPLIT_PART(ec.campaign_name, ' - ', 1), ', ') as clients_this_month
+    STRING_AGG(DISTINCT ec.client, ', ') as clients_this_month
 FROM records.email_campaigns ec
-CROSS JOIN LATERAL (
-    SELECT value
-    FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-    WHERE ec.audience_segment_a_ids IS NOT NULL 
-      AND ec.audience_segment_a_ids != '[]'::jsonb
-    UNION ALL
-    SELECT value
-    FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-    WHERE ec.audience_segment_b_ids IS NOT NULL 
-      AND ec.audience_segment_b_ids != '[]'::jsonb
-) seg
-JOIN records.segments s ON seg.value::integer = s.segment_id
-WHERE seg.value ~ '^\d+$'
-GROUP BY seg.value::integer, s.segment_name, year, month
+JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+JOIN records.segments s ON cs.segment_id = s.segment_id
+GROUP BY cs.segment_id, s.segment_name, year, month
 ORDER BY year DESC, month DESC, campaigns_this_month DESC;
\ No newline at end of file
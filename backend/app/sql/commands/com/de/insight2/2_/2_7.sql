@@ -1,24 +1,13 @@
 -- Track how frequently same segment is used on consecutive days
 WITH segment_daily_usage AS (
     SELECT DISTINCT
-        seg.value::integer as segment_id,
+        cs.segment_id,
         s.segment_name,
         ec.sending_date,
-        LAG(ec.sending_date) OVER (PARTITION BY seg.value::integer ORDER BY ec.sending_date) as previous_use_date
+        LAG(ec.sending_date) OVER (PARTITION BY cs.segment_id ORDER BY ec.sending_date) as previous_use_date
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    JOIN records.segments s ON seg.value::integer = s.segment_id
-    WHERE seg.value ~ '^\d+$'
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    JOIN records.segments s ON cs.segment_id = s.segment_id
 )
 SELECT 
     segment_id,
@@ -1,29 +1,18 @@
 -- Classify segments based on usage patterns
 WITH segment_usage_stats AS (
     SELECT 
-        seg.value::integer as segment_id,
+        cs.segment_id,
         s.segment_name,
         COUNT(DISTINCT ec.campaign_id) as total_campaigns,
         COUNT(DISTINCT ec.sending_date) as total_days_used,
         COUNT(DISTINCT DATE_TRUNC('month', ec.sending_date)) as months_active,
-        COUNT(DISTINCT SPLIT_PART(ec.campaign_name, ' - ', 1)) as unique_clients,
+        COUNT(DISTINCT ec.client) as unique_clients,
         AVG(ec.trackable_open_rate) * 100 as avg_open_rate_pct,
         AVG(ec.unsubscription_rate) * 100 as avg_unsub_rate_pct
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    JOIN records.segments s ON seg.value::integer = s.segment_id
-    WHERE seg.value ~ '^\d+$'
-    GROUP BY seg.value::integer, s.segment_name
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    JOIN records.segments s ON cs.segment_id = s.segment_id
+    GROUP BY cs.segment_id, s.segment_name
 )
 SELECT 
     segment_id,
@@ -3,8 +3,8 @@ WITH segment_monthly_volume AS (
     SELECT 
         seg.segment_id,
         s.segment_name,
-        EXTRACT(YEAR FROM ec.sending_date) AS year,
-        EXTRACT(MONTH FROM ec.sending_date) AS month,
+        ec.sending_year AS year,
+        ec.sending_month AS month,
         -- Get sent volume for campaigns where segment used alone
         AVG(CASE 
             WHEN NOT EXISTS (
@@ -7,18 +7,8 @@ SELECT
     COUNT(DISTINCT ec.campaign_id) as campaigns_per_day,
     AVG(ec.sent) as avg_sent_per_campaign
 FROM records.email_campaigns ec
-LEFT JOIN LATERAL (
-    SELECT value::integer as segment_id
-    FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-    WHERE ec.audience_segment_a_ids IS NOT NULL 
-      AND ec.audience_segment_a_ids != '[]'::jsonb
-) seg_a ON TRUE
-LEFT JOIN LATERAL (
-    SELECT value::integer as segment_id
-    FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-    WHERE ec.audience_segment_b_ids IS NOT NULL 
-      AND ec.audience_segment_b_ids != '[]'::jsonb
-) seg_b ON TRUE
+LEFT JOIN records.campaign_segments seg_a ON seg_a.campaign_id = ec.campaign_id AND seg_a.slot = 'a'
+LEFT JOIN records.campaign_segments seg_b ON seg_b.campaign_id = ec.campaign_id AND seg_b.slot = 'b'
 LEFT JOIN records.segments s ON COALESCE(seg_a.segment_id, seg_b.segment_id) = s.segment_id
 WHERE s.segment_id IS NOT NULL
 GROUP BY s.segment_id, s.segment_name, ec.sending_date
@@ -7,16 +7,8 @@ WITH segment_volume AS (
         COUNT(DISTINCT ec.campaign_id) as campaigns_last_30_days,
         COUNT(DISTINCT ec.sending_date) as days_active_last_30_days
     FROM records.email_campaigns ec
-    LEFT JOIN LATERAL (
-        SELECT value::integer as segment_id
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-    ) seg_a ON TRUE
-    LEFT JOIN LATERAL (
-        SELECT value::integer as segment_id
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-    ) seg_b ON TRUE
+    LEFT JOIN records.campaign_segments seg_a ON seg_a.campaign_id = ec.campaign_id AND seg_a.slot = 'a'
+    LEFT JOIN records.campaign_segments seg_b ON seg_b.campaign_id = ec.campaign_id AND seg_b.slot = 'b'
     LEFT JOIN records.segments s ON COALESCE(seg_a.segment_id, seg_b.segment_id) = s.segment_id
     WHERE s.segment_id IS NOT NULL
       AND ec.sending_date >= CURRENT_DATE - INTERVAL '30 days'
@@ -28,18 +20,8 @@ segment_size_estimate AS (
         s.segment_id,
         MAX(ec.sent) as estimated_segment_size
     FROM records.email_campaigns ec
-    LEFT JOIN LATERAL (
-        SELECT value::integer as segment_id
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-    ) seg_a ON TRUE
-    LEFT JOIN LATERAL (
-        SELECT value::integer as segment_id
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg_b ON TRUE
+    LEFT JOIN records.campaign_segments seg_a ON seg_a.campaign_id = ec.campaign_id AND seg_a.slot = 'a'
+    LEFT JOIN records.campaign_segments seg_b ON seg_b.campaign_id = ec.campaign_id AND seg_b.slot = 'b'
     LEFT JOIN records.segments s ON COALESCE(seg_a.segment_id, seg_b.segment_id) = s.segment_id
     WHERE s.segment_id IS NOT NULL
       AND (ec.audience_segment_b IS NULL OR ec.audience_segment_b = '')
@@ -3,26 +3,16 @@ WITH monthly_stats AS (
     SELECT 
         s.segment_id,
         s.segment_name,
-        EXTRACT(YEAR FROM ec.sending_date) as year,
-        EXTRACT(MONTH FROM ec.sending_date) as month,
+        ec.sending_year as year,
+        ec.sending_month as month,
         SUM(ec.sent) as monthly_sent,
         COUNT(DISTINCT ec.campaign_id) as monthly_campaigns,
         COUNT(DISTINCT ec.sending_date) as active_days,
         AVG(ec.trackable_open_rate) * 100 as avg_open_rate_pct,
         AVG(ec.unsubscription_rate) * 100 as avg_unsub_rate_pct
     FROM records.email_campaigns ec
-    LEFT JOIN LATERAL (
-        SELECT value::integer as segment_id
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-    ) seg_a ON TRUE
-    LEFT JOIN LATERAL (
-        SELECT value::integer as segment_id
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg_b ON TRUE
+    LEFT JOIN records.campaign_segments seg_a ON seg_a.campaign_id = ec.campaign_id AND seg_a.slot = 'a'
+    LEFT JOIN records.campaign_segments seg_b ON seg_b.campaign_id = ec.campaign_id AND seg_b.slot = 'b'
     LEFT JOIN records.segments s ON COALESCE(seg_a.segment_id, seg_b.segment_id) = s.segment_id
     WHERE s.segment_id IS NOT NULL
     GROUP BY s.segment_id, s.segment_name, year, month
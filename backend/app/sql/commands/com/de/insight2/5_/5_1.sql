@@ -3,21 +3,10 @@ WITH campaign_segments AS (
     SELECT DISTINCT
         ec.campaign_id,
         ec.sending_date,
-        SPLIT_PART(ec.campaign_name, ' - ', 1) as client,
-        seg.value::integer as segment_id
+        ec.client,
+        cs.segment_id
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    WHERE seg.value ~ '^\d+$'
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
 ),
 segment_combinations AS (
     SELECT 
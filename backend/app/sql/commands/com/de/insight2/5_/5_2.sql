@@ -2,23 +2,12 @@
 WITH daily_segment_usage AS (
     SELECT 
         ec.sending_date,
-        seg.value::integer as segment_id,
+        cs.segment_id,
         COUNT(DISTINCT ec.campaign_id) as campaigns_per_day,
-        STRING_AGG(DISTINCT SPLIT_PART(ec.campaign_name, ' - ', 1), ', ') as clients_per_day
+        STRING_AGG(DISTINCT ec.client, ', ') as clients_per_day
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    WHERE seg.value ~ '^\d+$'
-    GROUP BY ec.sending_date, seg.value::integer
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    GROUP BY ec.sending_date, cs.segment_id
 )
 SELECT 
     dsu.sending_date,
@@ -2,27 +2,16 @@
 WITH daily_exposure AS (
     SELECT 
         ec.sending_date,
-        seg.value::integer as segment_id,
+        cs.segment_id,
         s.segment_name,
         COUNT(DISTINCT ec.campaign_id) as daily_exposures,
         SUM(ec.sent) as total_emails_sent,
         AVG(ec.delivered_rate) * 100 as avg_delivery_rate,
         AVG(ec.unsubscription_rate) * 100 as avg_unsub_rate
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    JOIN records.segments s ON seg.value::integer = s.segment_id
-    WHERE seg.value ~ '^\d+$'
-    GROUP BY ec.sending_date, seg.value::integer, s.segment_name
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    JOIN records.segments s ON cs.segment_id = s.segment_id
+    GROUP BY ec.sending_date, cs.segment_id, s.segment_name
 ),
 exposure_summary AS (
     SELECT 
@@ -1,6 +1,6 @@
 -- Engagement metrics by client
 SELECT 
-    SPLIT_PART(campaign_name, ' - ', 1) as client,
+    client,
     COUNT(*) as total_campaigns,
     AVG(trackable_open_rate) * 100 as avg_open_rate_pct,
     AVG(click_rate) * 100 as avg_click_rate_pct,
@@ -18,5 +18,5 @@ SELECT
         ELSE 'Poor Engagement'
     END as engagement_level
 FROM records.email_campaigns
-GROUP BY SPLIT_PART(campaign_name, ' - ', 1)
+GROUP BY client
 ORDER BY avg_open_rate_pct DESC;
\ No newline at end of file
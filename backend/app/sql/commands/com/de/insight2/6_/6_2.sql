@@ -17,17 +17,7 @@ SELECT
         ELSE 'Poor Engagement Segment'
     END as segment_engagement_level
 FROM records.email_campaigns ec
-CROSS JOIN LATERAL (
-    SELECT value::integer as segment_id
-    FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-    WHERE ec.audience_segment_a_ids IS NOT NULL 
-      AND ec.audience_segment_a_ids != '[]'::jsonb
-    UNION ALL
-    SELECT value::integer as segment_id
-    FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-    WHERE ec.audience_segment_b_ids IS NOT NULL 
-      AND ec.audience_segment_b_ids != '[]'::jsonb
-) seg
+JOIN records.campaign_segments seg ON seg.campaign_id = ec.campaign_id
 JOIN records.segments s ON seg.segment_id = s.segment_id
 GROUP BY s.segment_id, s.segment_name
 HAVING COUNT(DISTINCT ec.campaign_id) >= 3
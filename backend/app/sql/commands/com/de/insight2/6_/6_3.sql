@@ -1,27 +1,16 @@
 -- Analyze how engagement changes with frequency
 WITH segment_frequency AS (
     SELECT 
-        seg.value::integer as segment_id,
+        cs.segment_id,
         s.segment_name,
         ec.sending_date,
-        COUNT(*) OVER (PARTITION BY seg.value::integer, DATE_TRUNC('week', ec.sending_date)) as campaigns_per_week,
+        COUNT(*) OVER (PARTITION BY cs.segment_id, DATE_TRUNC('week', ec.sending_date)) as campaigns_per_week,
         ec.trackable_open_rate,
         ec.click_rate,
         ec.unsubscription_rate
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    JOIN records.segments s ON seg.value::integer = s.segment_id
-    WHERE seg.value ~ '^\d+$'
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    JOIN records.segments s ON cs.segment_id = s.segment_id
 )
 SELECT 
     campaigns_per_week,
@@ -1,30 +1,19 @@
 -- Analyze engagement decay as email pressure increases
 WITH segment_daily_pressure AS (
     SELECT 
-        seg.value::integer as segment_id,
+        cs.segment_id,
         s.segment_name,
         ec.sending_date,
-        COUNT(*) OVER (PARTITION BY seg.value::integer ORDER BY ec.sending_date 
+        COUNT(*) OVER (PARTITION BY cs.segment_id ORDER BY ec.sending_date 
                       RANGE BETWEEN INTERVAL '7 days' PRECEDING AND CURRENT ROW) as emails_last_7_days,
         ec.trackable_open_rate,
         ec.click_rate,
         ec.unsubscription_rate,
         ec.delivered
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    JOIN records.segments s ON seg.value::integer = s.segment_id
-    WHERE seg.value ~ '^\d+$'
-      AND ec.delivered > 100  -- Ensure reasonable sample size
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    JOIN records.segments s ON cs.segment_id = s.segment_id
+      WHERE ec.delivered > 100  -- Ensure reasonable sample size
 )
 SELECT 
     emails_last_7_days,
@@ -1,30 +1,19 @@
 -- Analyze how one campaign affects next-day performance
 WITH campaign_sequence AS (
     SELECT 
-        seg.value::integer as segment_id,
+        cs.segment_id,
         s.segment_name,
         ec.campaign_id,
         ec.sending_date,
         ec.trackable_open_rate as open_rate_today,
         ec.click_rate as click_rate_today,
-        LEAD(ec.trackable_open_rate) OVER (PARTITION BY seg.value::integer ORDER BY ec.sending_date) as open_rate_next_day,
-        LEAD(ec.click_rate) OVER (PARTITION BY seg.value::integer ORDER BY ec.sending_date) as click_rate_next_day,
+        LEAD(ec.trackable_open_rate) OVER (PARTITION BY cs.segment_id ORDER BY ec.sending_date) as open_rate_next_day,
+        LEAD(ec.click_rate) OVER (PARTITION BY cs.segment_id ORDER BY ec.sending_date) as click_rate_next_day,
         -- Check if next day has campaign
-        LEAD(ec.campaign_id) OVER (PARTITION BY seg.value::integer ORDER BY ec.sending_date) as next_day_campaign
+        LEAD(ec.campaign_id) OVER (PARTITION BY cs.segment_id ORDER BY ec.sending_date) as next_day_campaign
     FROM records.email_campaigns ec
-    CROSS JOIN LATERAL (
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
-        WHERE ec.audience_segment_a_ids IS NOT NULL 
-          AND ec.audience_segment_a_ids != '[]'::jsonb
-        UNION ALL
-        SELECT value
-        FROM jsonb_array_elements_text(ec.audience_segment_b_ids)
-        WHERE ec.audience_segment_b_ids IS NOT NULL 
-          AND ec.audience_segment_b_ids != '[]'::jsonb
-    ) seg
-    JOIN records.segments s ON seg.value::integer = s.segment_id
-    WHERE seg.value ~ '^\d+$'
+    JOIN records.campaign_segments cs ON cs.campaign_id = ec.campaign_id
+    JOIN records.segments s ON cs.segment_id = s.segment_id
 )
 SELECT 
     segment_id,
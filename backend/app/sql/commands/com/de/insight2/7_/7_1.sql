@@ -1,7 +1,7 @@
 -- Estimate new registrations from recent registration segments
 SELECT 
-    EXTRACT(YEAR FROM sending_date) as year,
-    EXTRACT(MONTH FROM sending_date) as month,
+    sending_year as year,
+    sending_month as month,
     COUNT(DISTINCT campaign_id) as campaigns_with_new_users,
     SUM(sent) as estimated_new_users_reached,
     AVG(sent) as avg_campaign_size_to_new_users,
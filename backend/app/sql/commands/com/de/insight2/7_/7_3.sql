@@ -1,8 +1,8 @@
 -- Analyze list growth vs decay over time
 WITH monthly_list_metrics AS (
     SELECT 
-        EXTRACT(YEAR FROM sending_date) as year,
-        EXTRACT(MONTH FROM sending_date) as month,
+        sending_year as year,
+        sending_month as month,
         -- Estimate active list size (max sent in month)
         MAX(sent) as estimated_active_list_size,
         -- Campaign volume
@@ -1,8 +1,8 @@
 -- Estimate realistic usable list size
 WITH monthly_active_estimation AS (
     SELECT 
-        EXTRACT(YEAR FROM sending_date) as year,
-        EXTRACT(MONTH FROM sending_date) as month,
+        sending_year as year,
+        sending_month as month,
         -- Different estimation methods
         MAX(sent) as max_campaign_size,
         AVG(sent) as avg_campaign_size,
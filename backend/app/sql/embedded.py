@@ -0,0 +1,144 @@
+import asyncio
+import re
+from typing import Any, Dict, List, Optional
+import duckdb
+from app.core.config import logger_settings, Settings
+from app.scripts.fileIO import fact_versions, load_facts
+logger = logger_settings.get_logger(__name__)
+
+# Words that may follow a set-returning call and are not its alias
+_KEYWORDS = {
+    "where", "join", "left", "right", "inner", "cross", "full", "on", "group", "order",
+    "union", "limit", "having", "window", "and", "or", "natural",
+}
+
+_ELEMENTS = re.compile(r"jsonb_array_elements_text\(([^()]*)\)(\s+(?:AS\s+)?([A-Za-z_]\w*))?", re.IGNORECASE)
+
+# (pattern, replacement) applied after the set-returning calls. SPLIT_PART,
+# DATE_TRUNC and EXTRACT(WEEK ...) (ISO weeks) behave the same in both engines.
+_REWRITES = [
+    # Postgres numeric has no fixed scale; DuckDB's DECIMAL defaults to 3 digits
+    (re.compile(r"::\s*(?:decimal|numeric)\b(?!\s*\()", re.IGNORECASE), "::DOUBLE"),
+    (re.compile(r"::\s*jsonb\b", re.IGNORECASE), "::JSON"),
+    # Postgres sorts DISTINCT aggregate input; DuckDB keeps first-seen order
+    (re.compile(r"STRING_AGG\(\s*DISTINCT\s+([^,()]+?)\s*,\s*('[^']*')\s*\)", re.IGNORECASE),
+     r"STRING_AGG(DISTINCT \1, \2 ORDER BY \1)"),
+]
+
+def _elements(match: re.Match) -> str:
+    """
+    `jsonb_array_elements_text(x) [alias]` as a subquery. Postgres names the
+    column after the alias when there is one and `value` otherwise.
+    """
+    argument, tail, alias = match.groups()
+    if alias is None or alias.lower() in _KEYWORDS:
+        return f"(SELECT UNNEST(json_extract_string({argument}, '$[*]')) AS value) AS _elements{tail or ''}"
+    return f"(SELECT UNNEST(json_extract_string({argument}, '$[*]')) AS {alias}) AS {alias}"
+
+def translate(text: str) -> str:
+    """Rewrite the Postgres-only parts of a library query for DuckDB."""
+    text = _ELEMENTS.sub(_elements, text)
+    for pattern, replacement in _REWRITES:
+        text = pattern.sub(replacement, text)
+    return text
+
+class EmbeddedConnection:
+    """
+    The subset of an asyncpg connection the insight library uses, backed by
+    an in-process DuckDB database. Queries are translated from Postgres,
+    run on a worker thread with their own cursor, and return dict rows.
+    """
+    # No materialized views; library queries always run directly
+    embedded = True
+
+    def __init__(self, database: duckdb.DuckDBPyConnection, version: int):
+        self.database = database
+        self.version = version
+
+    def _fetch(self, query: str, args: tuple) -> List[Dict[str, Any]]:
+        cursor = self.database.cursor()
+        try:
+            result = cursor.execute(translate(query), list(args) or None)
+            if result.description is None:
+                return []
+            columns = [column[0] for column in result.description]
+            return [dict(zip(columns, row)) for row in result.fetchall()]
+        finally:
+            cursor.close()
+
+    async def fetch(self, query: str, *args, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch, query, args)
+
+    async def fetchrow(self, query: str, *args, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        rows = await self.fetch(query, *args)
+        return rows[0] if rows else None
+
+    async def fetchval(self, query: str, *args, column: int = 0, timeout: Optional[float] = None) -> Any:
+        row = await self.fetchrow(query, *args)
+        return list(row.values())[column] if row else None
+
+    async def execute(self, query: str, *args, timeout: Optional[float] = None) -> str:
+        await self.fetch(query, *args)
+        return ""
+
+class _EmbeddedAcquire:
+    def __init__(self, conn: EmbeddedConnection):
+        self.conn = conn
+
+    def __await__(self):
+        async def conn():
+            return self.conn
+        return conn().__await__()
+
+    async def __aenter__(self) -> EmbeddedConnection:
+        return self.conn
+
+    async def __aexit__(self, *exc) -> None:
+        pass
+
+class EmbeddedPool(EmbeddedConnection):
+    """
+    Stands in for the asyncpg pool: `acquire()` hands out the shared
+    connection, whose queries each get their own DuckDB cursor.
+    """
+
+    @classmethod
+    def open(cls, version: Optional[int] = None, root: Optional[str] = None) -> "EmbeddedPool":
+        """
+        Expose a fact snapshot (the newest by default) as the `records`
+        schema of a new in-memory DuckDB database.
+        """
+        root = root or logger_settings.EXPORTS_DIR
+        if version is None:
+            versions = fact_versions(root)
+            if not versions:
+                raise FileNotFoundError(f"No fact snapshot under {root}; run `de-analytics extract-facts`.")
+            version = versions[-1]
+        database = duckdb.connect(":memory:")
+        # int / int truncates in Postgres
+        database.execute("SET GLOBAL integer_division = true")
+        database.execute("CREATE SCHEMA records")
+        for table, arrow in load_facts(version, root).items():
+            # Registered Arrow data is only visible to this connection, not to
+            # the per-query cursors; load it into native columnar tables
+            database.register("_facts", arrow)
+            columns = ", ".join(
+                # Segment ID lists back to the JSON arrays the queries expect
+                f'to_json("{field.name}")::JSON AS "{field.name}"' if field.name.endswith("_ids")
+                else f'"{field.name}"'
+                for field in arrow.schema
+            )
+            database.execute(f'CREATE TABLE records."{table}" AS SELECT {columns} FROM _facts')
+            database.unregister("_facts")
+        database.execute(f"CREATE VIEW records.dataset_version AS SELECT {int(version)} AS version")
+        logger.info(f"Opened the fact snapshot of dataset version {version} in DuckDB.")
+        return cls(database, version)
+
+    def acquire(self, *, timeout: Optional[float] = None) -> _EmbeddedAcquire:
+        return _EmbeddedAcquire(self)
+
+    async def release(self, conn: EmbeddedConnection, *, timeout: Optional[float] = None) -> None:
+        pass
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        self.database.close()
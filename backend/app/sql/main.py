@@ -1,29 +1,259 @@
 import os, re
-from typing import Optional
+import asyncio
+import time
+import string
+import threading
+from typing import Optional, Dict, FrozenSet, Tuple, Any, NamedTuple
 from app.core.config import logger_settings, Settings
+from app.services.metrics_service import MetricsService
 logger = logger_settings.get_logger(__name__)
 import aiofiles
 
+# A bound placeholder that ended up inside a string literal, e.g. '{start_date}'
+_QUOTED_PLACEHOLDER = re.compile(r"'(\$\d+)'")
+
+class BoundQuery(NamedTuple):
+    """Statement text with `$n` placeholders and the values to bind to them."""
+    name: str
+    text: str
+    args: tuple
+
+class SqlTemplate:
+    """
+    A `.sql` file held in memory by the registry.
+    The format fields are parsed once when the file is loaded and every
+    rendered variant is kept, so repeated requests never touch the disk.
+    """
+    __slots__ = ("name", "path", "text", "fields", "error", "mtime_ns", "size", "_rendered")
+
+    def __init__(self, name: str, path: str, text: str, mtime_ns: int, size: int):
+        self.name = name
+        self.path = path
+        self.text = text
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.fields: Optional[FrozenSet[str]] = None
+        self.error: Optional[str] = None
+        self._rendered: Dict[Tuple, str] = {}
+        try:
+            self.fields = frozenset(
+                field.split(".")[0].split("[")[0]
+                for _, field, _, _ in string.Formatter().parse(text)
+                if field
+            )
+        except ValueError as e:
+            # Not a format template (e.g. literal braces); still readable raw
+            self.error = str(e)
+
+    def render(self, **kwargs) -> str:
+        try:
+            key = tuple(sorted(kwargs.items()))
+            rendered = self._rendered.get(key)
+        except TypeError:
+            # Unhashable arguments can't be cached
+            return self._format(kwargs)
+        if rendered is None:
+            rendered = self._format(kwargs)
+            if len(self._rendered) >= logger_settings.SQL_RENDER_CACHE_SIZE:
+                self._rendered.clear()
+            self._rendered[key] = rendered
+        return rendered
+
+    def bind(self, names: Tuple[str, ...], rewrites: Tuple[Tuple[str, str], ...] = (), **kwargs) -> str:
+        """
+        Render the template with `names` turned into `$1..$n` placeholders.
+        `rewrites` replace literal fragments of the file (e.g. `LIMIT 20`)
+        with format fields before rendering. The resulting text only depends
+        on the structural arguments, so Postgres sees one statement per
+        variant and can reuse its plan.
+        """
+        key = ("bind", names, rewrites, tuple(sorted(kwargs.items())))
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            text = self.text
+            for old, new in rewrites:
+                if old not in text:
+                    raise ValueError(f"Template {self.name} has no '{old}' to rewrite")
+                text = text.replace(old, new)
+            placeholders = {name: f"${i}" for i, name in enumerate(names, 1)}
+            rendered = _QUOTED_PLACEHOLDER.sub(r"\1", text.format(**kwargs, **placeholders))
+            for name, placeholder in placeholders.items():
+                if not re.search(rf"\{placeholder}(?!\d)", rendered):
+                    raise ValueError(f"Template {self.name} does not use bind parameter '{name}'")
+            if len(self._rendered) >= logger_settings.SQL_RENDER_CACHE_SIZE:
+                self._rendered.clear()
+            self._rendered[key] = rendered
+        return rendered
+
+    def _format(self, kwargs) -> str:
+        if self.error:
+            raise ValueError(f"Template {self.name} is not formattable: {self.error}")
+        return self.text.format(**kwargs)
+
+class SqlRegistry:
+    """
+    Process-wide registry of every template under `SQL_DIR`.
+    Lookups are plain dict reads; a background watcher reloads a template
+    only when its file changes on disk.
+    """
+    _templates: Dict[str, SqlTemplate] = {}
+    _lock = threading.Lock()
+    _watcher: Optional[asyncio.Task] = None
+    _loaded: bool = False
+
+    @staticmethod
+    def _name_for(path: str) -> str:
+        rel = os.path.relpath(path, logger_settings.SQL_DIR)
+        return os.path.splitext(rel)[0].replace(os.sep, "/")
+
+    @classmethod
+    def _load_file(cls, path: str) -> SqlTemplate:
+        stat = os.stat(path)
+        with open(path, "r", encoding="utf-8") as file:
+            text = file.read()
+        template = SqlTemplate(cls._name_for(path), path, text, stat.st_mtime_ns, stat.st_size)
+        if not text.strip():
+            logger.warning(f"SQL template {template.name} is empty.")
+        return template
+
+    @classmethod
+    def _scan(cls) -> Dict[str, str]:
+        found = {}
+        for root, _, files in os.walk(logger_settings.SQL_DIR):
+            for file in files:
+                if file.endswith(".sql"):
+                    path = os.path.join(root, file)
+                    found[cls._name_for(path)] = path
+        return found
+
+    @classmethod
+    def load_all(cls) -> int:
+        """
+        Load and validate every template under `SQL_DIR`.
+        Returns:
+            int: number of templates loaded.
+        """
+        templates = {}
+        for name, path in cls._scan().items():
+            try:
+                templates[name] = cls._load_file(path)
+            except Exception as e:
+                logger.error(f"An error occurred while loading {path}: {e}")
+        with cls._lock:
+            cls._templates = templates
+            cls._loaded = True
+        logger.info(f"Loaded {len(templates)} SQL templates from {logger_settings.SQL_DIR}.")
+        return len(templates)
+
+    @classmethod
+    def get(cls, sql_name: str) -> Optional[SqlTemplate]:
+        template = cls._templates.get(sql_name)
+        if template is None:
+            # Not loaded yet (new file, or registry used outside the app)
+            template = cls.reload(sql_name)
+        return template
+
+    @classmethod
+    def names(cls, prefix: str = "") -> list:
+        """Names of the loaded templates that start with `prefix`."""
+        if not cls._loaded:
+            cls.load_all()
+        return sorted(name for name in cls._templates if name.startswith(prefix))
+
+    @classmethod
+    def reload(cls, sql_name: str) -> Optional[SqlTemplate]:
+        path = os.path.join(logger_settings.SQL_DIR, f'{sql_name}.sql')
+        try:
+            template = cls._load_file(path)
+        except FileNotFoundError:
+            cls.evict(sql_name)
+            return None
+        with cls._lock:
+            cls._templates[sql_name] = template
+        return template
+
+    @classmethod
+    def evict(cls, sql_name: str) -> None:
+        with cls._lock:
+            cls._templates.pop(sql_name, None)
+
+    @classmethod
+    def refresh(cls) -> int:
+        """
+        Reload templates whose files changed, appeared or disappeared.
+        Returns:
+            int: number of templates that changed.
+        """
+        changed = 0
+        found = cls._scan()
+        for name, path in found.items():
+            current = cls._templates.get(name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if current is None or current.mtime_ns != stat.st_mtime_ns or current.size != stat.st_size:
+                try:
+                    template = cls._load_file(path)
+                except Exception as e:
+                    logger.error(f"An error occurred while reloading {path}: {e}")
+                    continue
+                with cls._lock:
+                    cls._templates[name] = template
+                logger.info(f"Reloaded SQL template {name}.")
+                changed += 1
+        for name in set(cls._templates) - set(found):
+            cls.evict(name)
+            changed += 1
+        return changed
+
+    @classmethod
+    async def _watch(cls, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(cls.refresh)
+            except Exception as e:
+                logger.error(f"An error occurred while watching {logger_settings.SQL_DIR}: {e}")
+
+    @classmethod
+    def start_watcher(cls, interval: float = None) -> None:
+        interval = logger_settings.SQL_RELOAD_INTERVAL if interval is None else interval
+        if interval and interval > 0 and cls._watcher is None:
+            cls._watcher = asyncio.create_task(cls._watch(interval))
+
+    @classmethod
+    async def stop_watcher(cls) -> None:
+        if cls._watcher is not None:
+            cls._watcher.cancel()
+            try:
+                await cls._watcher
+            except asyncio.CancelledError:
+                pass
+            cls._watcher = None
+
 class SqlQuery:
     @staticmethod
     async def read_sql(sql_name) -> str:
         try:
-            SQL_PATH = os.path.join(logger_settings.SQL_DIR, f'{sql_name}.sql')
-            async with aiofiles.open(SQL_PATH, 'r', encoding='utf-8') as file:
-                return await file.read()
-        except FileNotFoundError:
-            logger.error(f"File {SQL_PATH} not found.")
-            return ""
+            template = SqlRegistry.get(sql_name)
+            if template is None:
+                logger.error(f"File {SqlQuery.get_sql(sql_name)} not found.")
+                return ""
+            return template.text
         except Exception as e:
-            logger.error(f"An error occurred while reading {SQL_PATH}: {e}")
+            logger.error(f"An error occurred while reading {SqlQuery.get_sql(sql_name)}: {e}")
             return ""
     
     @staticmethod
     async def read_sql_full(sql_name: str, **kwargs) -> str:
-        sql_text = await SqlQuery.read_sql(sql_name)
-        if sql_text:  # Proceed only if the sql was successfully read
+        template = SqlRegistry.get(sql_name)
+        if template is None:
+            logger.error(f"File {SqlQuery.get_sql(sql_name)} not found.")
+            return ""
+        if template.text:  # Proceed only if the sql was successfully read
             try:
-                return sql_text.format(**kwargs)
+                return template.render(**kwargs)
             except KeyError as e:
                 logger.error(f"Error: Missing key {e} in formatting arguments.")
                 return ""
@@ -32,12 +262,68 @@ class SqlQuery:
                 return ""
         return ""
     
+    @staticmethod
+    async def read_sql_bound(sql_name: str, binds: Dict[str, Any] = None,
+                             rewrites: Dict[str, str] = None, **kwargs) -> Optional[BoundQuery]:
+        """
+        Render a template for execution with bind parameters.
+        Args:
+            binds: values sent as `$n` parameters, numbered in insertion order.
+            rewrites: literal fragments of the file to replace with format fields.
+            kwargs: structural format arguments (schema, column lists, ...).
+        Returns:
+            BoundQuery or None if the template could not be rendered.
+        """
+        template = SqlRegistry.get(sql_name)
+        if template is None:
+            logger.error(f"File {SqlQuery.get_sql(sql_name)} not found.")
+            return None
+        binds = binds or {}
+        try:
+            text = template.bind(tuple(binds), tuple((rewrites or {}).items()), **kwargs)
+            return BoundQuery(sql_name, text, tuple(binds.values()))
+        except KeyError as e:
+            logger.error(f"Error: Missing key {e} in formatting arguments.")
+        except Exception as e:
+            logger.error(f"An error occurred during binding: {e}")
+        return None
+
+    @staticmethod
+    async def fetch(conn, query: Optional[BoundQuery]) -> list:
+        """
+        Run a bound query. asyncpg prepares the statement on first use and keeps
+        it in the connection's statement cache, so later calls skip planning.
+        """
+        if query is None:
+            raise RuntimeError("SQL template could not be rendered.")
+        started, rows = time.perf_counter(), None
+        try:
+            rows = await conn.fetch(query.text, *query.args)
+            return rows
+        finally:
+            MetricsService.observe_query(query.name, time.perf_counter() - started,
+                                         None if rows is None else len(rows))
+
+    @staticmethod
+    async def fetchrow(conn, query: Optional[BoundQuery]):
+        if query is None:
+            raise RuntimeError("SQL template could not be rendered.")
+        started, ok, row = time.perf_counter(), False, None
+        try:
+            row = await conn.fetchrow(query.text, *query.args)
+            ok = True
+            return row
+        finally:
+            MetricsService.observe_query(query.name, time.perf_counter() - started,
+                                         (0 if row is None else 1) if ok else None)
+
     @staticmethod
     async def update_sql(sql_name, sql_text) -> None:
         try:
             SQL_PATH = os.path.join(logger_settings.SQL_DIR, f'{sql_name}.sql')
             async with aiofiles.open(SQL_PATH, 'w', encoding='utf-8') as file:
                 await file.write(sql_text)
+            SqlRegistry.reload(sql_name)
         except FileNotFoundError:
             logger.error(f"File {SQL_PATH} not found.")
         except Exception as e:
@@ -49,6 +335,7 @@ class SqlQuery:
             SQL_PATH = os.path.join(logger_settings.SQL_DIR, f'{sql_name}.sql')
             async with aiofiles.open(SQL_PATH, 'w', encoding='utf-8') as file:
                 await file.write(sql_text)
+            SqlRegistry.reload(sql_name)
         except FileNotFoundError:
             logger.error(f"File {SQL_PATH} not found.")
         except Exception as e:
@@ -67,6 +354,7 @@ class SqlQuery:
         try:
             SQL_PATH = os.path.join(logger_settings.SQL_DIR, f'{sql_name}.sql')
             os.remove(SQL_PATH)
+            SqlRegistry.evict(sql_name)
         except FileNotFoundError:
             logger.error(f"File {SQL_PATH} not found.")
         except Exception as e:
@@ -80,6 +368,7 @@ class SqlQuery:
             os.makedirs(os.path.dirname(SQL_PATH), exist_ok=True)
             async with aiofiles.open(SQL_PATH, 'w', encoding='utf-8') as file:
                 await file.write(sql_text)
+            SqlRegistry.reload(sql_name)
         except FileNotFoundError:
             logger.error(f"File {SQL_PATH} not found.")
         except Exception as e:
@@ -0,0 +1,183 @@
+import asyncio
+import datetime
+import json
+import os
+import platform
+import statistics
+import time
+import asyncpg
+import httpx
+import pandas as pd
+import pytest
+from decouple import config
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+from app.api.api_v1.handlers.jumper_api_v1 import _BATCH_EXCLUDED, SNAPSHOT_GRID, dashboard_router
+from app.core.config import logger_settings
+from app.services.auth_service import AuthDatabaseService
+from app.services.export_service import EXPORT_FILENAMES, ExportService
+from app.services.insight_service import InsightViewService
+from app.services.migration_service import MigrationService
+from app.services.synthetic_service import SyntheticDataService
+from app.sql.main import SqlQuery, SqlRegistry
+
+
+'''
+    to run specific file: pytest -v tests/test_benchmark/test_benchmark.py
+    BENCHMARK_SCALES=1,10,100 pytest -v -m benchmark
+'''
+
+# Dataset sizes as multiples of the bundled exports; unset skips the suite
+SCALES = [int(scale) for scale in config("BENCHMARK_SCALES", default="").split(",") if scale.strip()]
+REPEAT = config("BENCHMARK_REPEAT", default=3, cast=int)
+OUTPUT = config("BENCHMARK_OUTPUT", default=os.path.join(
+    logger_settings.EXPORTS_DIR, "..", "benchmarks",
+    f"benchmark-{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%SZ}.json"
+))
+
+pytestmark = [
+    pytest.mark.benchmark,
+    pytest.mark.skipif(not SCALES, reason="set BENCHMARK_SCALES (e.g. 1,10,100) to run against a disposable Postgres"),
+]
+
+# Required parameters of routes the snapshot grid doesn't cover
+PARAMS = {"engagement-trend": {"entity_type": "author"}}
+
+RESULTS = []
+ENVIRONMENT = {"python": platform.python_version()}
+
+def record(scale: int, kind: str, name: str, timings: list, **extra) -> None:
+    RESULTS.append({
+        "scale": scale, "kind": kind, "name": name,
+        "median": statistics.median(timings), "min": min(timings), "max": max(timings),
+        "runs": timings, **extra,
+    })
+
+async def measure(action, repeat: int = REPEAT):
+    """Seconds per run of `action` after one warm-up run, and its last result."""
+    result = await action()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await action()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+@pytest.fixture(scope="module")
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="module", autouse=True)
+def write_results():
+    yield
+    if not RESULTS:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(OUTPUT)), exist_ok=True)
+    with open(OUTPUT, "w", encoding="utf-8") as file:
+        json.dump({
+            "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            **ENVIRONMENT,
+            "repeat": REPEAT,
+            "results": RESULTS,
+        }, file, indent=2)
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: f"x{scale}")
+def database(request, loop, tmp_path_factory):
+    """
+    A new database loaded with synthetic data at one scale, dropped after
+    the module. The ingest is timed here since it is what fills it.
+    """
+    scale = request.param
+    name = f"de_benchmark_x{scale}"
+    try:
+        admin = loop.run_until_complete(AuthDatabaseService._connect("postgres"))
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"no Postgres at {logger_settings.AUTH_DB_HOST}:{logger_settings.AUTH_DB_PORT}: {e}")
+    ENVIRONMENT["postgres"] = ".".join(str(part) for part in admin.get_server_version()[:2])
+    loop.run_until_complete(admin.execute(f'DROP DATABASE IF EXISTS "{name}"'))
+    loop.run_until_complete(admin.execute(f'CREATE DATABASE "{name}"'))
+    files = SyntheticDataService.write_files(str(tmp_path_factory.mktemp(name)), "csv", scale)
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(logger_settings, "AUTH_DB", name)
+        # Time the work behind each request, not the caches in front of it
+        patch.setattr(logger_settings, "CACHE_ENABLED", False)
+        patch.setattr(logger_settings, "SNAPSHOTS_ENABLED", False)
+        pool = loop.run_until_complete(AuthDatabaseService.get_pool())
+
+        async def load():
+            async with pool.acquire() as conn:
+                await MigrationService.migrate(conn)
+                # One transaction, as at startup: the sync reads the keys the inserts changed
+                async with conn.transaction():
+                    started = time.perf_counter()
+                    rows = await AuthDatabaseService.insert_campaigns(files["campaigns"], conn)
+                    record(scale, "ingest", "insert_campaigns", [time.perf_counter() - started], rows=rows)
+                    started = time.perf_counter()
+                    rows = await AuthDatabaseService.insert_segments(files["segments"], conn)
+                    record(scale, "ingest", "insert_segments", [time.perf_counter() - started], rows=rows)
+                    started = time.perf_counter()
+                    await conn.execute(await SqlQuery.read_sql("com/de/data/sync_campaign_segments"))
+                    record(scale, "ingest", "sync_campaign_segments", [time.perf_counter() - started])
+                return await conn.fetchval("SELECT COUNT(*) FROM records.email_campaigns")
+
+        try:
+            count = loop.run_until_complete(load())
+            yield {"scale": scale, "pool": pool, "campaigns": count}
+        finally:
+            loop.run_until_complete(AuthDatabaseService.auth_shutdown())
+            loop.run_until_complete(admin.execute(f'DROP DATABASE IF EXISTS "{name}"'))
+            loop.run_until_complete(admin.close())
+
+class TestBenchmark:
+    def test_ingest(self, database):
+        source = os.path.join(logger_settings.DATA_DIR, SyntheticDataService.CAMPAIGNS)
+        assert database["campaigns"] == len(pd.read_csv(source, usecols=["campaign_id"])) * database["scale"]
+
+    def test_insight_queries(self, database, loop):
+        SqlRegistry.load_all()
+        for sql_name in InsightViewService.names():
+            text = SqlRegistry.get(sql_name).text
+
+            async def run():
+                async with database["pool"].acquire() as conn:
+                    return await conn.fetch(text)
+            timings, rows = loop.run_until_complete(measure(run))
+            record(database["scale"], "query", sql_name, timings, rows=len(rows))
+
+    def test_endpoints(self, database, loop):
+        app = FastAPI()
+        app.include_router(dashboard_router)
+        requests = []
+        for route in dashboard_router.routes:
+            if not isinstance(route, APIRoute) or "GET" not in route.methods or route.path in _BATCH_EXCLUDED:
+                continue
+            if route.path == "/insight2/{query_id}":
+                requests += [(f"/insight2/{name.rsplit('/', 1)[-1]}", {}) for name in InsightViewService.names()]
+            else:
+                # The first parameter set the dashboard requests, for routes that need some
+                path = route.path.lstrip("/")
+                requests.append((route.path, PARAMS.get(path) or SNAPSHOT_GRID.get(path, [{}])[0]))
+
+        async def run_all():
+            # A failing endpoint is recorded with its status rather than ending the run
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                for path, params in requests:
+                    get = lambda: client.get(path, params=params, headers={"Accept-Encoding": "identity"})
+                    timings, response = await measure(get)
+                    record(database["scale"], "endpoint", path, timings, params=params,
+                           status=response.status_code, bytes=len(response.content))
+        loop.run_until_complete(run_all())
+
+    def test_download_data(self, database, loop):
+        for fmt in EXPORT_FILENAMES:
+            async def export():
+                size = 0
+                async for data in ExportService.stream(database["pool"], fmt):
+                    size += len(data)
+                return size
+            timings, size = loop.run_until_complete(measure(export, repeat=1))
+            record(database["scale"], "export", f"download-data?format={fmt}", timings, bytes=size)
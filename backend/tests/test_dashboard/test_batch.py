@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from app.api.api_v1.handlers import jumper_api_v1
+from app.models.insight_model import BatchPart
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_batch.py
+'''
+
+POOL = object()
+
+class TestBatch:
+    @pytest.mark.operation
+    def test_kwargs_take_query_defaults(self):
+        kwargs = jumper_api_v1._batch_kwargs(jumper_api_v1.get_top_engagements, {"limit": "5"}, POOL)
+        assert kwargs == {"period": "last_year", "limit": 5, "pool": POOL}
+
+    @pytest.mark.operation
+    @pytest.mark.parametrize("endpoint, params", [
+        (jumper_api_v1.get_engagement_trend, {}),
+        (jumper_api_v1.get_top_engagements, {"limit": "many"}),
+        (jumper_api_v1.get_top_engagements, {"top": 3}),
+    ])
+    def test_bad_parameters(self, endpoint, params):
+        with pytest.raises(HTTPException) as e:
+            jumper_api_v1._batch_kwargs(endpoint, params, POOL)
+        assert e.value.status_code == 422
+
+    @pytest.mark.operation
+    def test_parts_report_status_and_timing(self):
+        async def run():
+            return await asyncio.gather(
+                jumper_api_v1._run_part(BatchPart(path="/user"), POOL),
+                jumper_api_v1._run_part(BatchPart(path="download-data"), POOL),
+            )
+        user, download = asyncio.run(run())
+        assert user["status"] == 200 and user["data"]["username"] == "admin"
+        assert download["status"] == 404
+        assert "elapsed_ms" in user and "elapsed_ms" in download
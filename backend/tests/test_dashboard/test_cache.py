@@ -0,0 +1,185 @@
+import asyncio
+import pytest
+from app.core.config import logger_settings
+from fastapi import HTTPException
+from app.services.cache_service import CacheService, LocalCache
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, db_breaker
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_cache.py
+'''
+
+@pytest.fixture(autouse=True)
+def local_only(monkeypatch):
+    """Keep the tests off Redis and start every test cold."""
+    monkeypatch.setattr(logger_settings, "CACHE_REDIS_ENABLED", False)
+    CacheService._local.clear()
+    db_breaker.record_success()
+    yield
+    CacheService._local.clear()
+    db_breaker.record_success()
+
+class TestLocalCache:
+    @pytest.mark.operation
+    def test_lru_eviction(self):
+        cache = LocalCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1 and cache.get("c") == 3
+
+    @pytest.mark.operation
+    def test_ttl_expiry(self):
+        cache = LocalCache(maxsize=2, ttl=60)
+        cache.set("a", 1, ttl=-1)
+        assert cache.get("a") is None
+
+    @pytest.mark.operation
+    def test_stale_window(self):
+        cache = LocalCache(maxsize=2, ttl=60, stale_ttl=60)
+        cache.set("a", 1, ttl=-1)
+        assert cache.get("a") is None
+        assert cache.get_entry("a") == (1, False)
+
+class TestCacheService:
+    @pytest.mark.operation
+    def test_concurrent_requests_share_one_load(self):
+        calls = []
+
+        @CacheService.cached("test-coalesce")
+        async def handler(period: str, pool=None):
+            calls.append(period)
+            await asyncio.sleep(0.05)
+            return [{"period": period}]
+
+        async def run():
+            return await asyncio.gather(*[handler(period="last_year", pool=object()) for _ in range(20)])
+
+        results = asyncio.run(run())
+        assert calls == ["last_year"]
+        assert all(r == [{"period": "last_year"}] for r in results)
+
+    @pytest.mark.operation
+    def test_key_ignores_pool(self):
+        assert CacheService.make_key("x", {"limit": 10}) != CacheService.make_key("x", {"limit": 20})
+
+        @CacheService.cached("test-pool")
+        async def handler(limit: int, pool=None):
+            return {"limit": limit, "pool": id(pool)}
+
+        first = asyncio.run(handler(limit=10, pool=object()))
+        second = asyncio.run(handler(limit=10, pool=object()))
+        assert first == second
+
+    @pytest.mark.operation
+    def test_errors_are_not_cached(self):
+        calls = []
+
+        @CacheService.cached("test-error")
+        async def handler(limit: int):
+            calls.append(limit)
+            raise RuntimeError("boom")
+
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                asyncio.run(handler(limit=1))
+        assert len(calls) == 2
+
+    @pytest.mark.operation
+    def test_stale_entry_is_served_and_refreshed(self):
+        calls = []
+
+        @CacheService.cached("test-swr")
+        async def handler(limit: int):
+            calls.append(limit)
+            return {"version": len(calls)}
+
+        async def run():
+            first = await handler(limit=1)
+            key = CacheService.make_key("test-swr", {"limit": 1})
+            CacheService._local.set(key, first, ttl=-1)
+            stale = await handler(limit=1)
+            await asyncio.sleep(0.01)
+            fresh = await handler(limit=1)
+            return first, stale, fresh
+
+        first, stale, fresh = asyncio.run(run())
+        assert stale == first == {"version": 1}
+        assert fresh == {"version": 2}
+
+class TestCircuitBreaker:
+    @pytest.mark.operation
+    def test_opens_after_timeouts_and_fails_fast(self):
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=60, call_timeout=0.01)
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        async def run():
+            for _ in range(2):
+                with pytest.raises(asyncio.TimeoutError):
+                    await breaker.call(slow)
+            with pytest.raises(CircuitOpenError):
+                await breaker.call(slow)
+
+        asyncio.run(run())
+        assert breaker.is_open
+
+    @pytest.mark.operation
+    def test_half_open_trial_closes_circuit(self):
+        breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0, call_timeout=1)
+        breaker.record_failure(asyncio.TimeoutError())
+
+        async def ok():
+            return 1
+
+        assert asyncio.run(breaker.call(ok)) == 1
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.operation
+    def test_open_circuit_maps_to_503(self, monkeypatch):
+        monkeypatch.setattr(db_breaker, "failure_threshold", 1)
+        db_breaker.record_failure(asyncio.TimeoutError())
+
+        @CacheService.cached("test-open")
+        async def handler(limit: int):
+            return {"limit": limit}
+
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(handler(limit=1))
+        assert e.value.status_code == 503
+
+    @pytest.mark.operation
+    def test_outage_is_not_cached_as_a_default(self, monkeypatch):
+        from app.api.api_v1.handlers.jumper_api_v1 import get_advanced_patterns
+        monkeypatch.setattr(logger_settings, "SNAPSHOTS_ENABLED", False)
+
+        class DownPool:
+            def acquire(self):
+                raise ConnectionRefusedError("database down")
+
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(get_advanced_patterns(pool=DownPool()))
+        assert e.value.status_code == 503 and len(CacheService._local) == 0
+
+    @pytest.mark.operation
+    def test_breaker_guards_uncached_handlers(self, monkeypatch):
+        monkeypatch.setattr(logger_settings, "CACHE_ENABLED", False)
+        monkeypatch.setattr(logger_settings, "SNAPSHOTS_ENABLED", False)
+
+        @CacheService.cached("test-uncached")
+        async def handler(limit: int):
+            raise ConnectionRefusedError("database down")
+
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(handler(limit=1))
+        assert e.value.status_code == 503
+
+        monkeypatch.setattr(db_breaker, "failure_threshold", 1)
+        db_breaker.record_failure(asyncio.TimeoutError())
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(handler(limit=1))
+        assert e.value.status_code == 503 and "Retry-After" in e.value.headers
@@ -0,0 +1,96 @@
+import datetime
+import decimal
+import io
+import zipfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from openpyxl import load_workbook
+from app.scripts.fileIO import fact_versions, load_facts
+from app.services import export_service
+from app.services.export_service import _Drain, _TableWriter
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_export.py
+'''
+
+class TestStreamingZip:
+    @pytest.mark.operation
+    def test_drained_pieces_form_a_valid_zip(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(export_service, "_EXCEL_MAX_ROWS", 3)
+        sink, pieces = _Drain(), []
+        archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED)
+        writer = _TableWriter(archive, "t", ["id", "at"])
+        at = datetime.datetime(2025, 9, 1, 8, tzinfo=datetime.timezone.utc)
+        for chunk in ([(1, at), (2, None)], [(3, at)]):
+            writer.write(chunk)
+            pieces.append(sink.drain())
+        writer.close_csv()
+        with open(tmp_path / "t.xlsx", "w+b") as workbook:
+            writer.save_workbook(workbook)
+            with archive.open("excel/t.xlsx", "w") as entry:
+                entry.write(workbook.read())
+        archive.close()
+        pieces.append(sink.drain())
+
+        result = zipfile.ZipFile(io.BytesIO(b"".join(pieces)))
+        assert result.testzip() is None
+        assert result.read("csv/t.csv").decode().splitlines() == [
+            "id,at", "1,2025-09-01 08:00:00+00:00", "2,", "3,2025-09-01 08:00:00+00:00"
+        ]
+        sheets = load_workbook(io.BytesIO(result.read("excel/t.xlsx")), read_only=True)
+        # Two rows per sheet after the header, then a continuation sheet
+        assert sheets.sheetnames == ["t", "t_2"]
+        assert [row[0] for row in sheets["t_2"].values] == ["id", 3]
+
+class TestColumnarExport:
+    @pytest.mark.operation
+    @pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+    def test_typed_round_trip(self, tmp_path, fmt):
+        fields = [
+            export_service._arrow_column("campaign_id", "int4", None, None),
+            export_service._arrow_column("click_rate", "numeric", 8, 6),
+            export_service._arrow_column("score", "numeric", None, None),
+            export_service._arrow_column("sending_date", "date", None, None),
+            export_service._arrow_column("audience_segment_a_ids", "jsonb", None, None),
+        ]
+        rows = [(1, decimal.Decimal("0.022300"), decimal.Decimal("1.5"), datetime.date(2025, 9, 1), "[94, 183]"),
+                (2, None, None, None, "[]")]
+        with open(tmp_path / f"t.{fmt}", "w+b") as file:
+            writer = export_service._ColumnarWriter(file, fields, fmt)
+            writer.write(rows)
+            writer.close()
+            data = file.read()
+        table = pq.read_table(pa.BufferReader(data)) if fmt == "parquet" \
+            else pa.ipc.open_file(pa.BufferReader(data)).read_all()
+        assert str(table.schema.field("click_rate").type) == "decimal128(8, 6)"
+        assert table.schema.field("score").type == pa.float64()
+        assert table.to_pydict() == {
+            "campaign_id": [1, 2],
+            "click_rate": [decimal.Decimal("0.022300"), None],
+            "score": [1.5, None],
+            "sending_date": [datetime.date(2025, 9, 1), None],
+            "audience_segment_a_ids": [[94, 183], []],
+        }
+
+class TestFactSnapshot:
+    @pytest.mark.operation
+    def test_loader_maps_the_newest_version_without_copying(self, tmp_path):
+        fields = [
+            export_service._arrow_column("campaign_id", "int4", None, None),
+            export_service._arrow_column("segment_id", "int4", None, None),
+        ]
+        for version in (3, 4):
+            directory = tmp_path / f"v{version}" / "facts"
+            directory.mkdir(parents=True)
+            with open(directory / "campaign_segments.arrow", "w+b") as file:
+                writer = export_service._ColumnarWriter(file, fields, "arrow", compressed=False)
+                writer.write([(version, 94), (version, 183)])
+                writer.close()
+        (tmp_path / "v5").mkdir()
+        allocated = pa.total_allocated_bytes()
+        facts = load_facts(root=str(tmp_path))
+        assert fact_versions(str(tmp_path)) == [3, 4]
+        assert facts["campaign_segments"].column("campaign_id").to_pylist() == [4, 4]
+        assert pa.total_allocated_bytes() == allocated
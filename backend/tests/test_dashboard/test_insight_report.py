@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+import json
+import os
+from decimal import Decimal
+import pytest
+from app.services.insight_report_service import InsightJob, InsightReportService, _init_worker, _render, _title
+from app.services.dataset_service import DatasetVersionService
+from app.sql.main import SqlRegistry
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_insight_report.py
+'''
+
+class FakeConnection:
+    def __init__(self):
+        self.queries = []
+
+    async def fetchval(self, query, *args):
+        return 3
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        return []
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    def acquire(self):
+        pool = self
+
+        class Acquire:
+            async def __aenter__(self):
+                return pool.conn
+
+            async def __aexit__(self, *exc):
+                pass
+        return Acquire()
+
+class TestInsightReport:
+    @pytest.mark.operation
+    def test_title_is_the_leading_comment(self):
+        assert _title("-- Daily emails sent per segment\nSELECT 1", "4_1") == "Daily emails sent per segment"
+        assert _title("SELECT 1", "4_1") == "4_1"
+
+    @pytest.mark.operation
+    def test_queries_filter_by_group(self):
+        names = InsightReportService.queries(["4"])
+        assert names and all("/4_/" in name for name in names)
+        assert names == InsightReportService.queries(["4_"])
+
+    @pytest.mark.operation
+    def test_render_writes_charts_and_report(self, tmp_path):
+        _init_worker()
+        rows = [
+            {"segment_id": 1, "segment_name": name, "sending_date": datetime.date(2025, 9, day),
+             "total_sent": Decimal(day * 100), "campaigns": day}
+            for name in ("a", "b") for day in range(1, 8)
+        ]
+        artifact = _render(InsightJob("com/de/insight2/4_/4_1", "4_", 1, "Daily sends", rows, str(tmp_path)))
+        directory = tmp_path / "assets" / "image" / "4_"
+        assert artifact.images == ["1_1.png", "1_2.png"]
+        assert all(os.path.getsize(directory / image) for image in artifact.images)
+        assert (directory / "report_1.txt").read_text(encoding="utf-8").startswith("# -- Daily sends")
+        assert "total_sent: total 5,600.00" in artifact.report
+
+    @pytest.mark.operation
+    def test_up_to_date_artifacts_are_reused(self, tmp_path, monkeypatch):
+        _init_worker()
+        sql_name = InsightReportService.queries(["4_"])[0]
+        key = InsightReportService.artifact_key(SqlRegistry.get(sql_name).text, 3)
+        artifact = _render(InsightJob(sql_name, "4_", 1, "Daily sends", [{"label": "a", "sent": 1}], str(tmp_path)))
+        manifest = {"artifacts": {sql_name: {
+            "key": key, "group": "4_", "index": 1, "title": "Daily sends", "images": artifact.images,
+        }}}
+        (tmp_path / "assets" / "image" / "manifest.json").write_text(json.dumps(manifest))
+        pool = FakePool()
+        monkeypatch.setattr(InsightReportService, "queries", staticmethod(lambda groups=None: [sql_name]))
+        monkeypatch.setattr(DatasetVersionService, "_version", 0)
+        result = asyncio.run(InsightReportService.run(pool, str(tmp_path), workers=1))
+        assert result.reused == [sql_name] and pool.conn.queries == []
+        assert (tmp_path / "markdown" / "4_.md").exists()
+        saved = json.loads((tmp_path / "assets" / "image" / "manifest.json").read_text())
+        assert saved["artifacts"][sql_name]["reused"] and saved["dataset_version"] == 3
+
+    @pytest.mark.operation
+    def test_key_follows_sql_and_dataset_version(self):
+        key = InsightReportService.artifact_key("SELECT 1", 1)
+        assert key == InsightReportService.artifact_key("SELECT 1\n", 1)
+        assert key != InsightReportService.artifact_key("SELECT 2", 1)
+        assert key != InsightReportService.artifact_key("SELECT 1", 2)
+
+    @pytest.mark.operation
+    def test_hand_written_pages_are_kept(self, tmp_path):
+        (tmp_path / "markdown").mkdir()
+        (tmp_path / "markdown" / "4_.md").write_text("# Daily sends\n\nWritten by hand.")
+        with pytest.raises(FileExistsError):
+            asyncio.run(InsightReportService.run(FakePool(), str(tmp_path), workers=1))
+        assert "Written by hand." in (tmp_path / "markdown" / "4_.md").read_text()
@@ -0,0 +1,45 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.services.metrics_service import Histogram, MetricsMiddleware, MetricsService
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_metrics.py
+'''
+
+app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+
+@app.get("/insight2/{name}")
+async def insight(name: str):
+    return {"name": name}
+
+client = TestClient(app)
+
+class TestMetrics:
+    @pytest.mark.operation
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("t_seconds", "Test.", ("template",))
+        for value in (0.002, 0.02, 30):
+            histogram.observe(("a",), value)
+        lines = histogram.render()
+        assert 't_seconds_bucket{template="a",le="0.001"} 0' in lines
+        assert 't_seconds_bucket{template="a",le="0.025"} 2' in lines
+        assert 't_seconds_bucket{template="a",le="+Inf"} 3' in lines
+        assert 't_seconds_count{template="a"} 3' in lines
+
+    @pytest.mark.operation
+    def test_requests_are_labelled_by_route_template(self):
+        MetricsService.responses.clear()
+        client.get("/insight2/4_1")
+        client.get("/insight2/6_6")
+        client.get("/missing")
+        assert MetricsService.responses[("/insight2/{name}", "GET", "200")] == 2
+        assert MetricsService.responses[("unmatched", "GET", "404")] == 1
+
+    @pytest.mark.operation
+    def test_render_without_a_pool(self):
+        text = MetricsService.render({"size": 0, "in_use": 0, "waiting": 0}, {"local_hits": 3, "misses": 1}, {})
+        assert "db_pool_size 0" in text and "db_pool_acquired_total" not in text
+        assert "cache_hit_ratio 0.75" in text
@@ -0,0 +1,91 @@
+import pytest
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+from app.api.api_v1.routing import ConditionalRoute, _byte_range, file_response
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_routing.py
+'''
+
+calls = {"n": 0}
+router = APIRouter(route_class=ConditionalRoute)
+
+@router.get("/rows")
+async def rows(limit: int = 200):
+    calls["n"] += 1
+    return [{"id": i, "name": f"row {i}"} for i in range(limit)]
+
+files = APIRouter()
+
+@files.get("/file")
+async def file(request: Request):
+    return file_response(request, __file__, "text/plain", "f.py", etag="abc")
+
+app = FastAPI()
+app.include_router(router)
+app.include_router(files)
+client = TestClient(app)
+
+@pytest.fixture(autouse=True)
+def cold():
+    ConditionalRoute._bodies.clear()
+    calls["n"] = 0
+
+class TestConditionalRoute:
+    @pytest.mark.operation
+    def test_etag_and_not_modified(self):
+        first = client.get("/rows", headers={"Accept-Encoding": "identity"})
+        tag = first.headers["etag"]
+        second = client.get("/rows", headers={"If-None-Match": tag})
+        assert second.status_code == 304 and second.content == b""
+        assert calls["n"] == 1
+
+    @pytest.mark.operation
+    def test_etag_depends_on_query(self):
+        a = client.get("/rows?limit=1").headers["etag"]
+        b = client.get("/rows?limit=2").headers["etag"]
+        assert a != b
+
+    @pytest.mark.operation
+    def test_gzip_large_bodies_only(self):
+        large = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+        assert large.headers["content-encoding"] == "gzip"
+        assert len(large.json()) == 200
+        small = client.get("/rows?limit=1", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+        assert small.json() == [{"id": 0, "name": "row 0"}]
+
+    @pytest.mark.operation
+    def test_encoded_body_reused(self):
+        client.get("/rows", headers={"Accept-Encoding": "gzip"})
+        client.get("/rows", headers={"Accept-Encoding": "gzip"})
+        assert calls["n"] == 1
+
+class TestRangeFileResponse:
+    @pytest.mark.operation
+    def test_byte_range(self):
+        assert _byte_range("bytes=0-9", 100) == (0, 9)
+        assert _byte_range("bytes=90-", 100) == (90, 99)
+        assert _byte_range("bytes=-10", 100) == (90, 99)
+        assert _byte_range("bytes=50-500", 100) == (50, 99)
+        assert _byte_range("bytes=0-1,5-6", 100) is None
+        with pytest.raises(ValueError):
+            _byte_range("bytes=100-", 100)
+
+    @pytest.mark.operation
+    def test_partial_and_full_sends(self):
+        with open(__file__, "rb") as f:
+            content = f.read()
+        partial = client.get("/file", headers={"Range": "bytes=10-19"})
+        assert partial.status_code == 206 and partial.content == content[10:20]
+        assert partial.headers["content-range"] == f"bytes 10-19/{len(content)}"
+        stale = client.get("/file", headers={"Range": "bytes=10-19", "If-Range": '"old"'})
+        assert stale.status_code == 200 and stale.content == content
+        assert client.get("/file", headers={"Range": f"bytes={len(content)}-"}).status_code == 416
+
+    @pytest.mark.operation
+    def test_file_routes_ignore_dataset_etags(self):
+        response = client.get("/file", headers={"If-None-Match": "*"})
+        assert response.status_code == 200 and response.headers["etag"] == '"abc"'
+
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import pytest
+from app.services.snapshot_service import SnapshotService
+
+
+'''
+    to run specific file: pytest -v tests/test_dashboard/test_snapshots.py
+'''
+
+class FakePool:
+    def __init__(self, payload):
+        self.payload = payload
+        self.queries = 0
+
+    async def fetchval(self, query, *args):
+        self.queries += 1
+        return self.payload
+
+@pytest.fixture(autouse=True)
+def grid():
+    previous = SnapshotService._jobs
+    SnapshotService.register(lambda pool: [("summary", {"period": p}, None) for p in ("last_7_days", "last_year")])
+    yield
+    SnapshotService.register(previous)
+
+async def live():
+    return {"live": True}
+
+class TestSnapshots:
+    @pytest.mark.operation
+    def test_grid_params_read_the_snapshot(self):
+        pool = FakePool(json.dumps({"live": False}))
+        result = asyncio.run(SnapshotService.read_through("summary", {"period": "last_year"}, pool, live))
+        assert result == {"live": False} and pool.queries == 1
+
+    @pytest.mark.operation
+    def test_missing_snapshot_runs_live(self):
+        pool = FakePool(None)
+        assert asyncio.run(SnapshotService.read_through("summary", {"period": "last_year"}, pool, live)) == {"live": True}
+
+    @pytest.mark.operation
+    def test_unusual_params_skip_the_lookup(self):
+        pool = FakePool(json.dumps({"live": False}))
+        result = asyncio.run(SnapshotService.read_through("summary", {"period": "last_2_days"}, pool, live))
+        assert result == {"live": True} and pool.queries == 0
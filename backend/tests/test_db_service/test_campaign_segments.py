@@ -0,0 +1,26 @@
+import pytest
+from app.services.ingest_service import IngestService
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_campaign_segments.py
+'''
+
+class TestParseSegmentIds:
+    @pytest.mark.operation
+    def test_cleaned_ids_win(self):
+        assert IngestService.parse_segment_ids("[94, 183]", "94,183") == [94, 183]
+
+    @pytest.mark.operation
+    def test_ids_from_audience_text(self):
+        audience = "96 - recent registration & 3 month clickers,117 - Registered past month"
+        assert IngestService.parse_segment_ids("[]", audience) == [96, 117]
+        audience = "Included segments - 92 (Gaming interest),179 (clicked gaming),200 (5 days clicked),"
+        assert IngestService.parse_segment_ids("", audience) == [92, 179, 200]
+
+    @pytest.mark.operation
+    def test_numbers_inside_names_are_not_ids(self):
+        audience = "124 - Dec24 - Jan-25,180 - registerd 1-4 weeks,clicked 9 months"
+        assert IngestService.parse_segment_ids("[]", audience) == [124, 180]
+        assert IngestService.parse_segment_ids("[]", "YFS active,YFS 2 weeks") == []
+        assert IngestService.parse_segment_ids("[]", "Excluded segments: 94 - do not send") == []
@@ -0,0 +1,65 @@
+import asyncio
+import pytest
+from app.services.cache_service import CacheService
+from app.services.dataset_service import DatasetVersionService
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_dataset_version.py
+'''
+
+@pytest.fixture(autouse=True)
+def version():
+    """Restore the process-wide version after each test."""
+    previous = DatasetVersionService._version
+    yield
+    DatasetVersionService._version = previous
+
+class TestDatasetVersion:
+    @pytest.mark.operation
+    def test_key_is_scoped_to_version(self):
+        DatasetVersionService._version = 3
+        assert DatasetVersionService.key("exports", "csv") == "v3:exports:csv"
+        before = CacheService.make_key("summary", {})
+        DatasetVersionService._version = 4
+        assert CacheService.make_key("summary", {}) != before
+
+    @pytest.mark.operation
+    def test_notify_only_moves_forward(self):
+        seen = []
+
+        async def subscriber(version):
+            seen.append(version)
+
+        DatasetVersionService._version = 2
+        DatasetVersionService.subscribe(subscriber)
+        try:
+            async def run():
+                DatasetVersionService._on_notify(None, 0, "dataset_version", "5")
+                DatasetVersionService._on_notify(None, 0, "dataset_version", "4")
+                DatasetVersionService._on_notify(None, 0, "dataset_version", "oops")
+                await asyncio.sleep(0)
+            asyncio.run(run())
+        finally:
+            DatasetVersionService._subscribers.remove(subscriber)
+        assert seen == [5]
+        assert DatasetVersionService.current() == 5
+
+    @pytest.mark.operation
+    def test_version_change_clears_local_cache(self):
+        CacheService._local.set("k", 1)
+        asyncio.run(DatasetVersionService.apply(DatasetVersionService.current() + 1))
+        assert len(CacheService._local) == 0
+
+    @pytest.mark.operation
+    def test_bump_waits_for_apply(self):
+        class FakeConn:
+            async def fetchrow(self, query):
+                return {"version": 7}
+
+        DatasetVersionService._version = 6
+        # Uncommitted until the caller's transaction ends, so nothing moves yet
+        assert asyncio.run(DatasetVersionService.bump(FakeConn())) == 7
+        assert DatasetVersionService.current() == 6
+        asyncio.run(DatasetVersionService.apply(7))
+        assert DatasetVersionService.current() == 7
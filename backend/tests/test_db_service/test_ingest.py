@@ -0,0 +1,56 @@
+import datetime
+import pandas as pd
+import pytest
+from app.services.ingest_service import IngestService
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_ingest.py
+'''
+
+SCHEMA = [
+    ("Sent", "sent", "int"),
+    ("Click rate", "click_rate", "rate"),
+    ("Sending date", "sending_date", "date"),
+    ("Uses Engagement", "uses_engagement", "bool"),
+    ("Notes", "notes", "text"),
+    ("IDs", "ids", "ids:audience"),
+]
+
+class TestConvert:
+    @pytest.mark.operation
+    def test_typed_columns(self):
+        chunk = pd.DataFrame({
+            "Sent": ["29279", "", " 12"],
+            "Click rate": ["0.0223", "13.5%", ""],
+            "Sending date": ["2025-09-01", "", "not a date"],
+            "Uses Engagement": ["Yes", "no", ""],
+            "Notes": ["a", "", None],
+            "IDs": ["[94, 183]", "[]", ""],
+            "audience": ["94,183", "96 - recent registration", ""],
+        })
+        sent, rate, date, engaged, notes, ids = IngestService.convert(chunk, SCHEMA)
+        assert sent == [29279, 0, 12] and all(type(v) is int for v in sent)
+        assert rate == pytest.approx([0.0223, 0.135, 0.0])
+        assert date == [datetime.date(2025, 9, 1), None, None]
+        assert engaged == [True, False, False]
+        assert notes == ["a", "", None]
+        assert ids == ["[94, 183]", "[96]", "[]"]
+
+    @pytest.mark.operation
+    def test_missing_column_is_null(self):
+        chunk = pd.DataFrame({"Sent": ["1"]})
+        assert IngestService.convert(chunk, [("Notes", "notes", "text")]) == [[None]]
+
+class TestUnsettled:
+    @pytest.mark.operation
+    def test_rows_past_the_watermark(self):
+        schema = [("Campaign ID", "campaign_id", "int"), ("Sending date", "sending_date", "date")]
+        chunk = pd.DataFrame({
+            "Campaign ID": ["1", "2", "3", "4", ""],
+            "Sending date": ["2025-01-01", "2025-03-01", "2025-01-01", "2025-01-01", "2025-01-01"],
+        })
+        kept = IngestService.unsettled(chunk, schema, "campaign_id", "sending_date",
+                                       (3, datetime.date(2025, 2, 1)))
+        # 1 and 3 have settled; 2 is recent, 4 is new and the unparsable row is kept
+        assert kept["Campaign ID"].tolist() == ["2", "4", ""]
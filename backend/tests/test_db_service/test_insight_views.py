@@ -0,0 +1,49 @@
+import asyncio
+import pytest
+from app.services.insight_service import InsightViewService
+from app.sql.main import SqlRegistry
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_insight_views.py
+'''
+
+class FakeConnection:
+    """Records the statements it is asked to run."""
+    def __init__(self):
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        return [{"value": 1, "mv_row_id": 1}]
+
+@pytest.fixture(autouse=True)
+def no_views():
+    InsightViewService._views.clear()
+    yield
+    InsightViewService._views.clear()
+
+class TestInsightViews:
+    @pytest.mark.operation
+    def test_names_in_natural_order(self):
+        names = [name.rsplit("/", 1)[-1] for name in InsightViewService.names()]
+        assert names.index("1_8") < names.index("2_1") < names.index("6_7") < names.index("7_1")
+        assert InsightViewService.sql_name("6_6") in InsightViewService.names()
+
+    @pytest.mark.operation
+    def test_fetch_reads_current_view(self):
+        name = InsightViewService.sql_name("6_6")
+        template = SqlRegistry.get(name)
+        InsightViewService._views[name] = ("insight2_6_6", InsightViewService._digest(template))
+        conn = FakeConnection()
+        rows = asyncio.run(InsightViewService.fetch(conn, name))
+        assert "insight2_6_6" in conn.queries[0]
+        assert rows == [{"value": 1}]
+
+    @pytest.mark.operation
+    def test_fetch_runs_live_when_query_changed(self):
+        name = InsightViewService.sql_name("6_6")
+        InsightViewService._views[name] = ("insight2_6_6", "outdated")
+        conn = FakeConnection()
+        asyncio.run(InsightViewService.fetch(conn, name))
+        assert conn.queries == [SqlRegistry.get(name).text]
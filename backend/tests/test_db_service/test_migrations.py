@@ -0,0 +1,54 @@
+import asyncio
+import asyncpg
+import pytest
+from app.services.migration_service import MIGRATIONS, MigrationService
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_migrations.py
+'''
+
+class FakeConnection:
+    """Just enough of asyncpg.Connection to drive `migrate`."""
+    def __init__(self, applied):
+        self.applied = applied
+        self.executed = []
+
+    async def fetchval(self, query):
+        if not self.applied:
+            raise asyncpg.UndefinedTableError("relation does not exist")
+        return max(self.applied)
+
+    async def fetch(self, query):
+        return [{"version": v, "checksum": c} for v, c in sorted(self.applied.items())]
+
+    async def execute(self, query, *args):
+        self.executed.append(query)
+        if args and "schema_migrations" in query:
+            self.applied[args[0]] = args[2]
+
+    def transaction(self):
+        return _Transaction()
+
+class _Transaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class TestMigrations:
+    @pytest.mark.operation
+    def test_cold_start_applies_everything_once(self):
+        conn = FakeConnection({})
+        assert asyncio.run(MigrationService.migrate(conn)) == len(MIGRATIONS)
+        assert sorted(conn.applied) == list(range(1, len(MIGRATIONS) + 1))
+        conn.executed.clear()
+        assert asyncio.run(MigrationService.migrate(conn)) == 0
+        assert conn.executed == []
+
+    @pytest.mark.operation
+    def test_only_pending_scripts_run(self):
+        conn = FakeConnection({1: "x", 2: "y"})
+        assert asyncio.run(MigrationService.migrate(conn)) == len(MIGRATIONS) - 2
+        assert conn.applied[1] == "x"
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from app.services.pool_service import InstrumentedPool
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_pool.py
+'''
+
+class FakePool:
+    """One connection at a time, like a pool with max_size=1."""
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.closed = False
+
+    async def acquire(self, timeout=None):
+        await asyncio.wait_for(self.lock.acquire(), timeout)
+        return object()
+
+    async def release(self, conn, timeout=None):
+        self.lock.release()
+
+    async def close(self):
+        self.closed = True
+
+    def get_size(self):
+        return 1
+
+    def get_idle_size(self):
+        return 0 if self.lock.locked() else 1
+
+class TestInstrumentedPool:
+    @pytest.mark.operation
+    def test_tracks_in_use_queue_and_wait(self):
+        async def run():
+            pool = InstrumentedPool(FakePool(), 1, 1)
+            seen = []
+
+            async def use():
+                async with pool.acquire():
+                    seen.append((pool.in_use, pool.waiting))
+                    await asyncio.sleep(0.01)
+
+            await asyncio.gather(use(), use(), use())
+            return pool, seen
+        pool, seen = asyncio.run(run())
+        assert seen[0] == (1, 2)
+        stats = pool.stats()
+        assert stats["acquired"] == 3 and stats["in_use"] == 0 and stats["waiting"] == 0
+        assert stats["wait_max_ms"] >= 15
+
+    @pytest.mark.operation
+    def test_acquire_timeout_is_counted(self):
+        async def run():
+            pool = InstrumentedPool(FakePool(), 1, 1)
+            async with pool.acquire():
+                with pytest.raises(asyncio.TimeoutError):
+                    await pool.acquire(timeout=0.01)
+            await pool.close()
+            return pool
+        pool = asyncio.run(run())
+        assert pool.timeouts == 1 and pool.waiting == 0 and pool._pool.closed
@@ -0,0 +1,55 @@
+import asyncio
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from app.core.config import logger_settings
+from app.services.ingest_service import IngestService
+from app.services.synthetic_service import SyntheticDataService
+
+
+'''
+    to run specific file: pytest -v tests/test_db_service/test_synthetic.py
+'''
+
+class TestSyntheticData:
+    @pytest.mark.operation
+    def test_campaigns_scale_and_stay_consistent(self):
+        source = SyntheticDataService._read(SyntheticDataService.CAMPAIGNS)
+        frame = pd.concat(SyntheticDataService.campaigns(4, seed=3, chunk_rows=500))
+        assert len(frame) == 4 * len(source) and frame["campaign_id"].is_unique
+        assert frame["Campaign Name"].isin(source["Campaign Name"]).all()
+        numbers = frame.apply(pd.to_numeric, errors="coerce")
+        assert (numbers["Delivered"] == numbers["Sent"] - numbers["Non delivered"]).all()
+        assert (numbers["Clicked"] <= numbers["Opens"]).all() and (numbers["Opens"] <= numbers["Total opens"]).all()
+        # Two periods of whole weeks, so weekdays line up with the export's
+        assert frame["Sending date"].min() < source["Sending date"].min()
+        assert frame["Sending date"].max() == source["Sending date"].max()
+
+    @pytest.mark.operation
+    def test_seed_is_reproducible(self):
+        first = next(SyntheticDataService.campaigns(1, seed=7))
+        assert first.equals(next(SyntheticDataService.campaigns(1, seed=7)))
+        assert not first.equals(next(SyntheticDataService.campaigns(1, seed=8)))
+
+    @pytest.mark.operation
+    def test_older_periods_use_their_segment_generation(self):
+        segments = SyntheticDataService.segments(4)
+        assert len(segments) == 2 * len(SyntheticDataService._read(SyntheticDataService.SEGMENTS))
+        start = SyntheticDataService._read(SyntheticDataService.CAMPAIGNS)["Sending date"].min()
+        frame = pd.concat(SyntheticDataService.campaigns(4))
+        oldest, newest = frame[frame["Sending date"] < start], frame[frame["Sending date"] >= start]
+        ids = lambda rows: {i for text in rows["audience_segment_a"] for i in IngestService.parse_segment_ids(None, text)}
+        assert ids(oldest) and all(i < 1000 for i in ids(oldest))
+        assert ids(newest) and all(i > 1000 for i in ids(newest))
+
+    @pytest.mark.operation
+    def test_parquet_is_typed(self, tmp_path):
+        paths = SyntheticDataService.write_files(str(tmp_path), "parquet", 1)
+        schema = pq.read_schema(paths["campaigns"])
+        assert str(schema.field("sent").type) == "int64" and str(schema.field("sending_date").type) == "date32[day]"
+        assert pq.read_metadata(paths["segments"]).num_rows == 50
+
+    @pytest.mark.operation
+    def test_app_database_is_refused(self):
+        with pytest.raises(ValueError):
+            asyncio.run(SyntheticDataService.load(logger_settings.AUTH_DB, 1))
@@ -0,0 +1,67 @@
+import asyncio
+import datetime
+import pytest
+from app.services import export_service
+from app.sql.embedded import EmbeddedPool, translate
+
+
+'''
+    to run specific file: pytest -v tests/test_sql/test_embedded.py
+'''
+
+@pytest.fixture
+def pool(tmp_path):
+    directory = tmp_path / "v7" / "facts"
+    directory.mkdir(parents=True)
+    fields = [
+        export_service._arrow_column("campaign_id", "int4", None, None),
+        export_service._arrow_column("sent", "int4", None, None),
+        export_service._arrow_column("client", "text", None, None),
+        export_service._arrow_column("sending_date", "date", None, None),
+        export_service._arrow_column("audience_segment_a_ids", "jsonb", None, None),
+    ]
+    rows = [
+        (1, 7, "b", datetime.date(2025, 9, 1), "[94, 183]"),
+        (2, 4, "a", datetime.date(2025, 9, 2), "[]"),
+        (3, 2, "b", datetime.date(2025, 9, 2), "[94]"),
+    ]
+    with open(directory / "email_campaigns.arrow", "w+b") as file:
+        writer = export_service._ColumnarWriter(file, fields, "arrow", compressed=False)
+        writer.write(rows)
+        writer.close()
+    pool = EmbeddedPool.open(root=str(tmp_path))
+    yield pool
+    asyncio.run(pool.close())
+
+class TestTranslate:
+    @pytest.mark.operation
+    def test_elements_keep_postgres_column_names(self):
+        assert "AS value) AS _elements WHERE" in translate("FROM jsonb_array_elements_text(ec.ids) WHERE value = '1'")
+        assert "AS seg) AS seg" in translate("FROM jsonb_array_elements_text(ec.ids) seg WHERE seg IN ('1')")
+
+    @pytest.mark.operation
+    def test_casts(self):
+        assert translate("x::decimal / y::numeric(5,2), '[]'::jsonb") == "x::DOUBLE / y::numeric(5,2), '[]'::JSON"
+
+class TestEmbeddedPool:
+    @pytest.mark.operation
+    def test_library_constructs_run_like_postgres(self, pool):
+        rows = asyncio.run(pool.fetch("""
+            SELECT seg.segment_id, SUM(ec.sent) / COUNT(*) AS avg_sent, STRING_AGG(DISTINCT ec.client, ', ') AS clients
+            FROM records.email_campaigns ec
+            CROSS JOIN LATERAL (
+                SELECT value::integer AS segment_id
+                FROM jsonb_array_elements_text(ec.audience_segment_a_ids)
+                WHERE ec.audience_segment_a_ids != '[]'::jsonb AND value ~ '^\\d+$'
+            ) seg
+            GROUP BY seg.segment_id
+            ORDER BY seg.segment_id
+        """))
+        assert rows == [
+            {"segment_id": 94, "avg_sent": 4, "clients": "b"},
+            {"segment_id": 183, "avg_sent": 7, "clients": "b"},
+        ]
+
+    @pytest.mark.operation
+    def test_dataset_version_is_the_snapshot_version(self, pool):
+        assert asyncio.run(pool.fetchval("SELECT version FROM records.dataset_version")) == 7
@@ -0,0 +1,85 @@
+import os
+import asyncio
+import pytest
+from app.core.config import logger_settings
+from app.sql.main import SqlQuery, SqlRegistry
+
+
+'''
+    to run specific file: pytest -v tests/test_sql/test_registry.py
+'''
+
+@pytest.fixture
+def sql_dir(tmp_path, monkeypatch):
+    """Point the registry at a throwaway `SQL_DIR`."""
+    os.makedirs(tmp_path / "com/jumper/insight")
+    (tmp_path / "com/jumper/insight/summary.sql").write_text("SELECT * FROM {schema}.posts;")
+    (tmp_path / "raw.sql").write_text("SELECT '}' AS brace;")
+    monkeypatch.setattr(logger_settings, "SQL_DIR", str(tmp_path))
+    SqlRegistry.load_all()
+    yield tmp_path
+    SqlRegistry._templates = {}
+    SqlRegistry._loaded = False
+
+class TestSqlRegistry:
+    @pytest.mark.operation
+    def test_load_all(self, sql_dir):
+        assert SqlRegistry.load_all() == 2
+        template = SqlRegistry.get("com/jumper/insight/summary")
+        assert template.fields == frozenset({"schema"})
+        # Literal braces are not a format template but remain readable raw
+        assert SqlRegistry.get("raw").error is not None
+
+    @pytest.mark.operation
+    def test_read_sql_full_is_cached(self, sql_dir):
+        first = asyncio.run(SqlQuery.read_sql_full("com/jumper/insight/summary", schema="records"))
+        second = asyncio.run(SqlQuery.read_sql_full("com/jumper/insight/summary", schema="records"))
+        assert first == "SELECT * FROM records.posts;"
+        assert first is second
+
+    @pytest.mark.operation
+    def test_missing_key_returns_empty(self, sql_dir):
+        assert asyncio.run(SqlQuery.read_sql_full("com/jumper/insight/summary")) == ""
+        assert asyncio.run(SqlQuery.read_sql("does/not/exist")) == ""
+
+    @pytest.mark.operation
+    def test_refresh_only_reloads_changed_files(self, sql_dir):
+        assert SqlRegistry.refresh() == 0
+        path = sql_dir / "com/jumper/insight/summary.sql"
+        path.write_text("SELECT 1 FROM {schema}.authors;")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert SqlRegistry.refresh() == 1
+        assert asyncio.run(SqlQuery.read_sql_full("com/jumper/insight/summary", schema="records")) == \
+            "SELECT 1 FROM records.authors;"
+        os.remove(sql_dir / "raw.sql")
+        assert SqlRegistry.refresh() == 1
+        assert SqlRegistry.get("raw") is None
+
+    @pytest.mark.operation
+    def test_read_sql_bound(self, sql_dir):
+        (sql_dir / "com/jumper/insight/top.sql").write_text(
+            "SELECT * FROM {schema}.posts WHERE created_at >= '{start_date}' LIMIT 20;"
+        )
+        query = asyncio.run(SqlQuery.read_sql_bound(
+            "com/jumper/insight/top",
+            binds={"start_date": "2025-01-01", "limit": 5},
+            rewrites={"LIMIT 20": "LIMIT {limit}"},
+            schema="records"
+        ))
+        assert query.text == "SELECT * FROM records.posts WHERE created_at >= $1 LIMIT $2;"
+        assert query.args == ("2025-01-01", 5)
+        # Same structure, different values: identical statement text
+        other = asyncio.run(SqlQuery.read_sql_bound(
+            "com/jumper/insight/top",
+            binds={"start_date": "2024-01-01", "limit": 50},
+            rewrites={"LIMIT 20": "LIMIT {limit}"},
+            schema="records"
+        ))
+        assert other.text is query.text
+
+    @pytest.mark.operation
+    def test_read_sql_bound_unused_bind(self, sql_dir):
+        assert asyncio.run(SqlQuery.read_sql_bound(
+            "com/jumper/insight/summary", binds={"limit": 5}, schema="records"
+        )) is None
@@ -1,7 +1,9 @@
 import os
+import asyncio
 import click
 import uvicorn
 from utils.docker.util import is_docker
+from utils.console.chart import BarChart
 from app.core.config import logger_settings
 logger = logger_settings.get_logger(__name__)
 
@@ -29,3 +31,106 @@ def start(uvreload: bool):
     else:
         logger.warning(f"uvicorn reloading: {uvreload}")   
     uvicorn.run("app.app:app", host="0.0.0.0", port=8000)
+
+@cli.command("run-insights")
+@click.option("--group", "groups", multiple=True, help="Insight group to run, e.g. 4_ (repeatable, default: all).")
+@click.option("--workers", default=os.cpu_count(), type=int, show_default=True, help="Chart render processes.")
+@click.option("--concurrency", default=logger_settings.DB_POOL_MAX_SIZE, type=int, show_default=True,
+              help="Queries running at once over the pool.")
+@click.option("--output", default=logger_settings.INSIGHT_OUTPUT_DIR, show_default=True,
+              help="Directory holding assets/image and markdown.")
+@click.option("--force", is_flag=True, help="Regenerate artifacts the manifest reports as up to date.")
+@click.option("--overwrite", is_flag=True,
+              help="Write into a directory whose pages and charts were not generated, e.g. the repo's own.")
+@click.option("--backend", type=click.Choice(["postgres", "duckdb"]), default="postgres", show_default=True,
+              help="Run the queries on Postgres or on embedded DuckDB over the fact snapshot.")
+@click.option("--facts-version", type=int, default=None, help="Fact snapshot for --backend duckdb (default: newest).")
+def run_insights(groups, workers: int, concurrency: int, output: str, force: bool, overwrite: bool,
+                 backend: str, facts_version):
+    """
+    Regenerate the insight2 charts, reports and markdown pages headless.
+    """
+    from app.services.auth_service import AuthDatabaseService
+    from app.services.insight_report_service import InsightReportService
+
+    async def run():
+        if backend == "duckdb":
+            from app.sql.embedded import EmbeddedPool
+            pool = EmbeddedPool.open(facts_version)
+            try:
+                return await InsightReportService.run(pool, output, groups, workers, concurrency, force, overwrite)
+            finally:
+                await pool.close()
+        pool = await AuthDatabaseService.get_pool()
+        try:
+            return await InsightReportService.run(pool, output, groups, workers, concurrency, force, overwrite)
+        finally:
+            await AuthDatabaseService.auth_shutdown()
+
+    try:
+        result = asyncio.run(run())
+    except FileExistsError as e:
+        raise click.ClickException(f"{e} Pass --overwrite to replace them.")
+    click.echo(
+        f"\n{len(result.artifacts) - len(result.reused)} insights written to {output}, "
+        f"{len(result.reused)} up to date, {len(result.failures)} failed."
+    )
+    for sql_name, error in sorted(result.failures.items()):
+        click.echo(f"  failed {sql_name}: {error}")
+    stages = BarChart()
+    for stage, seconds in result.timings.items():
+        stages.add_value(seconds, stage, f"{seconds:.2f}s")
+    click.echo(f"\nTime per stage (query and render summed over queries):\n{stages.get(reverse=True)}")
+    if result.durations:
+        slowest = BarChart()
+        for sql_name, seconds in sorted(result.durations.items(), key=lambda item: -item[1])[:10]:
+            slowest.add_value(seconds, sql_name.rsplit("/", 1)[-1], f"{seconds:.2f}s")
+        click.echo(f"\nSlowest queries:\n{slowest.get(reverse=True)}")
+
+@cli.command("extract-facts")
+def extract_facts():
+    """
+    Write the memory-mapped fact snapshot of the current dataset version.
+    """
+    from app.services.auth_service import AuthDatabaseService
+    from app.services.export_service import ExportArtifactService
+
+    async def run():
+        pool = await AuthDatabaseService.get_pool()
+        try:
+            async with pool.acquire() as conn:
+                return await ExportArtifactService.build_facts(conn)
+        finally:
+            await AuthDatabaseService.auth_shutdown()
+
+    directory = asyncio.run(run())
+    click.echo(f"Fact snapshot written to {directory}." if directory else "The fact snapshot is up to date.")
+
+@cli.command("generate-data")
+@click.option("--scale", default=1, type=click.IntRange(1, 1000), show_default=True,
+              help="Multiple of the bundled exports to generate.")
+@click.option("--format", "fmt", type=click.Choice(["csv", "parquet", "postgres"]), default="csv", show_default=True,
+              help="Files with the export's columns, typed parquet, or COPY into --database.")
+@click.option("--output", default=os.path.join(logger_settings.DATA_DIR, "synthetic"), show_default=True,
+              help="Directory for csv and parquet output.")
+@click.option("--database", default=None,
+              help="Database for --format postgres, on the configured server; created if missing, never AUTH_DB.")
+@click.option("--seed", default=0, type=int, show_default=True, help="Random seed; the same seed gives the same data.")
+@click.option("--start-id", default=1, type=int, show_default=True, help="First campaign ID.")
+def generate_data(scale: int, fmt: str, output: str, database, seed: int, start_id: int):
+    """
+    Generate synthetic campaigns and segments at a scale factor.
+    """
+    from app.services.synthetic_service import SyntheticDataService
+
+    if fmt != "postgres":
+        for table, path in SyntheticDataService.write_files(output, fmt, scale, seed, start_id).items():
+            click.echo(f"{table}: {path}")
+        return
+    if not database:
+        raise click.UsageError("--format postgres needs --database, a disposable database to load into.")
+    if database == logger_settings.AUTH_DB:
+        raise click.UsageError(f"--database {database} is the app database; synthetic rows would replace real ones.")
+
+    campaigns, segments = asyncio.run(SyntheticDataService.load(database, scale, seed, start_id))
+    click.echo(f"{campaigns} campaigns and {segments} segments inserted or changed in {database}.")
@@ -84,6 +84,27 @@ export const getAdvancedInsights = async (): Promise<AdvancedInsight[]> => {
   }
 };
 
+export interface BatchPart {
+  path: string;
+  params?: Record<string, unknown>;
+  id?: string;
+}
+
+export interface BatchResult {
+  status: number;
+  data?: any;
+  error?: string;
+  elapsed_ms: number;
+}
+
+// Several dashboard queries in one request, run concurrently by the backend
+export const getInsightBatch = async (
+  parts: BatchPart[]
+): Promise<{ parts: Record<string, BatchResult>; elapsed_ms: number }> => {
+  const response = await api.post('/api/v1/insight/batch', { parts });
+  return response.data;
+};
+
 export const downloadData = async (): Promise<Blob> => {
   try {
     const response = await api.get('/api/v1/insight/download-data', {